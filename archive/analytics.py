@@ -0,0 +1,387 @@
+"""
+NYT Archive API – local columnar analytics over slim NDJSON.
+
+Reproduces the dbt analytics marts agg_articles_by_month, agg_section_trends and
+agg_keyword_trends from archive_slim/ with vectorized pandas group-bys, so they can
+be checked offline (and used as a regression oracle for the SQL) without BigQuery.
+
+The slim files are read once into two column-oriented frames:
+
+  articles  one row per article (deduplicated by article_id, first file wins like the
+            loader's MERGE), cleaned like stg_archive_articles; section_name, news_desk
+            and type_of_material are dictionary-encoded (pandas categoricals)
+  keywords  one row per keyword: the article's row number plus dictionary-encoded
+            keyword_name and keyword_value
+
+Parsing JSON dominates a run, so each file's frames are cached in
+archive_analytics/cache/ (pickle, reused while the slim file's size and mtime match)
+and a rerun over an unchanged archive only concatenates them.
+
+Differences from the marts: HLL sketch columns and _source_loaded_at are not
+produced, articles without a parseable pub_date are left out (the SQL groups them
+under a NULL month/year), and ties in rank_in_year are broken by keyword_value and
+keyword_name (row_number() in BigQuery breaks them arbitrarily).
+
+  python -m archive.analytics   # writes the three aggregates to archive_analytics/*.csv
+"""
+
+import json
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from archive.transform import SLIM_DIR
+
+ANALYTICS_DIR = Path("archive_analytics")
+CACHE_DIR = ANALYTICS_DIR / "cache"
+
+
+@dataclass
+class Corpus:
+    articles: pd.DataFrame
+    keywords: pd.DataFrame
+
+
+def _category(values: list[str | None], default: str | None = "Unknown") -> pd.Categorical:
+    """Dictionary-encode strings; blank values become default (as coalesce(nullif(trim)))."""
+    series = pd.Series(values, dtype="string").str.strip()
+    series = series.mask(series == "")
+    if default is not None:
+        series = series.fillna(default)
+    return pd.Categorical(series.astype(object))
+
+
+def _round(values: pd.Series, decimals: int) -> pd.Series:
+    """Round half away from zero, like BigQuery's round() (numpy rounds half to even)."""
+    scale = 10.0**decimals
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5) / scale
+
+
+def _parse_lines(lines: Iterable[str]) -> Corpus:
+    """Articles and keywords of one slim file (article = row number within the file)."""
+    article_ids: list[str] = []
+    pub_dates: list[str | None] = []
+    sections: list[str | None] = []
+    desks: list[str | None] = []
+    materials: list[str | None] = []
+    word_counts: list[int] = []
+    author_counts: list[int] = []
+    has_authors: list[bool] = []
+    keyword_counts: list[int] = []
+    has_multimedia: list[bool] = []
+    kw_rows: list[int] = []
+    kw_names: list[str | None] = []
+    kw_values: list[str | None] = []
+    seen: set[str] = set()
+
+    for line in lines:
+        if not line.strip():
+            continue
+        rec = json.loads(line)
+        article_id = rec.get("article_id")
+        if article_id is None or article_id in seen:
+            continue
+        seen.add(article_id)
+        row = len(article_ids)
+        article_ids.append(article_id)
+        pub_date = rec.get("pub_date")
+        pub_dates.append(pub_date[:10] if pub_date else None)
+        sections.append(rec.get("section_name"))
+        desks.append(rec.get("news_desk"))
+        materials.append(rec.get("type_of_material"))
+        word_counts.append(rec.get("word_count") or 0)
+        persons = rec.get("byline_person") or []
+        has_authors.append(bool(persons))
+        # int_authors_flattened keeps persons with a first or last name
+        author_counts.append(
+            sum(
+                1
+                for p in persons
+                if p.get("firstname") is not None or p.get("lastname") is not None
+            )
+        )
+        keywords = rec.get("keywords") or []
+        keyword_counts.append(len(keywords))
+        for kw in keywords:
+            kw_rows.append(row)
+            kw_names.append(kw.get("name"))
+            kw_values.append(kw.get("value"))
+        has_multimedia.append(rec.get("multimedia_count_by_type") is not None)
+
+    dates = pd.to_datetime(pd.Series(pub_dates, dtype=object), format="%Y-%m-%d", errors="coerce")
+    articles = pd.DataFrame(
+        {
+            "article_id": article_ids,
+            "pub_date": dates,
+            "pub_year": dates.dt.year.astype("Int64"),
+            "pub_month": dates.dt.to_period("M").dt.start_time,
+            "section_name": _category(sections),
+            "news_desk": _category(desks),
+            "type_of_material": _category(materials),
+            "word_count": np.asarray(word_counts, dtype=np.int64),
+            "author_count": np.asarray(author_counts, dtype=np.int64),
+            "keyword_count": np.asarray(keyword_counts, dtype=np.int64),
+            "has_authors": np.asarray(has_authors, dtype=bool),
+            "has_keywords": np.asarray(keyword_counts, dtype=np.int64) > 0,
+            "has_multimedia": np.asarray(has_multimedia, dtype=bool),
+        }
+    )
+    keywords_frame = pd.DataFrame(
+        {
+            "article": np.asarray(kw_rows, dtype=np.int64),
+            "keyword_name": pd.Categorical(kw_names),
+            "keyword_value": pd.Categorical(kw_values),
+        }
+    )
+    return Corpus(articles, keywords_frame)
+
+
+def _read_file(path: Path) -> Corpus:
+    with open(path) as f:
+        return _parse_lines(f)
+
+
+def _read_cached(path: Path, cache_dir: Path, slim_dir: Path) -> Corpus:
+    """_read_file through a pickle per slim file, valid while its size and mtime match."""
+    cache_path = cache_dir / path.relative_to(slim_dir).with_suffix(".pkl")
+    stat = path.stat()
+    if cache_path.exists():
+        cached = pd.read_pickle(cache_path)
+        if (cached["size"], cached["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return Corpus(cached["articles"], cached["keywords"])
+    part = _read_file(path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    pd.to_pickle(
+        {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "articles": part.articles,
+            "keywords": part.keywords,
+        },
+        cache_path,
+    )
+    return part
+
+
+def _concat_categoricals(frames: list[pd.DataFrame], column: str) -> pd.Categorical:
+    return union_categoricals([frame[column] for frame in frames], ignore_order=True)
+
+
+def load_corpus(
+    paths: Iterable[Path], cache_dir: Path | None = None, slim_dir: Path = SLIM_DIR
+) -> Corpus:
+    """
+    Read slim NDJSON files into the articles and keywords frames.
+
+    With cache_dir, each file's frames are cached there (paths must be under
+    slim_dir), so later runs skip JSON parsing for unchanged files.
+    """
+    parts = [
+        _read_cached(path, cache_dir, slim_dir) if cache_dir else _read_file(path) for path in paths
+    ]
+    if not parts:
+        return _parse_lines([])
+
+    frames = [part.articles for part in parts]
+    articles = pd.concat(frames, ignore_index=True)
+    for column in ("section_name", "news_desk", "type_of_material"):
+        articles[column] = _concat_categoricals(frames, column)
+
+    # Keyword rows point at file-local article rows: shift them to corpus rows
+    offsets = np.cumsum([0] + [len(frame) for frame in frames[:-1]])
+    kw_frames = [part.keywords for part in parts]
+    keywords = pd.concat(kw_frames, ignore_index=True)
+    keywords["article"] = np.concatenate(
+        [frame["article"].to_numpy() + offset for frame, offset in zip(kw_frames, offsets)]
+    )
+    for column in ("keyword_name", "keyword_value"):
+        keywords[column] = _concat_categoricals(kw_frames, column)
+
+    # An article in several files is kept once, from the first file
+    keep = ~articles["article_id"].duplicated().to_numpy()
+    if not keep.all():
+        new_rows = np.cumsum(keep) - 1
+        articles = articles[keep].reset_index(drop=True)
+        kw_keep = keep[keywords["article"].to_numpy()]
+        keywords = keywords[kw_keep].reset_index(drop=True)
+        keywords["article"] = new_rows[keywords["article"].to_numpy()]
+    return Corpus(articles, keywords)
+
+
+def articles_by_month(corpus: Corpus) -> pd.DataFrame:
+    """agg_articles_by_month: one row per pub_month."""
+    articles = corpus.articles.dropna(subset=["pub_date"])
+    out = (
+        articles.groupby("pub_month", sort=True, observed=True)
+        .agg(
+            total_articles=("article_id", "size"),
+            avg_word_count=("word_count", "mean"),
+            total_word_count=("word_count", "sum"),
+            max_word_count=("word_count", "max"),
+            articles_with_authors=("has_authors", "sum"),
+            articles_with_keywords=("has_keywords", "sum"),
+            articles_with_multimedia=("has_multimedia", "sum"),
+            avg_authors_per_article=("author_count", "mean"),
+            avg_keywords_per_article=("keyword_count", "mean"),
+            unique_sections=("section_name", "nunique"),
+            unique_news_desks=("news_desk", "nunique"),
+            unique_material_types=("type_of_material", "nunique"),
+        )
+        .reset_index()
+    )
+    out["avg_word_count"] = _round(out["avg_word_count"], 0)
+    out["avg_authors_per_article"] = _round(out["avg_authors_per_article"], 2)
+    out["avg_keywords_per_article"] = _round(out["avg_keywords_per_article"], 2)
+    for column in ("authors", "keywords", "multimedia"):
+        out[f"pct_with_{column}"] = _round(
+            100.0 * out[f"articles_with_{column}"] / out["total_articles"], 1
+        )
+    return out
+
+
+def section_trends(corpus: Corpus) -> pd.DataFrame:
+    """agg_section_trends: one row per (section_name, news_desk, pub_year)."""
+    articles = corpus.articles.dropna(subset=["pub_year"])
+    keys = ["section_name", "news_desk", "pub_year"]
+    out = (
+        articles.groupby(keys, observed=True)
+        .agg(
+            article_count=("article_id", "size"),
+            avg_word_count=("word_count", "mean"),
+            total_word_count=("word_count", "sum"),
+            articles_with_authors=("has_authors", "sum"),
+            articles_with_keywords=("has_keywords", "sum"),
+            avg_authors=("author_count", "mean"),
+            avg_keywords=("keyword_count", "mean"),
+        )
+        .reset_index()
+        .sort_values(keys, ignore_index=True)
+    )
+    out["year_total"] = out["pub_year"].map(articles.groupby("pub_year").size())
+    out["pct_of_year_total"] = _round(100.0 * out["article_count"] / out["year_total"], 2)
+    out["avg_word_count"] = _round(out["avg_word_count"], 0)
+    out["avg_authors"] = _round(out["avg_authors"], 2)
+    out["avg_keywords"] = _round(out["avg_keywords"], 2)
+
+    # lag() over the years the section/desk has articles in
+    prior = out.groupby(["section_name", "news_desk"], observed=True)["article_count"].shift()
+    out["prior_year_count"] = prior.astype("Int64")
+    _add_yoy(out)
+
+    columns = [
+        "section_name",
+        "news_desk",
+        "pub_year",
+        "article_count",
+        "year_total",
+        "pct_of_year_total",
+        "avg_word_count",
+        "total_word_count",
+        "articles_with_authors",
+        "articles_with_keywords",
+        "avg_authors",
+        "avg_keywords",
+        "prior_year_count",
+        "yoy_change",
+        "yoy_change_pct",
+    ]
+    order = out.sort_values(["pub_year", "article_count"], ascending=[True, False], kind="stable")
+    return order[columns].reset_index(drop=True)
+
+
+def keyword_trends(corpus: Corpus) -> pd.DataFrame:
+    """agg_keyword_trends: one row per (keyword_name, keyword_value, pub_year)."""
+    keywords = corpus.keywords
+    # Blank values are filtered once per dictionary entry, not per row
+    values = keywords["keyword_value"].cat
+    blank = np.asarray(values.categories.str.strip() == "", dtype=bool)
+    codes = values.codes.to_numpy()
+    valid = codes >= 0
+    valid[valid] = ~blank[codes[valid]]
+
+    years = corpus.articles["pub_year"].to_numpy(dtype="float64", na_value=np.nan)
+    frame = keywords[valid].assign(pub_year=years[keywords["article"].to_numpy()[valid]])
+    frame = frame.dropna(subset=["pub_year"]).astype({"pub_year": "int64"})
+
+    keys = ["keyword_name", "keyword_value", "pub_year"]
+    grouped = frame.groupby(keys, observed=True, dropna=False)
+    occurrences = grouped.size()
+    article_counts = (
+        frame.drop_duplicates(keys + ["article"]).groupby(keys, observed=True, dropna=False).size()
+    )
+    out = pd.DataFrame(
+        {"article_count": article_counts, "keyword_occurrences": occurrences}
+    ).reset_index()
+
+    out = out.sort_values(
+        ["pub_year", "article_count", "keyword_value", "keyword_name"],
+        ascending=[True, False, True, True],
+        kind="stable",
+        ignore_index=True,
+    )
+    out["rank_in_year"] = out.groupby("pub_year").cumcount() + 1
+
+    prior = out[keys + ["article_count", "rank_in_year"]].rename(
+        columns={"article_count": "prior_year_count", "rank_in_year": "prior_year_rank"}
+    )
+    prior["pub_year"] += 1
+    out = out.merge(prior, on=keys, how="left")
+    out["prior_year_count"] = out["prior_year_count"].astype("Int64")
+    out["prior_year_rank"] = out["prior_year_rank"].astype("Int64")
+    _add_yoy(out)
+    out["rank_change"] = out["prior_year_rank"].fillna(0) - out["rank_in_year"]
+    return out[
+        keys
+        + [
+            "article_count",
+            "keyword_occurrences",
+            "rank_in_year",
+            "prior_year_count",
+            "yoy_change",
+            "yoy_change_pct",
+            "prior_year_rank",
+            "rank_change",
+        ]
+    ]
+
+
+def _add_yoy(out: pd.DataFrame) -> None:
+    prior = out["prior_year_count"]
+    out["yoy_change"] = out["article_count"] - prior.fillna(0)
+    pct = 100.0 * (out["article_count"] - prior) / prior
+    out["yoy_change_pct"] = _round(pct.astype("float64"), 1).where(prior.fillna(0) > 0)
+
+
+def main():
+    paths = sorted(SLIM_DIR.glob("*/*.ndjson"))
+    if not paths:
+        print(f"No slim files found in {SLIM_DIR}. Run archive transform first.")
+        return
+
+    start = time.perf_counter()
+    corpus = load_corpus(paths, cache_dir=CACHE_DIR)
+    print(
+        f"Loaded {len(corpus.articles)} articles and {len(corpus.keywords)} keywords "
+        f"from {len(paths)} files in {time.perf_counter() - start:.1f}s"
+    )
+
+    ANALYTICS_DIR.mkdir(exist_ok=True)
+    for name, aggregate in (
+        ("agg_articles_by_month", articles_by_month),
+        ("agg_section_trends", section_trends),
+        ("agg_keyword_trends", keyword_trends),
+    ):
+        start = time.perf_counter()
+        frame = aggregate(corpus)
+        elapsed = time.perf_counter() - start
+        frame.to_csv(ANALYTICS_DIR / f"{name}.csv", index=False)
+        print(f"  {name}: {len(frame)} rows in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+NYT Archive API – catalog of slim files built from their stats sidecars.
+
+Aggregates archive_slim/YYYY/MM.stats.json (see archive.stats) into one index,
+archive_slim/catalog.json, keyed by the slim file path relative to archive_slim/.
+Missing or stale sidecars are recomputed. Tools can then prune files by pub_date
+range and section, or check loaded row counts, without reading any NDJSON.
+
+  python -m archive.catalog            # build catalog.json
+  python -m archive.catalog --verify   # also recompute sidecars whose SHA-256 differs
+"""
+
+import json
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+from archive.stats import read_stats, write_stats
+from archive.transform import SLIM_DIR
+
+CATALOG_FILE = "catalog.json"
+
+
+def build_catalog(slim_dir: Path = SLIM_DIR, verify_hash: bool = False) -> dict:
+    """Catalog of every slim file in slim_dir, refreshing missing or stale sidecars."""
+    files: dict[str, dict] = {}
+    refreshed = 0
+    for slim_path in sorted(slim_dir.glob("*/*.ndjson")):
+        stats = read_stats(slim_path, verify_hash=verify_hash)
+        if stats is None:
+            stats = write_stats(slim_path)
+            refreshed += 1
+        files[slim_path.relative_to(slim_dir).as_posix()] = stats
+    if refreshed:
+        print(f"  Recomputed {refreshed} missing or stale sidecar(s).")
+    return {
+        "generated_at": datetime.now(UTC).isoformat(),
+        "file_count": len(files),
+        "record_count": sum(s["record_count"] for s in files.values()),
+        "files": files,
+    }
+
+
+def write_catalog(catalog: dict, slim_dir: Path = SLIM_DIR) -> Path:
+    path = slim_dir / CATALOG_FILE
+    with open(path, "w") as f:
+        json.dump(catalog, f, indent=2)
+        f.write("\n")
+    return path
+
+
+def load_catalog(slim_dir: Path = SLIM_DIR) -> dict | None:
+    path = slim_dir / CATALOG_FILE
+    if not path.exists():
+        return None
+    with open(path) as f:
+        catalog: dict = json.load(f)
+    return catalog
+
+
+def prune(
+    catalog: dict,
+    start: str | None = None,
+    end: str | None = None,
+    sections: list[str] | None = None,
+) -> list[str]:
+    """
+    Files that may hold articles published in [start, end] (YYYY-MM-DD, inclusive)
+    in any of sections. Files without pub_dates are kept unless a range is given.
+    """
+    wanted = set(sections) if sections else None
+    selected = []
+    for path, stats in catalog["files"].items():
+        if start or end:
+            if stats["min_pub_date"] is None:
+                continue
+            if start and stats["max_pub_date"] < start:
+                continue
+            if end and stats["min_pub_date"] > end:
+                continue
+        if wanted is not None and wanted.isdisjoint(stats["sections"]):
+            continue
+        selected.append(path)
+    return selected
+
+
+def main():
+    if not SLIM_DIR.exists():
+        print(f"No slim files found in {SLIM_DIR}. Run archive transform first.")
+        return
+
+    catalog = build_catalog(verify_hash="--verify" in sys.argv)
+    path = write_catalog(catalog)
+    print(
+        f"Catalog written to {path}: {catalog['file_count']} files, "
+        f"{catalog['record_count']} records."
+    )
+
+
+if __name__ == "__main__":
+    main()
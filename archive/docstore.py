@@ -0,0 +1,199 @@
+"""
+NYT Archive API – embedded store of raw archive documents (SQLite).
+
+Built once from archive_raw/YYYY/MM.json, the store holds each raw doc as compact
+JSON keyed by its month and position in the raw file, with indexes on _id and
+pub_date. Re-extracting a field,
+looking up one article or reading a few months then costs a query instead of parsing
+the ~20MB monthly files. archive.transform reads from it with --docstore.
+
+Builds are incremental: a month is reloaded only when its raw file's size or mtime
+changed. Docs without an _id are not stored. Every other doc is kept, in raw file
+order, so each month reads back exactly its raw file: an _id repeated within a month
+is stored twice, and one that also appears in another month is kept in both and
+reported as a warning. get() returns the latest copy.
+
+  python -m archive.docstore build
+  python -m archive.docstore get <_id>
+"""
+
+import json
+import sqlite3
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+RAW_DIR = Path("archive_raw")
+DOCSTORE_PATH = Path("archive_docstore.sqlite")
+
+# Bumped when the tables change; an older store is dropped and rebuilt by the next build
+SCHEMA_VERSION = 3
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    ordinal INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    pub_date TEXT,
+    doc TEXT NOT NULL,
+    PRIMARY KEY (year, month, ordinal)
+);
+CREATE INDEX IF NOT EXISTS docs_id ON docs (id);
+CREATE INDEX IF NOT EXISTS docs_pub_date ON docs (pub_date);
+CREATE TABLE IF NOT EXISTS months (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL,
+    raw_mtime_ns INTEGER NOT NULL,
+    doc_count INTEGER NOT NULL,
+    PRIMARY KEY (year, month)
+);
+"""
+
+
+def connect(db_path: Path = DOCSTORE_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version < SCHEMA_VERSION:
+        conn.executescript("DROP TABLE IF EXISTS docs; DROP TABLE IF EXISTS months;")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def load_month(conn: sqlite3.Connection, raw_path: Path, year: int, month: int) -> int | None:
+    """
+    Store the docs of one raw month file, replacing what was stored for that month.
+    Returns the number of docs stored, or None if the month is already up to date.
+    """
+    stat = raw_path.stat()
+    stored = conn.execute(
+        "SELECT raw_size, raw_mtime_ns FROM months WHERE year = ? AND month = ?",
+        (year, month),
+    ).fetchone()
+    if stored == (stat.st_size, stat.st_mtime_ns):
+        return None
+
+    with open(raw_path) as f:
+        docs = json.load(f).get("response", {}).get("docs", [])
+    # ordinal is the position in the raw file, so iter_month keeps raw order
+    rows = [
+        (
+            year,
+            month,
+            ordinal,
+            doc["_id"],
+            doc.get("pub_date"),
+            json.dumps(doc, separators=(",", ":")),
+        )
+        for ordinal, doc in enumerate(docs)
+        if doc.get("_id")
+    ]
+    with conn:
+        conn.execute("DELETE FROM docs WHERE year = ? AND month = ?", (year, month))
+        stored = conn.executemany("INSERT INTO docs VALUES (?, ?, ?, ?, ?, ?)", rows).rowcount
+        for doc_id, other_year, other_month in conn.execute(
+            """
+            SELECT DISTINCT d.id, other.year, other.month
+            FROM docs d
+            JOIN docs other ON other.id = d.id
+                AND (other.year != d.year OR other.month != d.month)
+            WHERE d.year = ? AND d.month = ?
+            ORDER BY d.id, other.year, other.month
+            """,
+            (year, month),
+        ):
+            print(
+                f"  Warning: _id {doc_id} of {year}/{month:02d} is also in "
+                f"{other_year}/{other_month:02d} (kept in both)"
+            )
+        conn.execute(
+            "INSERT OR REPLACE INTO months VALUES (?, ?, ?, ?, ?)",
+            (year, month, stat.st_size, stat.st_mtime_ns, stored),
+        )
+    return stored
+
+
+def build(conn: sqlite3.Connection, raw_dir: Path = RAW_DIR) -> int:
+    """Load every new or changed raw month file; returns the number of months loaded."""
+    loaded = 0
+    for raw_path in sorted(raw_dir.glob("*/*.json")):
+        year, month = int(raw_path.parent.name), int(raw_path.stem)
+        count = load_month(conn, raw_path, year, month)
+        if count is not None:
+            print(f"  Stored {year}/{month:02d} ({count} docs).")
+            loaded += 1
+    return loaded
+
+
+def get(conn: sqlite3.Connection, doc_id: str) -> dict | None:
+    """The doc with this _id; the latest copy if it is stored more than once."""
+    row = conn.execute(
+        "SELECT doc FROM docs WHERE id = ? ORDER BY year DESC, month DESC, ordinal DESC LIMIT 1",
+        (doc_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    doc: dict = json.loads(row[0])
+    return doc
+
+
+def months(conn: sqlite3.Connection) -> list[tuple[int, int]]:
+    """(year, month) of every stored month, oldest first."""
+    return [
+        (year, month)
+        for year, month in conn.execute("SELECT year, month FROM months ORDER BY year, month")
+    ]
+
+
+def has_month(conn: sqlite3.Connection, year: int, month: int) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM months WHERE year = ? AND month = ?", (year, month)
+    ).fetchone()
+    return row is not None
+
+
+def iter_month(conn: sqlite3.Connection, year: int, month: int) -> Iterator[dict]:
+    """Docs of one month, in raw file order."""
+    cursor = conn.execute(
+        "SELECT doc FROM docs WHERE year = ? AND month = ? ORDER BY ordinal", (year, month)
+    )
+    for (doc,) in cursor:
+        yield json.loads(doc)
+
+
+def iter_pub_dates(conn: sqlite3.Connection, start: str, end: str) -> Iterator[dict]:
+    """Docs with start <= pub_date[:10] <= end (YYYY-MM-DD), oldest first."""
+    cursor = conn.execute(
+        "SELECT doc FROM docs WHERE pub_date >= ? AND pub_date < ? ORDER BY pub_date",
+        (start, end + "\uffff"),
+    )
+    for (doc,) in cursor:
+        yield json.loads(doc)
+
+
+def main():
+    args = sys.argv[1:]
+    if args == ["build"]:
+        if not RAW_DIR.exists():
+            print(f"No raw files found in {RAW_DIR}. Run archive ingest first.")
+            return
+        conn = connect()
+        loaded = build(conn)
+        print(f"Loaded {loaded} month(s) into {DOCSTORE_PATH}.")
+        return
+
+    if len(args) == 2 and args[0] == "get":
+        if not DOCSTORE_PATH.exists():
+            print(f"No doc store at {DOCSTORE_PATH}. Run: python -m archive.docstore build")
+            return
+        doc = get(connect(), args[1])
+        print(json.dumps(doc, indent=2) if doc else f"No document with _id {args[1]!r}")
+        return
+
+    print("Usage: python -m archive.docstore build | python -m archive.docstore get <_id>")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,19 @@
 NYT Archive API – ingestion only.
 
 Fetches raw archive JSON per month and saves to archive_raw/YYYY/MM.json.
-Uses 12 seconds sleep between API calls to respect rate limits.
+Requests go through a KeyPool (common/key_pool.py): each key waits SLEEP_SECONDS
+between its own calls and has a daily budget, so N keys fetch about N times as fast.
 Skips months that already exist in GCS (idempotent, safe to resume when GCS_BUCKET is set).
+
+Sharded mode (ARCHIVE_LEASE_STORE set): several workers claim disjoint month ranges
+through lease files in a shared store (gs://... or a local directory); see
+archive/leases.py. Each worker keeps its own rate budget (its key pool and
+ARCHIVE_MAX_REQUESTS per run), so give each worker its own API keys.
 """
 
 import json
 import os
 import subprocess
-import time
 from pathlib import Path
 from typing import Any, cast
 
@@ -17,16 +22,27 @@ import requests
 from dotenv import load_dotenv
 from requests.exceptions import HTTPError
 
+from archive import leases
+from common.key_pool import KeyPool
+
 load_dotenv()
-API_KEY = os.getenv("NYTIMES_API_KEY")
 BASE_URL = "https://api.nytimes.com/svc/archive/v1"
-SLEEP_SECONDS = 13  # 12 seconds is the minimum per rate limits
+SLEEP_SECONDS = 13  # per key; 12 seconds is the minimum per rate limits
 RAW_DIR = Path("archive_raw")
 GCS_BUCKET = os.getenv("GCS_BUCKET")
 GCS_PREFIX = os.getenv("GCS_PREFIX", "nyt-ingest")
 # Last 100 years (Archive API supports up to 2019 per spec)
 START_YEAR = 1920
 END_YEAR = 2020  # exclusive, so 1920..2019 (100 years)
+LEASE_STORE = os.getenv("ARCHIVE_LEASE_STORE")
+LEASE_TTL_SECONDS = int(os.getenv("ARCHIVE_LEASE_TTL_SECONDS", "900"))
+SHARD_MONTHS = int(os.getenv("ARCHIVE_SHARD_MONTHS", "12"))
+# The lease is renewed before each month, so waiting for key budget must leave most of
+# the TTL for the request itself; half still covers a 429 cooldown (300s by default)
+KEY_WAIT_SECONDS = LEASE_TTL_SECONDS / 2
+KEY_POOL = KeyPool.from_env(
+    "archive_keys.json", min_interval=SLEEP_SECONDS, max_wait=KEY_WAIT_SECONDS
+)
 
 
 def exists_in_gcs(year: int, month: int) -> bool:
@@ -44,15 +60,20 @@ def exists_in_gcs(year: int, month: int) -> bool:
 
 def fetch_archive(year: int, month: int) -> dict | None:
     """Fetch raw archive JSON for a given month. Returns None on error."""
-    if not API_KEY:
-        print("Error: Set NYTIMES_API_KEY in your .env file.")
+    if not KEY_POOL.keys:
+        print("Error: Set NYTIMES_API_KEY (or NYTIMES_API_KEYS) in your .env file.")
+        return None
+    api_key = KEY_POOL.acquire()
+    if api_key is None:
+        print("Error: No API key has budget left. Re-run later to resume.")
         return None
 
     url = f"{BASE_URL}/{year}/{month}.json"
-    params = {"api-key": API_KEY}
+    params = {"api-key": api_key}
 
     print(f"Requesting: {url}")
     response = requests.get(url, params=params)
+    KEY_POOL.report(api_key, response.status_code)
 
     if response.status_code == 401:
         print("Error: Unauthorized. Check that your API key is valid.")
@@ -97,26 +118,89 @@ def ingest_month(year: int, month: int, skip_existing: bool = True) -> str:
     return "fetched"
 
 
+def run_worker(
+    store: leases.LeaseStore,
+    worker_id: str,
+    shards: list[leases.Shard],
+    max_requests: int = 0,
+    ttl_seconds: float = LEASE_TTL_SECONDS,
+) -> int:
+    """
+    Claim shards until none are left or max_requests is reached; returns requests made.
+
+    The lease is renewed before every month, so ttl_seconds only has to cover one
+    request plus the wait for key budget (at most KEY_POOL.max_wait, half the TTL). A
+    shard with failed months is released unfinished for another worker (or a later
+    run) to retry; a lost lease stops work on the shard.
+    """
+    requests_this_run = 0
+    if KEY_POOL.max_wait >= ttl_seconds:
+        print(
+            f"[{worker_id}] Warning: key wait ({KEY_POOL.max_wait:.0f}s) is not shorter than "
+            f"the lease TTL ({ttl_seconds:.0f}s); a month may outlive its lease."
+        )
+
+    while shard := leases.claim_next(store, shards, worker_id, ttl_seconds):
+        print(f"[{worker_id}] Claimed shard {shard.shard_id}")
+        failed = False
+        for year, month in shard.months:
+            out_of_budget = KEY_POOL.exhausted()
+            if out_of_budget or (max_requests > 0 and requests_this_run >= max_requests):
+                reason = "No API key has budget left" if out_of_budget else "Reached limit"
+                print(f"[{worker_id}] {reason} after {requests_this_run} requests this run.")
+                leases.release(store, shard, worker_id)
+                return requests_this_run
+            if not leases.renew(store, shard, worker_id, ttl_seconds):
+                print(f"[{worker_id}] Lost lease on {shard.shard_id}; moving on.")
+                break
+
+            # The key pool spaces each key's requests; no sleep needed here
+            result = ingest_month(year, month)
+            if result in ("fetched", "error"):
+                requests_this_run += 1
+            failed = failed or result == "error"
+        else:
+            if failed:
+                leases.release(store, shard, worker_id)
+                # Leave the shard to other workers; it is retried on the next run
+                shards = [s for s in shards if s != shard]
+            else:
+                leases.complete(store, shard, worker_id)
+                print(f"[{worker_id}] Completed shard {shard.shard_id}")
+    return requests_this_run
+
+
 def main():
-    months_to_fetch = [(y, m) for y in range(START_YEAR, END_YEAR) for m in range(1, 13)]
     max_requests = int(os.getenv("ARCHIVE_MAX_REQUESTS", "0"))
+    if not KEY_POOL.keys:
+        print("Error: Set NYTIMES_API_KEY (or NYTIMES_API_KEYS) in your .env file.")
+        return
+    print(f"Using {len(KEY_POOL)} API key(s).")
+    if LEASE_STORE:
+        worker_id = os.getenv("ARCHIVE_WORKER_ID") or f"worker-{os.getpid()}"
+        shards = leases.make_shards(START_YEAR, END_YEAR, SHARD_MONTHS)
+        made = run_worker(leases.open_store(LEASE_STORE), worker_id, shards, max_requests)
+        print(f"[{worker_id}] Done: {made} requests this run.")
+        return
+
+    months_to_fetch = [(y, m) for y in range(START_YEAR, END_YEAR) for m in range(1, 13)]
     requests_this_run = 0
-    previous_made_request = False
 
     for year, month in months_to_fetch:
         if max_requests > 0 and requests_this_run >= max_requests:
             print(f"Reached limit of {max_requests} requests this run. Re-run to resume.")
             break
-        # Sleep only after an actual API call (rate limit), not when we skipped (already in GCS)
-        if previous_made_request:
-            print(f"Sleeping {SLEEP_SECONDS} seconds before next request...")
-            time.sleep(SLEEP_SECONDS)
+        if KEY_POOL.exhausted():
+            print("No API key has budget left. Re-run later to resume.")
+            break
 
+        # The key pool spaces each key's requests (skipped months cost nothing)
         result = ingest_month(year, month)
-        previous_made_request = result in ("fetched", "error")
-        if previous_made_request:
+        if result in ("fetched", "error"):
             requests_this_run += 1
 
+    print(f"Day budget left per key: {KEY_POOL.remaining_today()}")
+
 
 if __name__ == "__main__":
     main()
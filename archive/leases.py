@@ -0,0 +1,199 @@
+"""
+NYT Archive API – lease-based coordination for sharded ingest.
+
+The (year, month) range is split into shards of consecutive months. Workers (job
+matrix entries or local processes) claim a shard by writing a lease record to a
+shared store with compare-and-swap, renew it while they work, and mark it done at
+the end. A lease that is not renewed before it expires (the worker died or hit its
+limit) is reclaimed by the next worker that looks at it.
+
+Lease record (JSON, one object per shard):
+  {"shard": "1920-01_1920-12", "owner": "run-1", "expires_at": 1760000000.0, "done": false}
+
+Stores:
+  LocalLeaseStore – a directory shared by local processes (compare-and-swap under flock)
+  GcsLeaseStore   – gs://bucket/prefix, compare-and-swap with generation preconditions
+"""
+
+import fcntl
+import json
+import os
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+
+@dataclass(frozen=True)
+class Shard:
+    """A run of consecutive months claimed as one unit."""
+
+    shard_id: str
+    months: tuple[tuple[int, int], ...]
+
+
+def make_shards(start_year: int, end_year: int, months_per_shard: int = 12) -> list[Shard]:
+    """Split start_year..end_year (exclusive) into shards of months_per_shard months."""
+    months = [(y, m) for y in range(start_year, end_year) for m in range(1, 13)]
+    shards = []
+    for i in range(0, len(months), months_per_shard):
+        chunk = tuple(months[i : i + months_per_shard])
+        (first_y, first_m), (last_y, last_m) = chunk[0], chunk[-1]
+        shard_id = f"{first_y}-{first_m:02d}_{last_y}-{last_m:02d}"
+        shards.append(Shard(shard_id, chunk))
+    return shards
+
+
+class LeaseStore(Protocol):
+    """Shared key-value store with compare-and-swap on a version token."""
+
+    def read(self, shard_id: str) -> tuple[dict | None, str | None]:
+        """Return (lease, token); (None, None) if the shard has no lease yet."""
+        ...
+
+    def write(self, shard_id: str, lease: dict, token: str | None) -> bool:
+        """Write lease if the stored token still equals token (None: must not exist)."""
+        ...
+
+
+class LocalLeaseStore:
+    """Lease files in a local directory; an flock on .lock serializes compare-and-swap."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, shard_id: str) -> Path:
+        return self.root / f"{shard_id}.json"
+
+    def read(self, shard_id: str) -> tuple[dict | None, str | None]:
+        try:
+            record = json.loads(self._path(shard_id).read_text())
+        except FileNotFoundError:
+            return None, None
+        return record["lease"], str(record["version"])
+
+    def write(self, shard_id: str, lease: dict, token: str | None) -> bool:
+        with open(self.root / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            _, current = self.read(shard_id)
+            if current != token:
+                return False
+            version = int(current or 0) + 1
+            path = self._path(shard_id)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({"version": version, "lease": lease}))
+            os.replace(tmp_path, path)
+            return True
+
+
+class GcsLeaseStore:
+    """
+    Lease objects under gs://bucket/prefix, written with gsutil.
+
+    The object generation is the token: reads fetch exactly the generation they
+    stat, and writes carry an x-goog-if-generation-match precondition (0 = create only),
+    so two workers can never both win the same shard.
+    """
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+
+    def _object(self, shard_id: str) -> str:
+        return f"{self.url}/{shard_id}.json"
+
+    def read(self, shard_id: str) -> tuple[dict | None, str | None]:
+        obj = self._object(shard_id)
+        stat = subprocess.run(["gsutil", "stat", obj], capture_output=True, text=True)
+        if stat.returncode != 0:
+            return None, None
+        generation = next(
+            line.split(":", 1)[1].strip()
+            for line in stat.stdout.splitlines()
+            if line.strip().startswith("Generation:")
+        )
+        cat = subprocess.run(
+            ["gsutil", "cat", f"{obj}#{generation}"], capture_output=True, text=True
+        )
+        if cat.returncode != 0:
+            # Overwritten between stat and cat: report the stale token so the CAS fails
+            return {}, generation
+        return json.loads(cat.stdout), generation
+
+    def write(self, shard_id: str, lease: dict, token: str | None) -> bool:
+        result = subprocess.run(
+            [
+                "gsutil",
+                "-q",
+                "-h",
+                f"x-goog-if-generation-match:{token or 0}",
+                "-h",
+                "Content-Type:application/json",
+                "cp",
+                "-",
+                self._object(shard_id),
+            ],
+            input=json.dumps(lease),
+            capture_output=True,
+            text=True,
+        )
+        return result.returncode == 0
+
+
+def open_store(location: str) -> LeaseStore:
+    """GcsLeaseStore for gs:// locations, LocalLeaseStore for directories."""
+    if location.startswith("gs://"):
+        return GcsLeaseStore(location)
+    return LocalLeaseStore(Path(location))
+
+
+def _lease(shard_id: str, owner: str, ttl_seconds: float, done: bool = False) -> dict:
+    return {
+        "shard": shard_id,
+        "owner": owner,
+        "expires_at": time.time() + ttl_seconds,
+        "done": done,
+    }
+
+
+def claim_next(
+    store: LeaseStore, shards: list[Shard], worker_id: str, ttl_seconds: float
+) -> Shard | None:
+    """Claim the first shard that is unleased, or whose lease expired before it was done."""
+    for shard in shards:
+        lease, token = store.read(shard.shard_id)
+        if lease is not None:
+            if lease.get("done"):
+                continue
+            if lease.get("owner") != worker_id and lease.get("expires_at", 0) > time.time():
+                continue
+        if store.write(shard.shard_id, _lease(shard.shard_id, worker_id, ttl_seconds), token):
+            return shard
+    return None
+
+
+def _update_own(store: LeaseStore, shard_id: str, worker_id: str, new_lease: dict) -> bool:
+    lease, token = store.read(shard_id)
+    if not lease or lease.get("owner") != worker_id or lease.get("done"):
+        return False
+    return store.write(shard_id, new_lease, token)
+
+
+def renew(store: LeaseStore, shard: Shard, worker_id: str, ttl_seconds: float) -> bool:
+    """Extend a lease this worker holds; False if it was lost (expired and reclaimed)."""
+    return _update_own(
+        store, shard.shard_id, worker_id, _lease(shard.shard_id, worker_id, ttl_seconds)
+    )
+
+
+def complete(store: LeaseStore, shard: Shard, worker_id: str) -> bool:
+    """Mark a shard done so no worker claims it again."""
+    return _update_own(
+        store, shard.shard_id, worker_id, _lease(shard.shard_id, worker_id, 0, done=True)
+    )
+
+
+def release(store: LeaseStore, shard: Shard, worker_id: str) -> bool:
+    """Give a shard back unfinished (expires now) so another worker can take it."""
+    return _update_own(store, shard.shard_id, worker_id, _lease(shard.shard_id, worker_id, 0))
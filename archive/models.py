@@ -55,3 +55,5 @@ class SlimArticle(BaseModel):
     byline_person: list[BylinePerson] = Field(default_factory=list)
     # None instead of {} for BigQuery compatibility
     multimedia_count_by_type: dict[str, int] | None = None
+    # Normalized uri/web_url join key shared with Most Popular (see common.keys)
+    article_key: str | None = None
@@ -0,0 +1,287 @@
+"""
+NYT Archive API – local full-text search index over slim NDJSON.
+
+Builds an on-disk inverted index from archive_slim/YYYY/MM.ndjson (headline,
+abstract and snippet) and answers keyword queries from it without scanning the
+archive. Index layout in SEARCH_DIR:
+
+  terms.json   term -> [offset, length, doc_freq] into postings.bin
+  postings.bin posting lists: ascending doc ids, delta + varint encoded
+  docs.ndjson  one line per doc id (article_id, pub_date, headline_main, web_url)
+  docs.idx     byte offset of each docs.ndjson line (uint64 array)
+  meta.json    doc count and indexed fields
+
+Doc ids follow the order of the slim files (oldest month first), so results are
+returned newest first by walking the intersection backwards. Large archives are
+indexed in blocks of BLOCK_DOCS documents that are merged term by term at the end.
+
+  python -m archive.search build
+  python -m archive.search "moon landing"
+"""
+
+import json
+import shutil
+import sys
+import unicodedata
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from archive.transform import SLIM_DIR
+
+SEARCH_DIR = Path("archive_search")
+SEARCH_FIELDS = ("headline_main", "abstract", "snippet")
+DOC_FIELDS = ("article_id", "pub_date", "headline_main", "web_url")
+BLOCK_DOCS = 500_000
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has he in is it its of on or that the to was were "
+    "will with".split()
+)
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercase, strip accents, split on non-alphanumerics; drop stopwords and 1-char tokens."""
+    if not text:
+        return []
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    tokens = []
+    word = []
+    for ch in normalized:
+        if ch.isalnum():
+            word.append(ch)
+        elif unicodedata.combining(ch):
+            continue
+        elif word:
+            tokens.append("".join(word))
+            word = []
+    if word:
+        tokens.append("".join(word))
+    return [t for t in tokens if len(t) > 1 and t not in STOPWORDS]
+
+
+def encode_postings(doc_ids: Iterable[int]) -> bytes:
+    """Encode ascending doc ids as varint deltas."""
+    out = bytearray()
+    previous = 0
+    for doc_id in doc_ids:
+        delta = doc_id - previous
+        previous = doc_id
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_postings(data: bytes) -> list[int]:
+    """Decode varint deltas back to ascending doc ids."""
+    doc_ids = []
+    current = 0
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        current += value
+        doc_ids.append(current)
+        value = 0
+        shift = 0
+    return doc_ids
+
+
+def intersect(postings: list[list[int]]) -> list[int]:
+    """Intersect ascending posting lists, shortest first."""
+    if not postings:
+        return []
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        other_set = set(other)
+        result = [doc_id for doc_id in result if doc_id in other_set]
+        if not result:
+            break
+    return result
+
+
+def iter_slim_articles(slim_dir: Path = SLIM_DIR) -> Iterator[dict]:
+    """Yield slim article dicts from every month file, oldest month first."""
+    for path in sorted(slim_dir.glob("*/*.ndjson")):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _write_index(index_dir: Path, postings: dict[str, list[int]]) -> None:
+    """Write terms.json and postings.bin for an in-memory term -> doc ids map."""
+    index_dir.mkdir(parents=True, exist_ok=True)
+    terms = {}
+    offset = 0
+    with open(index_dir / "postings.bin", "wb") as f:
+        for term in sorted(postings):
+            data = encode_postings(postings[term])
+            f.write(data)
+            terms[term] = [offset, len(data), len(postings[term])]
+            offset += len(data)
+    with open(index_dir / "terms.json", "w") as f:
+        json.dump(terms, f, separators=(",", ":"))
+
+
+def _merge_blocks(block_dirs: list[Path], index_dir: Path) -> None:
+    """Merge block indexes (each covering a later doc id range) into one index."""
+    block_terms = [json.loads((d / "terms.json").read_text()) for d in block_dirs]
+    block_files = [open(d / "postings.bin", "rb") for d in block_dirs]
+    try:
+        terms = {}
+        offset = 0
+        with open(index_dir / "postings.bin", "wb") as out:
+            for term in sorted(set().union(*block_terms)):
+                doc_ids: list[int] = []
+                for entries, block_file in zip(block_terms, block_files, strict=True):
+                    if term in entries:
+                        block_offset, length, _ = entries[term]
+                        block_file.seek(block_offset)
+                        doc_ids.extend(decode_postings(block_file.read(length)))
+                data = encode_postings(doc_ids)
+                out.write(data)
+                terms[term] = [offset, len(data), len(doc_ids)]
+                offset += len(data)
+    finally:
+        for block_file in block_files:
+            block_file.close()
+    with open(index_dir / "terms.json", "w") as f:
+        json.dump(terms, f, separators=(",", ":"))
+
+
+def build_index(
+    slim_dir: Path = SLIM_DIR, index_dir: Path = SEARCH_DIR, block_docs: int = BLOCK_DOCS
+) -> int:
+    """
+    Build the search index from all slim month files.
+    Replaces any existing index in index_dir. Returns the number of documents indexed.
+    """
+    if index_dir.exists():
+        shutil.rmtree(index_dir)
+    blocks_dir = index_dir / "blocks"
+    index_dir.mkdir(parents=True)
+
+    postings: dict[str, list[int]] = defaultdict(list)
+    block_dirs: list[Path] = []
+    offsets = array("Q")
+    doc_count = 0
+
+    def flush_block() -> None:
+        block_dir = blocks_dir / f"{len(block_dirs):04d}"
+        _write_index(block_dir, postings)
+        block_dirs.append(block_dir)
+        postings.clear()
+
+    with open(index_dir / "docs.ndjson", "wb") as docs:
+        for article in iter_slim_articles(slim_dir):
+            doc_id = doc_count
+            terms = set()
+            for field in SEARCH_FIELDS:
+                terms.update(tokenize(article.get(field)))
+            for term in terms:
+                postings[term].append(doc_id)
+
+            offsets.append(docs.tell())
+            doc = {field: article.get(field) for field in DOC_FIELDS}
+            docs.write(json.dumps(doc, separators=(",", ":")).encode("utf-8") + b"\n")
+            doc_count += 1
+            if doc_count % block_docs == 0:
+                flush_block()
+
+    if postings or not block_dirs:
+        flush_block()
+    if len(block_dirs) == 1:
+        for name in ("terms.json", "postings.bin"):
+            (block_dirs[0] / name).replace(index_dir / name)
+    else:
+        _merge_blocks(block_dirs, index_dir)
+    shutil.rmtree(blocks_dir)
+
+    with open(index_dir / "docs.idx", "wb") as idx:
+        offsets.tofile(idx)
+    with open(index_dir / "meta.json", "w") as f:
+        json.dump({"doc_count": doc_count, "fields": list(SEARCH_FIELDS)}, f)
+    return doc_count
+
+
+class SearchIndex:
+    """
+    Read-only handle on a built index.
+
+    The term dictionary and doc offsets are loaded once; each query then reads only
+    the posting lists of its terms and the doc rows it returns.
+    """
+
+    def __init__(self, index_dir: Path = SEARCH_DIR):
+        self.index_dir = Path(index_dir)
+        with open(self.index_dir / "terms.json") as f:
+            self.terms: dict[str, list[int]] = json.load(f)
+        self.offsets = array("Q")
+        self.offsets.frombytes((self.index_dir / "docs.idx").read_bytes())
+        self._postings = open(self.index_dir / "postings.bin", "rb")
+        self._docs = open(self.index_dir / "docs.ndjson", "rb")
+
+    def close(self) -> None:
+        self._postings.close()
+        self._docs.close()
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def postings(self, term: str) -> list[int]:
+        """Doc ids containing term (ascending); empty if the term is not indexed."""
+        entry = self.terms.get(term)
+        if entry is None:
+            return []
+        offset, length, _ = entry
+        self._postings.seek(offset)
+        return decode_postings(self._postings.read(length))
+
+    def doc(self, doc_id: int) -> dict:
+        self._docs.seek(self.offsets[doc_id])
+        doc: dict = json.loads(self._docs.readline())
+        return doc
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Docs containing every query term, newest first."""
+        terms = set(tokenize(query))
+        if not terms or any(term not in self.terms for term in terms):
+            return []
+        matches = intersect([self.postings(term) for term in terms])
+        return [self.doc(doc_id) for doc_id in reversed(matches[-limit:])]
+
+
+def main():
+    args = sys.argv[1:]
+    if args == ["build"]:
+        if not SLIM_DIR.exists():
+            print(f"No slim files found in {SLIM_DIR}. Run archive transform first.")
+            return
+        doc_count = build_index()
+        print(f"Indexed {doc_count} articles into {SEARCH_DIR}.")
+        return
+
+    if not args:
+        print('Usage: python -m archive.search build | python -m archive.search "query"')
+        return
+    if not (SEARCH_DIR / "terms.json").exists():
+        print(f"No search index in {SEARCH_DIR}. Run: python -m archive.search build")
+        return
+    with SearchIndex() as index:
+        for doc in index.search(" ".join(args)):
+            print(f"{(doc['pub_date'] or '')[:10]}  {doc['headline_main']}  {doc['web_url']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+NYT Archive API – per-file statistics sidecars for slim NDJSON.
+
+The transform writes archive_slim/YYYY/MM.stats.json next to each MM.ndjson, so
+tools can tell what a file holds without reading it: record count, pub_date range,
+distinct sections, per-field null rates, byte size and SHA-256 of the file. The
+catalog (archive.catalog) aggregates the sidecars into one index.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+STATS_SUFFIX = ".stats.json"
+
+
+def stats_path(slim_path: Path) -> Path:
+    """Sidecar path for a slim file (archive_slim/1920/01.ndjson -> 01.stats.json)."""
+    return slim_path.with_name(slim_path.stem + STATS_SUFFIX)
+
+
+def _is_missing(value: object) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def compute_stats(slim_path: Path) -> dict:
+    """
+    Statistics of one slim NDJSON file.
+
+    null_rates is the fraction of records where a field is null or empty ("", [], {}),
+    rounded to 4 decimals. pub_date bounds are YYYY-MM-DD (None if no record has one).
+    """
+    data = slim_path.read_bytes()
+    record_count = 0
+    missing: dict[str, int] = {}
+    sections: set[str] = set()
+    dates: list[str] = []
+
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        record_count += 1
+        for field, value in record.items():
+            missing.setdefault(field, 0)
+            if _is_missing(value):
+                missing[field] += 1
+        if record.get("section_name"):
+            sections.add(record["section_name"])
+        if record.get("pub_date"):
+            dates.append(record["pub_date"][:10])
+
+    return {
+        "record_count": record_count,
+        "min_pub_date": min(dates) if dates else None,
+        "max_pub_date": max(dates) if dates else None,
+        "sections": sorted(sections),
+        "null_rates": {
+            field: round(count / record_count, 4) for field, count in sorted(missing.items())
+        },
+        "byte_size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+def write_stats(slim_path: Path) -> dict:
+    """Compute and write the sidecar of a slim file; returns the stats."""
+    stats = compute_stats(slim_path)
+    with open(stats_path(slim_path), "w") as f:
+        json.dump(stats, f, indent=2)
+        f.write("\n")
+    return stats
+
+
+def read_stats(slim_path: Path, verify_hash: bool = False) -> dict | None:
+    """
+    Sidecar of a slim file, or None if it is missing or stale.
+
+    Stale means the byte size differs, or (verify_hash=True) the SHA-256 differs.
+    """
+    path = stats_path(slim_path)
+    if not path.exists() or not slim_path.exists():
+        return None
+    with open(path) as f:
+        stats: dict = json.load(f)
+    if stats.get("byte_size") != slim_path.stat().st_size:
+        return None
+    if verify_hash and stats.get("sha256") != hashlib.sha256(slim_path.read_bytes()).hexdigest():
+        return None
+    return stats
@@ -3,16 +3,25 @@ NYT Archive API – transform raw to slim.
 
 Reads raw JSON from archive_raw/, extracts analysis-ready fields
 (including byline.person and multimedia counts by type), writes NDJSON
-to archive_slim/YYYY/MM.ndjson.
+to archive_slim/YYYY/MM.ndjson and a stats sidecar (MM.stats.json, see archive.stats).
+
+  python -m archive.transform                        # new months from archive_raw/
+  python -m archive.transform --docstore --overwrite # re-extract every month from the
+                                                     # doc store (see archive.docstore)
 """
 
 import json
+import sqlite3
+import sys
 from collections import Counter
 from pathlib import Path
 
 from pydantic import ValidationError
 
+from archive import docstore
 from archive.models import SlimArticle
+from archive.stats import read_stats, write_stats
+from common.keys import article_key
 
 RAW_DIR = Path("archive_raw")
 SLIM_DIR = Path("archive_slim")
@@ -38,6 +47,7 @@ def extract_slim_article(doc: dict) -> dict:
     return {
         "_id": doc.get("_id"),
         "uri": doc.get("uri"),
+        "article_key": article_key(doc.get("uri"), doc.get("web_url")),
         "pub_date": doc.get("pub_date"),
         "section_name": doc.get("section_name"),
         "news_desk": doc.get("news_desk"),
@@ -55,26 +65,38 @@ def extract_slim_article(doc: dict) -> dict:
     }
 
 
-def transform_month(year: int, month: int, overwrite: bool = False) -> bool:
+def transform_month(
+    year: int, month: int, overwrite: bool = False, store: sqlite3.Connection | None = None
+) -> bool:
     """
     Read raw JSON for one month, extract slim articles, write NDJSON.
-    Returns True on success, False if raw file missing.
+    With store (an archive.docstore connection), docs are read from it instead.
+    Returns True on success, False if raw file (or stored month) missing.
     """
     raw_path = RAW_DIR / str(year) / f"{month:02d}.json"
     slim_path = SLIM_DIR / str(year) / f"{month:02d}.ndjson"
 
-    if not raw_path.exists():
+    if store is not None:
+        if not docstore.has_month(store, year, month):
+            print(f"  Skipping {year}/{month:02d} (month not in doc store)")
+            return False
+    elif not raw_path.exists():
         print(f"  Skipping {year}/{month:02d} (raw file not found: {raw_path})")
         return False
 
     if slim_path.exists() and not overwrite:
         print(f"  Skipping {year}/{month:02d} (slim already exists: {slim_path})")
+        # Slim files written before sidecars existed
+        if read_stats(slim_path) is None:
+            write_stats(slim_path)
         return True
 
-    with open(raw_path) as f:
-        data = json.load(f)
-
-    docs = data.get("response", {}).get("docs", [])
+    if store is not None:
+        docs = list(docstore.iter_month(store, year, month))
+    else:
+        with open(raw_path) as f:
+            data = json.load(f)
+        docs = data.get("response", {}).get("docs", [])
     slim_dicts = [extract_slim_article(doc) for doc in docs]
 
     slim_path.parent.mkdir(parents=True, exist_ok=True)
@@ -87,6 +109,7 @@ def transform_month(year: int, month: int, overwrite: bool = False) -> bool:
             except ValidationError as e:
                 skipped += 1
                 print(f"  Validation error (skipping) _id={rec.get('_id')!r}: {e}")
+    write_stats(slim_path)
 
     if skipped:
         print(f"  Transformed {year}/{month:02d} ({skipped} record(s) skipped).")
@@ -96,6 +119,18 @@ def transform_month(year: int, month: int, overwrite: bool = False) -> bool:
 
 
 def main():
+    overwrite = "--overwrite" in sys.argv
+    if "--docstore" in sys.argv:
+        if not docstore.DOCSTORE_PATH.exists():
+            print(
+                f"No doc store at {docstore.DOCSTORE_PATH}. Run: python -m archive.docstore build"
+            )
+            return
+        store = docstore.connect()
+        for year, month in docstore.months(store):
+            transform_month(year, month, overwrite=overwrite, store=store)
+        return
+
     # Process all raw files found (or specify a list like ingest)
     raw_files = sorted(RAW_DIR.glob("*/*.json"))
     if not raw_files:
@@ -105,7 +140,7 @@ def main():
     for raw_path in raw_files:
         year = int(raw_path.parent.name)
         month = int(raw_path.stem)
-        transform_month(year, month)
+        transform_month(year, month, overwrite=overwrite)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,259 @@
+"""
+Micro-batched loading for the GCS-to-BigQuery loader.
+
+With LOAD_BATCH_MODE=true a finalize event only queues its file: a streaming insert
+into metadata.pending_loads, which runs no BigQuery job, so a burst of N files costs
+no jobs until it is flushed. The flush_pending HTTP entrypoint, run by Cloud
+Scheduler, loads a source's pending files (queued but not yet in load_manifest)
+together, with one MERGE over all of them and one manifest INSERT, once either
+  - LOAD_BATCH_MAX_FILES files are pending, or
+  - the oldest pending file has waited LOAD_BATCH_MAX_AGE_SECONDS.
+A lock object per source (_load_locks/<source>.lock, ignored by the loader) keeps
+concurrent instances from flushing the same files twice. The flush also deletes
+queued rows that the manifest already records, and pending_loads partitions expire
+after PENDING_WINDOW_DAYS, so the queue scan stays small.
+"""
+
+import logging
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_FILES = int(os.getenv("LOAD_BATCH_MAX_FILES", "200"))
+BATCH_MAX_AGE_SECONDS = int(os.getenv("LOAD_BATCH_MAX_AGE_SECONDS", "300"))
+# Files per flush (a temporary external table takes up to 10,000 URIs)
+BATCH_LIMIT = 5000
+# A lock older than the function timeout belongs to an instance that died
+LOCK_TTL_SECONDS = 540
+# Queued files older than this are left to backfill.py
+PENDING_WINDOW_DAYS = 7
+# Rows stay in the streaming buffer (where DML cannot delete them) for up to ~30 min
+PRUNE_AFTER_MINUTES = 90
+
+
+@dataclass(frozen=True)
+class PendingFile:
+    source: str
+    path: str
+    enqueued_at: datetime
+
+
+class PendingQueue(Protocol):
+    def add(self, source: str, path: str, enqueued_at: datetime) -> None: ...
+
+    def pending(self, source: str, limit: int = BATCH_LIMIT) -> list[PendingFile]:
+        """Queued files of source not yet loaded, oldest first, one entry per path."""
+        ...
+
+    def mark_loaded(self, source: str, paths: list[str], loaded_at: datetime) -> None: ...
+
+
+class FlushLock(Protocol):
+    def acquire(self, source: str) -> bool: ...
+
+    def release(self, source: str) -> None: ...
+
+
+def should_flush(
+    pending: list[PendingFile],
+    now: datetime,
+    max_files: int = BATCH_MAX_FILES,
+    max_age_seconds: float = BATCH_MAX_AGE_SECONDS,
+) -> bool:
+    """True when the count or the age threshold is reached."""
+    if not pending:
+        return False
+    if len(pending) >= max_files:
+        return True
+    oldest = min(f.enqueued_at for f in pending)
+    return (now - oldest).total_seconds() >= max_age_seconds
+
+
+def flush_source(
+    queue: PendingQueue,
+    lock: FlushLock,
+    source: str,
+    load_batch: Callable[[list[str]], None],
+    now: datetime | None = None,
+    force: bool = False,
+    max_files: int = BATCH_MAX_FILES,
+    max_age_seconds: float = BATCH_MAX_AGE_SECONDS,
+) -> int:
+    """
+    Load the pending files of source in one batch if a threshold is reached (or force).
+
+    The queue is read once, under the lock. Files are marked loaded only after
+    load_batch succeeds, so a failed flush is retried by the next one. Returns the
+    number of files loaded.
+    """
+    now = now or datetime.now(UTC)
+    if not lock.acquire(source):
+        logger.info("Flush of %s already running in another instance", source)
+        return 0
+    try:
+        pending = queue.pending(source)
+        if not pending or not (force or should_flush(pending, now, max_files, max_age_seconds)):
+            return 0
+        paths = [f.path for f in pending]
+        logger.info("Flushing %d pending %s files", len(paths), source)
+        load_batch(paths)
+        queue.mark_loaded(source, paths, datetime.now(UTC))
+        return len(paths)
+    finally:
+        lock.release(source)
+
+
+class LocalPendingQueue:
+    """In-memory queue and manifest, for tests and local runs."""
+
+    def __init__(self) -> None:
+        self.queued: list[PendingFile] = []
+        self.loaded: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def add(self, source: str, path: str, enqueued_at: datetime) -> None:
+        with self._lock:
+            self.queued.append(PendingFile(source, path, enqueued_at))
+
+    def pending(self, source: str, limit: int = BATCH_LIMIT) -> list[PendingFile]:
+        with self._lock:
+            first: dict[str, PendingFile] = {}
+            for f in sorted(self.queued, key=lambda f: f.enqueued_at):
+                if f.source == source and (source, f.path) not in self.loaded:
+                    first.setdefault(f.path, f)
+            return list(first.values())[:limit]
+
+    def mark_loaded(self, source: str, paths: list[str], loaded_at: datetime) -> None:
+        with self._lock:
+            self.loaded.update((source, path) for path in paths)
+            self.queued = [f for f in self.queued if (f.source, f.path) not in self.loaded]
+
+
+class LocalFlushLock:
+    """In-process lock per source, for tests and local runs."""
+
+    def __init__(self) -> None:
+        self.held: set[str] = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, source: str) -> bool:
+        with self._lock:
+            if source in self.held:
+                return False
+            self.held.add(source)
+            return True
+
+    def release(self, source: str) -> None:
+        with self._lock:
+            self.held.discard(source)
+
+
+class BigQueryPendingQueue:
+    """pending_loads (streaming inserts, partitioned by day) minus load_manifest, in BigQuery."""
+
+    def __init__(self, client: Any, project: str, pending_table: str, manifest_table: str):
+        self.client = client
+        self.pending_table = f"{project}.{pending_table}"
+        self.manifest_table = f"{project}.{manifest_table}"
+
+    def add(self, source: str, path: str, enqueued_at: datetime) -> None:
+        row = {"source": source, "path": path, "enqueued_at": enqueued_at.isoformat()}
+        errors = self.client.insert_rows_json(self.pending_table, [row])
+        if errors:
+            raise RuntimeError(f"Could not queue {path}: {errors}")
+
+    def pending(self, source: str, limit: int = BATCH_LIMIT) -> list[PendingFile]:
+        query = f"""
+            SELECT p.path, MIN(p.enqueued_at) AS enqueued_at
+            FROM `{self.pending_table}` p
+            WHERE p.source = '{source}'
+                AND p.enqueued_at >= TIMESTAMP_SUB(
+                    CURRENT_TIMESTAMP(), INTERVAL {PENDING_WINDOW_DAYS} DAY)
+                AND NOT EXISTS (
+                    SELECT 1 FROM `{self.manifest_table}` m
+                    WHERE m.source = p.source AND m.path = p.path
+                )
+            GROUP BY p.path
+            ORDER BY enqueued_at
+            LIMIT {limit}
+        """
+        return [
+            PendingFile(source, row.path, row.enqueued_at)
+            for row in self.client.query(query).result()
+        ]
+
+    def mark_loaded(self, source: str, paths: list[str], loaded_at: datetime) -> None:
+        from google.cloud import bigquery
+
+        # One script: record the batch, then drop queued rows the manifest records
+        # (rows still in the streaming buffer are left to a later flush)
+        query = f"""
+            INSERT INTO `{self.manifest_table}` (source, path, loaded_at)
+            SELECT @source, path, @loaded_at FROM UNNEST(@paths) AS path;
+
+            DELETE FROM `{self.pending_table}` p
+            WHERE p.source = @source
+                AND p.enqueued_at >= TIMESTAMP_SUB(
+                    CURRENT_TIMESTAMP(), INTERVAL {PENDING_WINDOW_DAYS + 1} DAY)
+                AND p.enqueued_at < TIMESTAMP_SUB(
+                    CURRENT_TIMESTAMP(), INTERVAL {PRUNE_AFTER_MINUTES} MINUTE)
+                AND EXISTS (
+                    SELECT 1 FROM `{self.manifest_table}` m
+                    WHERE m.source = p.source AND m.path = p.path
+                );
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("source", "STRING", source),
+                bigquery.ScalarQueryParameter("loaded_at", "TIMESTAMP", loaded_at),
+                bigquery.ArrayQueryParameter("paths", "STRING", paths),
+            ]
+        )
+        self.client.query(query, job_config=job_config).result()
+        logger.info("Manifest updated for %d %s files", len(paths), source)
+
+
+class GcsFlushLock:
+    """Lock object per source, created with if_generation_match=0 (create only)."""
+
+    def __init__(self, bucket: Any, prefix: str, ttl_seconds: float = LOCK_TTL_SECONDS):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    def _blob(self, source: str) -> Any:
+        return self.bucket.blob(f"{self.prefix}/_load_locks/{source}.lock")
+
+    def acquire(self, source: str) -> bool:
+        from google.api_core.exceptions import NotFound, PreconditionFailed
+
+        blob = self._blob(source)
+        for _ in range(2):
+            try:
+                blob.upload_from_string(datetime.now(UTC).isoformat(), if_generation_match=0)
+                return True
+            except PreconditionFailed:
+                pass
+            # Held: take it over only if its owner died without releasing it
+            try:
+                blob.reload()
+                age = (datetime.now(UTC) - blob.time_created).total_seconds()
+                if age < self.ttl_seconds:
+                    return False
+                blob.delete(if_generation_match=blob.generation)
+            except (NotFound, PreconditionFailed):
+                return False
+        return False
+
+    def release(self, source: str) -> None:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            self._blob(source).delete()
+        except NotFound:
+            pass
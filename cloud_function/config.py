@@ -22,6 +22,13 @@ ARCHIVE_FINAL_TABLE = f"{BQ_PROD_DATASET}.archive_articles"
 MOST_POPULAR_STAGING_TABLE = f"{BQ_STAGING_DATASET}.most_popular_articles"
 MOST_POPULAR_FINAL_TABLE = f"{BQ_PROD_DATASET}.most_popular_articles"
 LOAD_MANIFEST_TABLE = f"{BQ_METADATA_DATASET}.load_manifest"
+PENDING_LOADS_TABLE = f"{BQ_METADATA_DATASET}.pending_loads"
+
+# Micro-batch mode (optional): queue events and load pending files together (batching.py)
+LOAD_BATCH_MODE = os.getenv("LOAD_BATCH_MODE", "false").lower() == "true"
+
+# Most Popular files up to this size are streamed via the Storage Write API (0 = never)
+STREAM_MAX_BYTES = int(os.getenv("STREAM_MAX_BYTES", str(2 * 1024 * 1024)))
 
 # Path prefixes for filtering
 ARCHIVE_SLIM_PREFIX = "archive_slim/"
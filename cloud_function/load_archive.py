@@ -1,5 +1,9 @@
 """
 Load archive slim files to BigQuery staging, MERGE to final table, and update manifest.
+
+When the file's stats sidecar (MM.stats.json, written by archive.transform) is in the
+bucket and describes this upload (see sidecars.py), the loaded row count is checked
+against its record_count before the MERGE.
 """
 
 import json
@@ -14,10 +18,31 @@ from config import (
     GCP_PROJECT,
     LOAD_MANIFEST_TABLE,
 )
-from google.cloud import bigquery
+from google.cloud import bigquery, storage
+from sidecars import expected_row_count
 
 logger = logging.getLogger(__name__)
 
+PUB_DATE_EXPR = "SAFE.PARSE_DATE('%Y-%m-%d', SUBSTR(pub_date, 1, 10)) AS pub_date"
+
+
+def _temp_schema() -> tuple[list[str], list[bigquery.SchemaField]]:
+    """Column names of archive_articles, and its schema with pub_date as STRING for loading."""
+    schema_path = Path(__file__).parent / "schema" / "archive_articles.json"
+    with open(schema_path) as f:
+        full_schema_json = json.load(f)
+    # Change pub_date to STRING for temp load; build schema from API repr list
+    temp_schema_json = full_schema_json.copy()
+    for field in temp_schema_json:
+        if field["name"] == "pub_date":
+            field["type"] = "STRING"
+            field["description"] = (
+                "Publication date (ISO or YYYY-MM-DD, converted to DATE on INSERT)"
+            )
+            break
+    columns = [field["name"] for field in full_schema_json]
+    return columns, [bigquery.SchemaField.from_api_repr(f) for f in temp_schema_json]
+
 
 def load_archive(bucket: str, object_name: str) -> None:
     """
@@ -46,21 +71,7 @@ def load_archive(bucket: str, object_name: str) -> None:
 
     # Load to a temp table first, then INSERT with pub_date conversion
     temp_table = f"{ARCHIVE_STAGING_TABLE}_temp"
-
-    # Get schema with pub_date STRING for temp load
-    schema_path = Path(__file__).parent / "schema" / "archive_articles.json"
-    with open(schema_path) as f:
-        full_schema_json = json.load(f)
-    # Change pub_date to STRING for temp load; build schema from API repr list
-    temp_schema_json = full_schema_json.copy()
-    for field in temp_schema_json:
-        if field["name"] == "pub_date":
-            field["type"] = "STRING"
-            field["description"] = (
-                "Publication date (ISO or YYYY-MM-DD, converted to DATE on INSERT)"
-            )
-            break
-    temp_schema = [bigquery.SchemaField.from_api_repr(f) for f in temp_schema_json]
+    _, temp_schema = _temp_schema()
 
     # Create temp table
     temp_table_ref = client.dataset(BQ_STAGING_DATASET).table(temp_table.split(".")[-1])
@@ -80,13 +91,22 @@ def load_archive(bucket: str, object_name: str) -> None:
     load_job.result()
     logger.info(f"Loaded {load_job.output_rows} rows to temp table")
 
+    # Verify against the sidecar; the manifest is not updated, so a retry reloads the file
+    expected = expected_row_count(storage.Client(project=GCP_PROJECT).bucket(bucket), object_name)
+    if expected is not None and load_job.output_rows != expected:
+        client.delete_table(f"{GCP_PROJECT}.{temp_table}", not_found_ok=True)
+        raise RuntimeError(
+            f"Row count mismatch for {object_name}: loaded {load_job.output_rows}, "
+            f"sidecar has {expected}"
+        )
+
     # Insert into staging with pub_date conversion (first 10 chars = YYYY-MM-DD)
     insert_query = f"""
         INSERT INTO `{GCP_PROJECT}.{ARCHIVE_STAGING_TABLE}`
         SELECT
             article_id,
             uri,
-            SAFE.PARSE_DATE('%Y-%m-%d', SUBSTR(pub_date, 1, 10)) AS pub_date,
+            {PUB_DATE_EXPR},
             section_name,
             news_desk,
             type_of_material,
@@ -99,7 +119,8 @@ def load_archive(bucket: str, object_name: str) -> None:
             snippet,
             keywords,
             byline_person,
-            multimedia_count_by_type
+            multimedia_count_by_type,
+            article_key
         FROM `{GCP_PROJECT}.{temp_table}`
     """
     insert_job = client.query(insert_query)
@@ -136,3 +157,45 @@ def load_archive(bucket: str, object_name: str) -> None:
     truncate_job = client.query(truncate_query)
     truncate_job.result()
     logger.info("Staging table truncated")
+
+
+def load_archive_batch(bucket: str, object_names: list[str]) -> None:
+    """
+    Load many archive_slim files with a single MERGE (micro-batch mode, see batching.py).
+
+    The files are read through a temporary external table, so there is no load job,
+    staging insert or truncate. The caller records the files in the manifest.
+
+    Args:
+        bucket: GCS bucket name
+        object_names: Full object paths of the pending files
+    """
+    client = bigquery.Client(project=GCP_PROJECT)
+    columns, temp_schema = _temp_schema()
+    external = bigquery.ExternalConfig("NEWLINE_DELIMITED_JSON")
+    external.source_uris = [f"gs://{bucket}/{name}" for name in object_names]
+    external.schema = temp_schema
+
+    select_list = ", ".join(PUB_DATE_EXPR if c == "pub_date" else c for c in columns)
+    column_list = ", ".join(columns)
+    merge_query = f"""
+        MERGE `{GCP_PROJECT}.{ARCHIVE_FINAL_TABLE}` AS target
+        USING (
+            SELECT {select_list}
+            FROM pending_files
+            WHERE TRUE
+            -- An article in several files of the batch is inserted once
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY article_id ORDER BY _FILE_NAME DESC) = 1
+        ) AS source
+        ON target.article_id = source.article_id
+        WHEN NOT MATCHED THEN
+            INSERT ({column_list}) VALUES ({column_list})
+    """
+    job_config = bigquery.QueryJobConfig(table_definitions={"pending_files": external})
+    merge_job = client.query(merge_query, job_config=job_config)
+    merge_job.result()
+    logger.info(
+        "MERGE of %d archive files: %s rows inserted",
+        len(object_names),
+        merge_job.num_dml_affected_rows,
+    )
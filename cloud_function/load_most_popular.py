@@ -18,6 +18,23 @@ from google.cloud import bigquery
 
 logger = logging.getLogger(__name__)
 
+# Snapshot date from the object path (e.g. .../most_popular_slim/2026-02-19/viewed_30_0600.ndjson)
+SNAPSHOT_DATE_EXPR = (
+    r"DATE(REGEXP_EXTRACT(_FILE_NAME, r'most_popular_slim/(\d{4}-\d{2}-\d{2})/'))"
+    " AS snapshot_date"
+)
+
+
+def _temp_schema() -> tuple[list[str], list[bigquery.SchemaField]]:
+    """Column names of most_popular_articles, and its schema without snapshot_date for loading."""
+    schema_path = Path(__file__).parent / "schema" / "most_popular_articles.json"
+    with open(schema_path) as f:
+        full_schema_json = json.load(f)
+    # Remove snapshot_date from schema for temp load; build schema from API repr list
+    temp_schema_json = [field for field in full_schema_json if field["name"] != "snapshot_date"]
+    columns = [field["name"] for field in full_schema_json]
+    return columns, [bigquery.SchemaField.from_api_repr(f) for f in temp_schema_json]
+
 
 def load_most_popular(bucket: str, object_name: str, snapshot_date: str) -> None:
     """
@@ -25,7 +42,8 @@ def load_most_popular(bucket: str, object_name: str, snapshot_date: str) -> None
 
     Args:
         bucket: GCS bucket name
-        object_name: Full object path (e.g. prefix/most_popular_slim/2026-02-19/viewed_30.ndjson)
+        object_name: Full object path
+            (e.g. prefix/most_popular_slim/2026-02-19/viewed_30_0600.ndjson)
         snapshot_date: Snapshot date (YYYY-MM-DD) extracted from path
     """
     client = bigquery.Client(project=GCP_PROJECT)
@@ -53,13 +71,7 @@ def load_most_popular(bucket: str, object_name: str, snapshot_date: str) -> None
     # Load to a temp table first, then INSERT with snapshot_date
     temp_table = f"{MOST_POPULAR_STAGING_TABLE}_temp"
 
-    # Get schema without snapshot_date for loading
-    schema_path = Path(__file__).parent / "schema" / "most_popular_articles.json"
-    with open(schema_path) as f:
-        full_schema_json = json.load(f)
-    # Remove snapshot_date from schema for temp load; build schema from API repr list
-    temp_schema_json = [field for field in full_schema_json if field["name"] != "snapshot_date"]
-    temp_schema = [bigquery.SchemaField.from_api_repr(f) for f in temp_schema_json]
+    _, temp_schema = _temp_schema()
 
     # Create temp table
     temp_table_ref = client.dataset(BQ_STAGING_DATASET).table(temp_table.split(".")[-1])
@@ -94,11 +106,16 @@ def load_most_popular(bucket: str, object_name: str, snapshot_date: str) -> None
     # Drop temp table
     client.delete_table(f"{GCP_PROJECT}.{temp_table}", not_found_ok=True)
 
-    # MERGE to final table (dedup by snapshot_date, id)
+    # MERGE to final table (dedup by snapshot, feed, period, capture time and id;
+    # legacy daily rows have NULL feed/period/captured_at)
     merge_query = f"""
         MERGE `{GCP_PROJECT}.{MOST_POPULAR_FINAL_TABLE}` AS target
         USING `{GCP_PROJECT}.{MOST_POPULAR_STAGING_TABLE}` AS source
-        ON target.snapshot_date = source.snapshot_date AND target.id = source.id
+        ON target.snapshot_date = source.snapshot_date
+            AND target.feed IS NOT DISTINCT FROM source.feed
+            AND target.period IS NOT DISTINCT FROM source.period
+            AND target.captured_at IS NOT DISTINCT FROM source.captured_at
+            AND target.id = source.id
         WHEN NOT MATCHED THEN
             INSERT ROW
     """
@@ -121,3 +138,52 @@ def load_most_popular(bucket: str, object_name: str, snapshot_date: str) -> None
     truncate_job = client.query(truncate_query)
     truncate_job.result()
     logger.info("Staging table truncated")
+
+
+def load_most_popular_batch(bucket: str, object_names: list[str]) -> None:
+    """
+    Load many most_popular_slim files with a single MERGE (micro-batch mode, see batching.py).
+
+    The files are read through a temporary external table; each row's snapshot_date
+    comes from its file's path (_FILE_NAME). The caller records the files in the manifest.
+
+    Args:
+        bucket: GCS bucket name
+        object_names: Full object paths of the pending files
+    """
+    client = bigquery.Client(project=GCP_PROJECT)
+    columns, temp_schema = _temp_schema()
+    external = bigquery.ExternalConfig("NEWLINE_DELIMITED_JSON")
+    external.source_uris = [f"gs://{bucket}/{name}" for name in object_names]
+    external.schema = temp_schema
+
+    select_list = ", ".join(SNAPSHOT_DATE_EXPR if c == "snapshot_date" else c for c in columns)
+    column_list = ", ".join(columns)
+    merge_query = f"""
+        MERGE `{GCP_PROJECT}.{MOST_POPULAR_FINAL_TABLE}` AS target
+        USING (
+            SELECT {select_list}
+            FROM pending_files
+            WHERE TRUE
+            -- A capture in several files of the batch is inserted once
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY snapshot_date, feed, period, captured_at, id
+                ORDER BY _FILE_NAME DESC
+            ) = 1
+        ) AS source
+        ON target.snapshot_date = source.snapshot_date
+            AND target.feed IS NOT DISTINCT FROM source.feed
+            AND target.period IS NOT DISTINCT FROM source.period
+            AND target.captured_at IS NOT DISTINCT FROM source.captured_at
+            AND target.id = source.id
+        WHEN NOT MATCHED THEN
+            INSERT ({column_list}) VALUES ({column_list})
+    """
+    job_config = bigquery.QueryJobConfig(table_definitions={"pending_files": external})
+    merge_job = client.query(merge_query, job_config=job_config)
+    merge_job.result()
+    logger.info(
+        "MERGE of %d most_popular files: %s rows inserted",
+        len(object_names),
+        merge_job.num_dml_affected_rows,
+    )
@@ -2,21 +2,62 @@
 Cloud Function entrypoint for GCS-to-BigQuery loader.
 
 Receives Cloud Events from Eventarc (GCS object.finalize), filters by path,
-and dispatches to archive or most_popular loader.
+and dispatches to archive or most_popular loader. With LOAD_BATCH_MODE=true events
+are only queued and loaded in micro-batches instead (see batching.py); flush_pending
+is the HTTP entrypoint Cloud Scheduler calls to flush them. Small most_popular
+files (up to STREAM_MAX_BYTES) are streamed through the Storage Write API in either mode.
 """
 
+import json
 import logging
 import re
+from datetime import UTC, datetime
 
 import functions_framework
+from batching import BigQueryPendingQueue, GcsFlushLock, flush_source
 from cloudevents.http import CloudEvent
-from config import ARCHIVE_SLIM_PREFIX, GCS_PREFIX, MOST_POPULAR_SLIM_PREFIX
-from load_archive import load_archive
-from load_most_popular import load_most_popular
+from config import (
+    ARCHIVE_SLIM_PREFIX,
+    GCP_PROJECT,
+    GCS_BUCKET,
+    GCS_PREFIX,
+    LOAD_BATCH_MODE,
+    LOAD_MANIFEST_TABLE,
+    MOST_POPULAR_SLIM_PREFIX,
+    PENDING_LOADS_TABLE,
+    STREAM_MAX_BYTES,
+)
+from flask import Request
+from google.cloud import bigquery, storage
+from load_archive import load_archive, load_archive_batch
+from load_most_popular import load_most_popular, load_most_popular_batch
+from stream_most_popular import stream_most_popular
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Manifest source name -> batch loader
+BATCH_LOADERS = {
+    "archive_slim": load_archive_batch,
+    "most_popular_slim": load_most_popular_batch,
+}
+
+
+def _batching(bucket: str) -> tuple[BigQueryPendingQueue, GcsFlushLock]:
+    client = bigquery.Client(project=GCP_PROJECT)
+    queue = BigQueryPendingQueue(client, GCP_PROJECT, PENDING_LOADS_TABLE, LOAD_MANIFEST_TABLE)
+    lock = GcsFlushLock(storage.Client(project=GCP_PROJECT).bucket(bucket), GCS_PREFIX)
+    return queue, lock
+
+
+def queue_file(name: str, source: str) -> str:
+    """Queue one file for the next scheduled flush (a streaming insert, no job)."""
+    client = bigquery.Client(project=GCP_PROJECT)
+    BigQueryPendingQueue(client, GCP_PROJECT, PENDING_LOADS_TABLE, LOAD_MANIFEST_TABLE).add(
+        source, name, datetime.now(UTC)
+    )
+    return "Queued"
+
 
 @functions_framework.cloud_event
 def gcs_to_bigquery(cloud_event: CloudEvent) -> tuple[str, int]:
@@ -47,20 +88,35 @@ def gcs_to_bigquery(cloud_event: CloudEvent) -> tuple[str, int]:
         elif object_path.startswith(GCS_PREFIX):
             object_path = object_path[len(GCS_PREFIX) :]
 
+        # Stats sidecars (.stats.json) and the catalog sit next to the slim files
+        if not object_path.endswith(".ndjson"):
+            logger.info(f"Ignoring non-NDJSON file: {name}")
+            return "File ignored (not NDJSON)", 200
+
         # Filter: only process archive_slim or most_popular_slim
         if object_path.startswith(ARCHIVE_SLIM_PREFIX):
+            if LOAD_BATCH_MODE:
+                return queue_file(name, "archive_slim"), 200
             logger.info(f"Processing archive file: {name}")
             load_archive(bucket, name)
             return "Archive loaded successfully", 200
 
         elif object_path.startswith(MOST_POPULAR_SLIM_PREFIX):
-            # Extract snapshot_date from path (e.g. most_popular_slim/2026-02-19/viewed_30.ndjson)
+            # Extract snapshot_date from path
+            # (e.g. most_popular_slim/2026-02-19/viewed_30_0600.ndjson)
             match = re.search(r"most_popular_slim/(\d{4}-\d{2}-\d{2})/", object_path)
             if not match:
                 logger.error(f"Could not extract snapshot_date from path: {name}")
                 return "Invalid most_popular path format", 400
 
             snapshot_date = match.group(1)
+            size = int(data.get("size") or 0)
+            if 0 < size <= STREAM_MAX_BYTES:
+                logger.info(f"Streaming most_popular file: {name} ({size} bytes)")
+                stream_most_popular(bucket, name, snapshot_date)
+                return "Most popular streamed successfully", 200
+            if LOAD_BATCH_MODE:
+                return queue_file(name, "most_popular_slim"), 200
             logger.info(f"Processing most_popular file: {name} (snapshot_date={snapshot_date})")
             load_most_popular(bucket, name, snapshot_date)
             return "Most popular loaded successfully", 200
@@ -72,3 +128,31 @@ def gcs_to_bigquery(cloud_event: CloudEvent) -> tuple[str, int]:
     except Exception as e:
         logger.exception(f"Error processing event: {e}")
         return f"Error: {str(e)}", 500
+
+
+@functions_framework.http
+def flush_pending(request: Request) -> tuple[str, int]:
+    """
+    Flush every source whose batch threshold is reached (?force=true: all pending files).
+
+    Returns:
+        Tuple of (JSON with files loaded per source, status_code)
+    """
+    try:
+        force = request.args.get("force") == "true"
+        queue, lock = _batching(GCS_BUCKET)
+        loaded = {
+            source: flush_source(
+                queue,
+                lock,
+                source,
+                lambda paths, s=source: BATCH_LOADERS[s](GCS_BUCKET, paths),
+                force=force,
+            )
+            for source in BATCH_LOADERS
+        }
+        logger.info(f"Flushed pending loads: {loaded}")
+        return json.dumps(loaded), 200
+    except Exception as e:
+        logger.exception(f"Error flushing pending loads: {e}")
+        return f"Error: {str(e)}", 500
@@ -0,0 +1,52 @@
+"""
+Stats sidecars of archive slim files (MM.stats.json, written by archive.transform).
+
+A sidecar is trusted only if it describes the object being loaded: its byte_size
+must equal the object's size, and its sha256 the object's sha256 metadata when the
+uploader set it (common.gcs_sync does). A re-uploaded month can fire its finalize
+event before the new sidecar lands, and the previous run's sidecar must then not
+fail the load.
+"""
+
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+STATS_SUFFIX = ".stats.json"
+
+
+def sidecar_name(object_name: str) -> str:
+    return object_name.removesuffix(".ndjson") + STATS_SUFFIX
+
+
+def sidecar_is_current(stats: dict, size: int | None, sha256: str | None) -> bool:
+    """True if stats were computed from an object of this size (and sha256, if known)."""
+    if stats.get("byte_size") != size:
+        return False
+    return sha256 is None or stats.get("sha256") == sha256
+
+
+def expected_row_count(bucket: Any, object_name: str) -> int | None:
+    """
+    record_count from the object's stats sidecar; None if there is no sidecar or it is
+    not (yet) the sidecar of this object, in which case the row count is not verified.
+
+    Args:
+        bucket: google.cloud.storage Bucket holding the object
+        object_name: Full object path of the slim file
+    """
+    sidecar = bucket.get_blob(sidecar_name(object_name))
+    if sidecar is None:
+        logger.info(f"No stats sidecar for {object_name}, row count not verified")
+        return None
+    stats = json.loads(sidecar.download_as_text())
+    data = bucket.get_blob(object_name)
+    if data is None:
+        return None
+    if not sidecar_is_current(stats, data.size, (data.metadata or {}).get("sha256")):
+        logger.info(f"Stats sidecar of {object_name} is not current yet, row count not verified")
+        return None
+    count: int = stats["record_count"]
+    return count
@@ -0,0 +1,89 @@
+"""
+Stream small most_popular slim files to BigQuery through the Storage Write API.
+
+Low-latency alternative to load_most_popular for snapshot files of a few KB: the
+rows are appended to the final table in one committed stream, and the manifest row
+through the manifest's default stream. No load, INSERT, MERGE or TRUNCATE jobs run,
+so a snapshot is queryable seconds after upload.
+
+The Write API cannot enforce the (snapshot_date, feed, period, captured_at, id) key
+that the MERGE path dedupes on. If a redelivered event passes the manifest check
+before the first manifest row lands, its rows are appended again; stg_most_popular
+keeps one row per key.
+"""
+
+import json
+import logging
+from datetime import UTC, datetime
+from pathlib import Path
+
+from config import GCP_PROJECT, LOAD_MANIFEST_TABLE, MOST_POPULAR_FINAL_TABLE
+from google.cloud import bigquery, storage
+from write_api import append_rows
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SCHEMA = [
+    {"name": "source", "type": "STRING"},
+    {"name": "path", "type": "STRING"},
+    {"name": "loaded_at", "type": "TIMESTAMP"},
+]
+
+
+def _table_path(table: str) -> str:
+    dataset, table_name = table.split(".")
+    return f"projects/{GCP_PROJECT}/datasets/{dataset}/tables/{table_name}"
+
+
+def stream_most_popular(bucket: str, object_name: str, snapshot_date: str) -> None:
+    """
+    Append one most_popular_slim NDJSON file to the final table and record it in the manifest.
+
+    Args:
+        bucket: GCS bucket name
+        object_name: Full object path
+            (e.g. prefix/most_popular_slim/2026-02-19/viewed_30_0600.ndjson)
+        snapshot_date: Snapshot date (YYYY-MM-DD) extracted from path
+    """
+    client = bigquery.Client(project=GCP_PROJECT)
+    manifest_path = object_name
+
+    # Check if already loaded
+    check_query = f"""
+        SELECT COUNT(*) as count
+        FROM `{GCP_PROJECT}.{LOAD_MANIFEST_TABLE}`
+        WHERE source = 'most_popular_slim' AND path = '{manifest_path}'
+    """
+    check_result = list(client.query(check_query).result())
+    if check_result and check_result[0].count > 0:
+        logger.info(f"Path {manifest_path} already loaded, skipping")
+        return
+
+    text = storage.Client(project=GCP_PROJECT).bucket(bucket).blob(object_name).download_as_text()
+    rows = [
+        {**json.loads(line), "snapshot_date": snapshot_date}
+        for line in text.splitlines()
+        if line.strip()
+    ]
+
+    schema_path = Path(__file__).parent / "schema" / "most_popular_articles.json"
+    with open(schema_path) as f:
+        schema = json.load(f)
+
+    if rows:
+        append_rows(_table_path(MOST_POPULAR_FINAL_TABLE), schema, rows, "MostPopularRow")
+    logger.info(f"Streamed {len(rows)} rows to {MOST_POPULAR_FINAL_TABLE}")
+
+    manifest_row = {
+        "source": "most_popular_slim",
+        "path": manifest_path,
+        "loaded_at": datetime.now(UTC),
+    }
+    append_rows(
+        _table_path(LOAD_MANIFEST_TABLE),
+        MANIFEST_SCHEMA,
+        [manifest_row],
+        "LoadManifestRow",
+        committed=False,
+    )
+    logger.info(f"Manifest updated for path: {manifest_path}")
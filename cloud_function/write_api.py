@@ -0,0 +1,132 @@
+"""
+BigQuery Storage Write API helpers: protobuf rows built from the schema/ JSON files.
+
+Rows are encoded as proto2 messages whose fields mirror the table schema: INTEGER ->
+int64, DATE -> int32 days since epoch, TIMESTAMP -> int64 microseconds since epoch,
+JSON -> string, REPEATED -> repeated. Missing values are left unset (NULL).
+"""
+
+import json
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+EPOCH_DATE = date(1970, 1, 1)
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+PROTO_TYPES = {
+    "STRING": "TYPE_STRING",
+    "JSON": "TYPE_STRING",
+    "INTEGER": "TYPE_INT64",
+    "INT64": "TYPE_INT64",
+    "FLOAT": "TYPE_DOUBLE",
+    "FLOAT64": "TYPE_DOUBLE",
+    "BOOLEAN": "TYPE_BOOL",
+    "BOOL": "TYPE_BOOL",
+    "DATE": "TYPE_INT32",
+    "TIMESTAMP": "TYPE_INT64",
+}
+
+
+def _encode_value(field_type: str, value: Any) -> Any:
+    if field_type == "DATE":
+        return (date.fromisoformat(str(value)[:10]) - EPOCH_DATE).days
+    if field_type == "TIMESTAMP":
+        ts = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=UTC)
+        return (ts - EPOCH) // timedelta(microseconds=1)
+    if field_type == "JSON":
+        return value if isinstance(value, str) else json.dumps(value)
+    return value
+
+
+def encode_row(schema: list[dict], row: dict) -> dict[str, Any]:
+    """Field values of one row, converted to their proto representation."""
+    values: dict[str, Any] = {}
+    for field in schema:
+        value = row.get(field["name"])
+        if value is None:
+            continue
+        if field.get("mode") == "REPEATED":
+            values[field["name"]] = [
+                _encode_value(field["type"], v) for v in value if v is not None
+            ]
+        else:
+            values[field["name"]] = _encode_value(field["type"], value)
+    return values
+
+
+def message_class(schema: list[dict], name: str) -> tuple[Any, Any]:
+    """(DescriptorProto for the writer schema, message class) for a flat table schema."""
+    from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+    message = descriptor_pb2.DescriptorProto(name=name)
+    for number, field in enumerate(schema, start=1):
+        repeated = field.get("mode") == "REPEATED"
+        message.field.add(
+            name=field["name"],
+            number=number,
+            type=getattr(descriptor_pb2.FieldDescriptorProto, PROTO_TYPES[field["type"]]),
+            label=(
+                descriptor_pb2.FieldDescriptorProto.LABEL_REPEATED
+                if repeated
+                else descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL
+            ),
+        )
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name=f"{name}.proto", syntax="proto2", message_type=[message]
+    )
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return message, message_factory.GetMessageClass(pool.FindMessageTypeByName(name))
+
+
+def append_rows(
+    table_path: str, schema: list[dict], rows: list[dict], name: str, committed: bool = True
+) -> None:
+    """
+    Append rows to a table (projects/P/datasets/D/tables/T) in one AppendRows request.
+
+    committed=True writes through a new COMMITTED stream at offset 0, so a retried
+    request cannot append twice; committed=False uses the table's _default stream.
+    Rows are queryable as soon as the call returns.
+    """
+    from google.cloud import bigquery_storage_v1
+    from google.cloud.bigquery_storage_v1 import types, writer
+
+    client = bigquery_storage_v1.BigQueryWriteClient()
+    descriptor, row_class = message_class(schema, name)
+    if committed:
+        stream = client.create_write_stream(
+            parent=table_path,
+            write_stream=types.WriteStream(type_=types.WriteStream.Type.COMMITTED),
+        )
+        stream_name = stream.name
+    else:
+        stream_name = f"{table_path}/streams/_default"
+
+    template = types.AppendRowsRequest(
+        write_stream=stream_name,
+        proto_rows=types.AppendRowsRequest.ProtoData(
+            writer_schema=types.ProtoSchema(proto_descriptor=descriptor)
+        ),
+    )
+    append_stream = writer.AppendRowsStream(client, template)
+    try:
+        request = types.AppendRowsRequest(
+            proto_rows=types.AppendRowsRequest.ProtoData(
+                rows=types.ProtoRows(
+                    serialized_rows=[
+                        row_class(**encode_row(schema, row)).SerializeToString() for row in rows
+                    ]
+                )
+            )
+        )
+        if committed:
+            request.offset = 0
+        append_stream.send(request).result()
+    finally:
+        append_stream.close()
+
+    if committed:
+        client.finalize_write_stream(name=stream_name)
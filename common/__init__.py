@@ -0,0 +1 @@
+# Shared helpers for the Archive and Most Popular pipelines.
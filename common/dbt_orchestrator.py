@@ -0,0 +1,235 @@
+"""
+Selective dbt runs driven by what the loader actually loaded.
+
+Reads the metadata.load_manifest rows recorded since the last successful run
+(metadata.dbt_runs), maps each source to the dbt models downstream of its raw
+table, and runs `dbt run` / `dbt test` on only those, with the changed partitions
+passed as vars (see the partition_hint macro). Days with nothing loaded run no dbt
+at all; a backfill reads only the months it touched.
+
+  - archive_slim      -> source:nyt_raw.archive_articles+       (changed_archive_months)
+  - most_popular_slim -> source:nyt_raw.most_popular_articles+  (changed_snapshot_dates)
+
+The first run (no successful run logged yet) runs the full project. Manifest rows
+younger than SETTLE_SECONDS are left to the next run, so a load still committing
+its manifest row when the run starts is not skipped. That cutoff is passed to dbt
+as manifest_until: the models' load-time watermark only moves up to it, so a
+partition loaded after the cutoff (and left out of the hint) is rebuilt next run.
+
+  python -m common.dbt_orchestrator            # needs GCP_PROJECT, BQ_METADATA_DATASET
+  python -m common.dbt_orchestrator --dry-run  # print the dbt commands only
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import uuid
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+DBT_PROJECT_DIR = Path("dbt_nyt_analytics")
+
+SOURCE_SELECTORS = {
+    "archive_slim": "source:nyt_raw.archive_articles+",
+    "most_popular_slim": "source:nyt_raw.most_popular_articles+",
+}
+PARTITION_VARS = {
+    "archive_slim": "changed_archive_months",
+    "most_popular_slim": "changed_snapshot_dates",
+}
+# Same path patterns as the manifest_partition_date dbt macro
+PARTITION_PATTERNS = {
+    "archive_slim": re.compile(r"archive_slim/(\d{4})/(\d{2})\.ndjson$"),
+    "most_popular_slim": re.compile(r"most_popular_slim/(\d{4})-(\d{2})-(\d{2})/"),
+}
+# Above this many partitions of a source the hint is dropped (load-time filter only)
+MAX_PARTITION_HINTS = 400
+SETTLE_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class ManifestRow:
+    source: str
+    path: str
+    loaded_at: datetime
+
+
+@dataclass
+class RunPlan:
+    selectors: list[str] = field(default_factory=list)
+    dbt_vars: dict[str, str | list[str]] = field(default_factory=dict)
+    files: int = 0
+
+    def dbt_args(self, command: str) -> list[str]:
+        """dbt command line; an empty selector list means the whole project."""
+        args = ["dbt", command]
+        if self.selectors:
+            args += ["--select", " ".join(self.selectors)]
+        if self.dbt_vars and command == "run":
+            args += ["--vars", json.dumps(self.dbt_vars, sort_keys=True)]
+        return args
+
+
+def partition_of(source: str, path: str) -> str | None:
+    """Partition date (YYYY-MM-DD; month start for the archive) a manifest path loaded."""
+    match = PARTITION_PATTERNS[source].search(path)
+    if not match:
+        return None
+    if source == "archive_slim":
+        year, month = match.groups()
+        return f"{year}-{month}-01"
+    return "-".join(match.groups())
+
+
+def plan_run(rows: list[ManifestRow], until: datetime | None = None) -> RunPlan:
+    """Selectors and partition vars for the sources and partitions in rows.
+
+    until is the manifest cutoff the rows were read with; it is passed as the
+    manifest_until var so the models see no load newer than the hint covers.
+    """
+    partitions: dict[str, set[str]] = {}
+    plan = RunPlan()
+    for row in rows:
+        if row.source not in SOURCE_SELECTORS:
+            print(f"  Ignoring manifest row of unknown source {row.source!r}: {row.path}")
+            continue
+        plan.files += 1
+        found = partitions.setdefault(row.source, set())
+        partition = partition_of(row.source, row.path)
+        if partition:
+            found.add(partition)
+
+    for source in sorted(partitions):
+        plan.selectors.append(SOURCE_SELECTORS[source])
+        if 0 < len(partitions[source]) <= MAX_PARTITION_HINTS:
+            plan.dbt_vars[PARTITION_VARS[source]] = sorted(partitions[source])
+    if plan.selectors and until is not None:
+        plan.dbt_vars["manifest_until"] = until.astimezone(UTC).isoformat(sep=" ")
+    return plan
+
+
+def read_watermark(client: Any, runs_table: str) -> datetime | None:
+    """Manifest time covered by the last successful (or skipped) run, None if none."""
+    query = f"""
+        SELECT MAX(manifest_watermark) AS watermark
+        FROM `{runs_table}`
+        WHERE status IN ('success', 'skipped')
+    """
+    rows = list(client.query(query).result())
+    watermark: datetime | None = rows[0].watermark if rows else None
+    return watermark
+
+
+def read_manifest_rows(
+    client: Any, manifest_table: str, since: datetime, until: datetime
+) -> list[ManifestRow]:
+    from google.cloud import bigquery
+
+    query = f"""
+        SELECT source, path, loaded_at
+        FROM `{manifest_table}`
+        WHERE loaded_at > @since AND loaded_at <= @until
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("since", "TIMESTAMP", since),
+            bigquery.ScalarQueryParameter("until", "TIMESTAMP", until),
+        ]
+    )
+    return [
+        ManifestRow(row.source, row.path, row.loaded_at)
+        for row in client.query(query, job_config=job_config).result()
+    ]
+
+
+def record_run(client: Any, runs_table: str, run: dict) -> None:
+    from google.cloud import bigquery
+
+    query = f"""
+        INSERT INTO `{runs_table}`
+            (run_id, started_at, finished_at, status, manifest_watermark, files, selected)
+        VALUES (@run_id, @started_at, @finished_at, @status, @manifest_watermark, @files,
+            @selected)
+    """
+    types = {
+        "run_id": "STRING",
+        "started_at": "TIMESTAMP",
+        "finished_at": "TIMESTAMP",
+        "status": "STRING",
+        "manifest_watermark": "TIMESTAMP",
+        "files": "INT64",
+        "selected": "STRING",
+    }
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter(name, type_, run[name]) for name, type_ in types.items()
+        ]
+    )
+    client.query(query, job_config=job_config).result()
+
+
+def run_dbt(plan: RunPlan, project_dir: Path = DBT_PROJECT_DIR, dry_run: bool = False) -> bool:
+    """dbt run, then dbt test on the same selection; False if either fails."""
+    for command in ("run", "test"):
+        args = plan.dbt_args(command)
+        print(f"  {' '.join(args)}")
+        if dry_run:
+            continue
+        if subprocess.run(args, cwd=project_dir).returncode != 0:
+            print(f"Error: dbt {command} failed")
+            return False
+    return True
+
+
+def main():
+    from google.cloud import bigquery
+
+    dry_run = "--dry-run" in sys.argv
+    project = os.environ["GCP_PROJECT"]
+    metadata_dataset = os.environ["BQ_METADATA_DATASET"]
+    manifest_table = f"{project}.{metadata_dataset}.load_manifest"
+    runs_table = f"{project}.{metadata_dataset}.dbt_runs"
+    client = bigquery.Client(project=project)
+
+    started_at = datetime.now(UTC)
+    until = started_at - timedelta(seconds=SETTLE_SECONDS)
+    watermark = read_watermark(client, runs_table)
+    if watermark is None:
+        print("No successful run logged: running the whole project.")
+        plan = RunPlan()
+    else:
+        rows = read_manifest_rows(client, manifest_table, watermark, until)
+        plan = plan_run(rows, until)
+        print(f"{len(rows)} file(s) loaded since {watermark.isoformat()}.")
+
+    if watermark is not None and not plan.selectors:
+        status = "skipped"
+        print("Nothing to run.")
+    else:
+        status = "success" if run_dbt(plan, dry_run=dry_run) else "failed"
+
+    if dry_run:
+        return
+    record_run(
+        client,
+        runs_table,
+        {
+            "run_id": str(uuid.uuid4()),
+            "started_at": started_at,
+            "finished_at": datetime.now(UTC),
+            "status": status,
+            "manifest_watermark": until,
+            "files": plan.files,
+            "selected": " ".join(plan.selectors) or "*",
+        },
+    )
+    if status == "failed":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Incremental upload of local output directories to GCS.
+
+For each local directory (e.g. archive_raw) the destination prefix
+gs://GCS_BUCKET/GCS_PREFIX/<dir>/ is listed once. Each local file is compared with
+its object by size, then CRC32C (MD5 if the listing has no CRC32C), and only new or
+changed files are uploaded, on a bounded thread pool. Unchanged files cost no
+upload and fire no finalize event into the loader Cloud Function.
+
+Stats sidecars (*.stats.json) are uploaded in a first pass, before any data file, so a
+data file's finalize event never finds the previous run's sidecar of a re-uploaded
+month. Every upload carries its SHA-256 as object metadata ("sha256"), which the loader
+compares with the sidecar before trusting its row count.
+
+Files above CHUNKED_THRESHOLD (large raw archive months) are uploaded in parallel
+chunks (XML multipart) on CHUNK_WORKERS threads, at most MAX_CHUNKED_UPLOADS files at
+a time, so the pool stays within MAX_WORKERS + MAX_CHUNKED_UPLOADS * CHUNK_WORKERS
+threads; smaller ones over RESUMABLE_CHUNK_SIZE use resumable uploads.
+Hidden files (temp files, state) are skipped.
+
+Usage:
+  python -m common.gcs_sync archive_raw archive_slim
+"""
+
+import base64
+import hashlib
+import os
+import sys
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from dotenv import load_dotenv
+
+load_dotenv()
+GCS_BUCKET = os.getenv("GCS_BUCKET")
+GCS_PREFIX = os.getenv("GCS_PREFIX", "nyt-ingest")
+MAX_WORKERS = int(os.getenv("GCS_SYNC_MAX_WORKERS", "16"))
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNKED_THRESHOLD = 64 * 1024 * 1024
+CHUNK_SIZE = 32 * 1024 * 1024
+# Chunk threads per large file, and large files uploading at once
+CHUNK_WORKERS = 4
+MAX_CHUNKED_UPLOADS = 2
+# Uploaded before the data files they describe
+SIDECAR_SUFFIXES = (".stats.json",)
+
+_chunked_uploads = threading.BoundedSemaphore(MAX_CHUNKED_UPLOADS)
+
+
+@dataclass(frozen=True)
+class RemoteObject:
+    """Size and base64 checksums of an object, as returned by the bucket listing."""
+
+    size: int
+    crc32c: str | None = None
+    md5: str | None = None
+
+
+@dataclass
+class SyncResult:
+    uploaded: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    failed: list[str] = field(default_factory=list)
+
+
+def _read_chunks(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(1024 * 1024), b"")
+
+
+def crc32c_b64(path: Path) -> str:
+    """Base64 CRC32C of a file, in the form GCS reports it."""
+    import google_crc32c  # installed with google-cloud-storage
+
+    checksum = google_crc32c.Checksum()
+    for chunk in _read_chunks(path):
+        checksum.update(chunk)
+    return base64.b64encode(checksum.digest()).decode()
+
+
+def md5_b64(path: Path) -> str:
+    """Base64 MD5 of a file, in the form GCS reports it."""
+    digest = hashlib.md5()
+    for chunk in _read_chunks(path):
+        digest.update(chunk)
+    return base64.b64encode(digest.digest()).decode()
+
+
+def sha256_hex(path: Path) -> str:
+    digest = hashlib.sha256()
+    for chunk in _read_chunks(path):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def needs_upload(path: Path, remote: RemoteObject | None) -> bool:
+    """True if the object is missing or its content differs from the local file."""
+    if remote is None or path.stat().st_size != remote.size:
+        return True
+    if remote.crc32c:
+        return crc32c_b64(path) != remote.crc32c
+    if remote.md5:
+        return md5_b64(path) != remote.md5
+    return True
+
+
+def plan_uploads(
+    local_dir: Path, remote: dict[str, RemoteObject], dest_prefix: str
+) -> tuple[list[tuple[Path, str]], int]:
+    """
+    (local path, object name) pairs to upload from local_dir, plus the count of
+    unchanged files. Object names are dest_prefix/<dir name>/<relative path>.
+    """
+    uploads = []
+    unchanged = 0
+    for path in sorted(local_dir.rglob("*")):
+        relative = path.relative_to(local_dir)
+        if not path.is_file() or any(part.startswith(".") for part in relative.parts):
+            continue
+        name = f"{dest_prefix}/{local_dir.name}/{relative.as_posix()}".lstrip("/")
+        if needs_upload(path, remote.get(name)):
+            uploads.append((path, name))
+        else:
+            unchanged += 1
+    return uploads, unchanged
+
+
+def list_remote(bucket: Any, prefix: str) -> dict[str, RemoteObject]:
+    """All objects under prefix, from one (paginated) listing."""
+    return {
+        blob.name: RemoteObject(size=blob.size, crc32c=blob.crc32c, md5=blob.md5_hash)
+        for blob in bucket.list_blobs(
+            prefix=prefix, fields="items(name,size,crc32c,md5Hash),nextPageToken"
+        )
+    }
+
+
+def upload_file(bucket: Any, path: Path, name: str) -> None:
+    size = path.stat().st_size
+    metadata = {"sha256": sha256_hex(path)}
+    if size > CHUNKED_THRESHOLD:
+        from google.cloud.storage import transfer_manager
+
+        blob = bucket.blob(name)
+        blob.metadata = metadata
+        # Threads, not the default worker processes: this runs on a pool thread, and
+        # forking a multithreaded process can deadlock
+        with _chunked_uploads:
+            transfer_manager.upload_chunks_concurrently(
+                str(path),
+                blob,
+                chunk_size=CHUNK_SIZE,
+                worker_type=transfer_manager.THREAD,
+                max_workers=CHUNK_WORKERS,
+            )
+        return
+    # A chunk size makes uploads over one chunk resumable
+    blob = bucket.blob(
+        name, chunk_size=RESUMABLE_CHUNK_SIZE if size > RESUMABLE_CHUNK_SIZE else None
+    )
+    blob.metadata = metadata
+    blob.upload_from_filename(str(path), checksum="crc32c")
+
+
+def sync_dirs(
+    local_dirs: list[Path], bucket: Any, dest_prefix: str, max_workers: int = MAX_WORKERS
+) -> SyncResult:
+    """Upload new or changed files of each local directory to dest_prefix/<dir name>/."""
+    result = SyncResult()
+    uploads: list[tuple[Path, str]] = []
+    for local_dir in local_dirs:
+        if not local_dir.is_dir():
+            print(f"Skipping {local_dir} (not a directory)")
+            continue
+        remote = list_remote(bucket, f"{dest_prefix}/{local_dir.name}/".lstrip("/"))
+        planned, unchanged = plan_uploads(local_dir, remote, dest_prefix)
+        print(f"{local_dir}: {len(planned)} to upload, {unchanged} unchanged")
+        uploads.extend(planned)
+        result.unchanged += unchanged
+
+    def upload(item: tuple[Path, str]) -> tuple[str, Exception | None]:
+        path, name = item
+        try:
+            upload_file(bucket, path, name)
+        except Exception as e:
+            return name, e
+        return name, None
+
+    sidecars = [item for item in uploads if item[1].endswith(SIDECAR_SUFFIXES)]
+    data_files = [item for item in uploads if not item[1].endswith(SIDECAR_SUFFIXES)]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        # One pass at a time: every sidecar is in the bucket before any data file
+        for batch in (sidecars, data_files):
+            for name, error in pool.map(upload, batch):
+                if error is None:
+                    result.uploaded.append(name)
+                else:
+                    print(f"Error: Upload failed for gs://{bucket.name}/{name}: {error}")
+                    result.failed.append(name)
+    return result
+
+
+def main():
+    local_dirs = [Path(arg) for arg in sys.argv[1:]]
+    if not local_dirs:
+        print("Usage: python -m common.gcs_sync <dir> [<dir> ...]")
+        exit(1)
+    if not GCS_BUCKET:
+        print("Error: Set GCS_BUCKET.")
+        exit(1)
+
+    from google.cloud import storage
+
+    bucket = storage.Client().bucket(GCS_BUCKET)
+    result = sync_dirs(local_dirs, bucket, GCS_PREFIX)
+    print(
+        f"Uploaded {len(result.uploaded)}, unchanged {result.unchanged}, "
+        f"failed {len(result.failed)}."
+    )
+    if result.failed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
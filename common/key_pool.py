@@ -0,0 +1,361 @@
+"""
+Pool of NYT API keys with per-key quota accounting.
+
+Keys come from NYTIMES_API_KEYS (comma-separated) plus NYTIMES_API_KEY. Each request
+is routed to the key that can send soonest, ties going to the key with the most daily
+budget left. A key is usable when it
+has day budget left, a free slot in its per-minute window, no request within
+min_interval, and is not quarantined. When no key is usable right now, acquire()
+sleeps until the first one is (at most max_wait), so adding a key adds throughput
+without any other change.
+
+Usage is kept in a JSON state document keyed by a SHA-256 prefix of each key, so
+keys are never stored:
+
+  {"3f2a9c0d1e4b": {"day": "2026-10-19", "day_count": 42,
+                    "recent": [1760870000.1, ...], "quarantined_until": 0}}
+
+Every change is a compare-and-swap (read, modify, write if unchanged, else retry),
+so concurrent processes never lose each other's usage. To keep writes well under
+GCS's one-write-per-second limit on an object, a pool leases send slots in batches:
+one write reserves up to lease_size slots (the next free per-minute slots of the
+keys, within lease_seconds), which the pool's threads then use without touching the
+state. Slots are recorded in "recent" ahead of time, so other processes schedule
+around them. Unused slots are returned by release() (also run at exit and when a key
+is quarantined); a process that dies keeps at most lease_size slots of budget.
+The document lives in:
+  FileStateStore – a local file (.ingest_state/), shared by processes on one machine
+  GcsStateStore  – a gs:// object written with generation preconditions, shared by
+                   every run (CI runners start with an empty disk). Selected with
+                   NYTIMES_KEY_STATE_URL=gs://bucket/prefix.
+
+A 429 quarantines the key for cooldown_seconds, a 401 for unauthorized_cooldown_seconds.
+"""
+
+import atexit
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Protocol, TypeVar
+
+STATE_DIR = Path(".ingest_state")
+# gs://bucket/prefix for state that outlives the machine (e.g. CI runners)
+STATE_URL = os.getenv("NYTIMES_KEY_STATE_URL", "").rstrip("/")
+# Default NYT limits per key and API
+REQUESTS_PER_MINUTE = 5
+REQUESTS_PER_DAY = int(os.getenv("NYTIMES_KEY_REQUESTS_PER_DAY", "500"))
+COOLDOWN_SECONDS = float(os.getenv("NYTIMES_KEY_COOLDOWN_SECONDS", "300"))
+UNAUTHORIZED_COOLDOWN_SECONDS = 24 * 3600
+# Send slots reserved per state write, at most LEASE_SECONDS ahead
+LEASE_SIZE = int(os.getenv("NYTIMES_KEY_LEASE_SIZE", "10"))
+LEASE_SECONDS = 60.0
+
+
+def keys_from_env() -> list[str]:
+    """NYTIMES_API_KEYS (comma-separated) followed by NYTIMES_API_KEY, without duplicates."""
+    keys = [k.strip() for k in os.getenv("NYTIMES_API_KEYS", "").split(",") if k.strip()]
+    single = (os.getenv("NYTIMES_API_KEY") or "").strip()
+    if single:
+        keys.append(single)
+    return list(dict.fromkeys(keys))
+
+
+def key_id(key: str) -> str:
+    """Stable, non-secret identifier of a key for the state file and logs."""
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
+T = TypeVar("T")
+
+
+class StateStore(Protocol):
+    """A JSON document with compare-and-swap on a version token."""
+
+    def load(self) -> tuple[dict, str | None]:
+        """Return (state, token); ({}, None) if nothing is stored yet."""
+        ...
+
+    def save(self, state: dict, token: str | None) -> bool:
+        """Store state if the stored token still equals token (None: must not exist)."""
+        ...
+
+
+class FileStateStore:
+    """State file on local disk; the token is a hash of its content, checked under flock."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def _read(self) -> tuple[dict, str | None]:
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return {}, None
+        token = hashlib.sha256(data).hexdigest()
+        try:
+            state = json.loads(data)
+        except ValueError:
+            state = {}
+        return state, token
+
+    def load(self) -> tuple[dict, str | None]:
+        return self._read()
+
+    def save(self, state: dict, token: str | None) -> bool:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(f".{self.path.name}.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if self._read()[1] != token:
+                return False
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(state, separators=(",", ":")))
+            os.replace(tmp_path, self.path)
+            return True
+
+
+class GcsStateStore:
+    """
+    State object at gs://bucket/path; the object generation is the token.
+
+    Writes carry if_generation_match (0 = create only), like archive.leases, so two
+    runners updating the same keys never overwrite each other.
+    """
+
+    def __init__(self, url: str, client: Any = None):
+        bucket_name, _, self.blob_name = url.removeprefix("gs://").partition("/")
+        if client is None:
+            from google.cloud import storage
+
+            client = storage.Client()
+        self.bucket = client.bucket(bucket_name)
+
+    def load(self) -> tuple[dict, str | None]:
+        from google.api_core.exceptions import NotFound
+
+        blob = self.bucket.blob(self.blob_name)
+        try:
+            data = blob.download_as_bytes()
+        except NotFound:
+            return {}, None
+        # download_as_bytes sets the generation of the bytes it returned
+        return json.loads(data), str(blob.generation)
+
+    def save(self, state: dict, token: str | None) -> bool:
+        from google.api_core.exceptions import PreconditionFailed
+
+        blob = self.bucket.blob(self.blob_name)
+        try:
+            blob.upload_from_string(
+                json.dumps(state, separators=(",", ":")),
+                content_type="application/json",
+                if_generation_match=int(token or 0),
+            )
+        except PreconditionFailed:
+            return False
+        return True
+
+
+def open_state_store(name: str) -> StateStore:
+    """Store for the state document name: under NYTIMES_KEY_STATE_URL if set, else STATE_DIR."""
+    if STATE_URL:
+        return GcsStateStore(f"{STATE_URL}/{name}")
+    return FileStateStore(STATE_DIR / name)
+
+
+class KeyPool:
+    """Route requests across API keys within per-minute and per-day budgets."""
+
+    def __init__(
+        self,
+        keys: list[str],
+        state: Path | StateStore,
+        per_minute: int = REQUESTS_PER_MINUTE,
+        per_day: int = REQUESTS_PER_DAY,
+        min_interval: float = 0.0,
+        cooldown_seconds: float = COOLDOWN_SECONDS,
+        unauthorized_cooldown_seconds: float = UNAUTHORIZED_COOLDOWN_SECONDS,
+        max_wait: float = 900.0,
+        lease_size: int = LEASE_SIZE,
+        lease_seconds: float = LEASE_SECONDS,
+    ):
+        self.keys = list(dict.fromkeys(keys))
+        self.store = FileStateStore(state) if isinstance(state, Path) else state
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.min_interval = min_interval
+        self.cooldown_seconds = cooldown_seconds
+        self.unauthorized_cooldown_seconds = unauthorized_cooldown_seconds
+        self.max_wait = max_wait
+        self.lease_size = max(1, lease_size)
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        # Leased (send time, key) slots not handed out yet, earliest first
+        self._leased: list[tuple[float, str]] = []
+        self._lease_lock = threading.Lock()
+        atexit.register(self.release)
+
+    @classmethod
+    def from_env(cls, state_name: str, **kwargs) -> "KeyPool":
+        """Pool of the keys in the environment with state document state_name."""
+        return cls(keys_from_env(), open_state_store(state_name), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _update(self, change: Callable[[dict], T]) -> T:
+        """Apply change to the shared state and store it, retrying on concurrent writes."""
+        with self._lock:
+            while True:
+                state, token = self.store.load()
+                result = change(state)
+                if self.store.save(state, token):
+                    return result
+
+    def _read(self) -> dict:
+        with self._lock:
+            return self.store.load()[0]
+
+    def _usage(self, state: dict, key: str, now: float) -> dict:
+        """A key's usage record, with the day counter rolled over and old calls pruned."""
+        usage: dict = state.setdefault(
+            key_id(key), {"day": "", "day_count": 0, "recent": [], "quarantined_until": 0}
+        )
+        today = datetime.fromtimestamp(now, UTC).strftime("%Y-%m-%d")
+        if usage["day"] != today:
+            usage["day"], usage["day_count"] = today, 0
+        window = max(60.0, self.min_interval)
+        usage["recent"] = [t for t in usage["recent"] if now - t < window]
+        return usage
+
+    def _ready_at(self, usage: dict, now: float) -> float:
+        """Earliest time the key may send its next request."""
+        recent = usage["recent"]
+        ready = float(usage["quarantined_until"])
+        in_minute = [t for t in recent if now - t < 60]
+        if len(in_minute) >= self.per_minute:
+            ready = max(ready, in_minute[-self.per_minute] + 60)
+        if self.min_interval and recent:
+            ready = max(ready, recent[-1] + self.min_interval)
+        return ready
+
+    def _next_slot(self, usage: dict, now: float) -> float:
+        """Earliest send time of a key, after every slot already recorded for it."""
+        recent = usage["recent"]
+        at = max(now, recent[-1]) if recent else now
+        while (ready := self._ready_at(usage, at)) > at:
+            at = ready
+        return at
+
+    def _reserve(self, state: dict, now: float) -> list[tuple[float, str]]:
+        """
+        Record the next lease_size send slots (earliest first, ties to the key with the
+        most day budget left) within lease_seconds. If none is that close, only the
+        first slot, if it is within max_wait.
+        """
+        slots: list[tuple[float, str]] = []
+        horizon = now + self.lease_seconds
+        while len(slots) < self.lease_size:
+            best: tuple[float, int, str] | None = None
+            for key in self.keys:
+                usage = self._usage(state, key, now)
+                left = self.per_day - usage["day_count"]
+                if left <= 0:
+                    continue
+                candidate = (self._next_slot(usage, now), -left, key)
+                if best is None or candidate[:2] < best[:2]:
+                    best = candidate
+            if best is None:
+                break
+            at, _, key = best
+            if at > horizon and (slots or at - now > self.max_wait):
+                break
+            usage = state[key_id(key)]
+            usage["day_count"] += 1
+            usage["recent"].append(at)
+            slots.append((at, key))
+            if at > horizon:
+                break
+        return slots
+
+    def _unreserve(self, state: dict, slots: list[tuple[float, str]], now: float) -> None:
+        """Give unused slots back: drop them from recent and refund the day budget."""
+        for at, key in slots:
+            usage = self._usage(state, key, now)
+            if at in usage["recent"]:
+                usage["recent"].remove(at)
+                if usage["day"] == datetime.fromtimestamp(at, UTC).strftime("%Y-%m-%d"):
+                    usage["day_count"] = max(0, usage["day_count"] - 1)
+
+    def acquire(self) -> str | None:
+        """
+        Take the next leased send slot (leasing more when none is left), wait for its
+        time and return its key. Returns None when no key can be used within max_wait.
+        """
+        with self._lease_lock:
+            if not self._leased:
+                now = time.time()
+                leased = self._update(lambda state: self._reserve(state, now))
+                self._leased = sorted(leased, key=lambda slot: slot[0])
+            if not self._leased:
+                return None
+            at, key = self._leased.pop(0)
+        time.sleep(max(0.0, at - time.time()))
+        return key
+
+    def release(self) -> None:
+        """Return the leased slots not handed out yet to the shared state."""
+        with self._lease_lock:
+            if not self._leased:
+                return
+            unused, self._leased = self._leased, []
+            self._update(lambda state: self._unreserve(state, unused, time.time()))
+
+    def exhausted(self) -> bool:
+        """True when acquire() would return None (no key usable within max_wait)."""
+        with self._lease_lock:
+            if self._leased:
+                return False
+        state, now = self._read(), time.time()
+        for key in self.keys:
+            usage = self._usage(state, key, now)
+            if usage["day_count"] < self.per_day and (
+                self._next_slot(usage, now) - now <= self.max_wait
+            ):
+                return False
+        return True
+
+    def report(self, key: str, status_code: int) -> None:
+        """Record a response status; 401 and 429 put the key in quarantine."""
+        if status_code == 401:
+            cooldown = self.unauthorized_cooldown_seconds
+        elif status_code == 429:
+            cooldown = self.cooldown_seconds
+        else:
+            return
+
+        def quarantine(state: dict) -> None:
+            now = time.time()
+            self._unreserve(state, unused, now)
+            usage = self._usage(state, key, now)
+            usage["quarantined_until"] = now + cooldown
+
+        with self._lease_lock:
+            # The key's leased slots go back; the other keys' stay leased
+            unused = [slot for slot in self._leased if slot[1] == key]
+            self._leased = [slot for slot in self._leased if slot[1] != key]
+            self._update(quarantine)
+        print(f"  Key {key_id(key)} quarantined for {cooldown:.0f}s (HTTP {status_code})")
+
+    def remaining_today(self) -> dict[str, int]:
+        """Day budget left per key id, for progress output."""
+        state, now = self._read(), time.time()
+        return {
+            key_id(key): self.per_day - self._usage(state, key, now)["day_count"]
+            for key in self.keys
+        }
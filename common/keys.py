@@ -0,0 +1,37 @@
+"""
+Shared article key for joining Archive and Most Popular records.
+
+Both APIs return the article URI (nyt://article/<uuid>); the key is that URI without
+the scheme, lowercased. Records without a usable URI fall back to a normalized URL
+(scheme, www., query string, fragment and trailing slashes removed), prefixed "url:".
+The dbt macro article_key() computes the same key in SQL for rows loaded before the
+transforms wrote it; keep the two in step.
+"""
+
+import re
+
+_NYT_URI = re.compile(r"^nyt://[a-z]+/[0-9a-f-]+$")
+_URL_SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*://")
+_URL_SUFFIX = re.compile(r"[?#].*$")
+
+
+def normalize_url(url: str | None) -> str | None:
+    """Lowercased URL without scheme, www., query, fragment or trailing slashes."""
+    if not url:
+        return None
+    value = _URL_SCHEME.sub("", url.strip().lower()).removeprefix("www.")
+    value = _URL_SUFFIX.sub("", value).rstrip("/")
+    return value or None
+
+
+def article_key(uri: str | None, url: str | None = None) -> str | None:
+    """
+    Normalized join key for an article, e.g. "article/8e6f...": from the URI when it
+    is an nyt:// URI, otherwise "url:" + normalized URL, otherwise None.
+    """
+    if uri:
+        value = uri.strip().lower()
+        if _NYT_URI.match(value):
+            return value.removeprefix("nyt://")
+    normalized = normalize_url(url)
+    return f"url:{normalized}" if normalized else None
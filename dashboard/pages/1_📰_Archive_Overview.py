@@ -18,7 +18,13 @@ from utils.bigquery_utils import (  # noqa: E402
     get_table_path,
     run_query,
 )
-from utils.chart_utils import create_bar_chart, create_line_chart  # noqa: E402
+from utils.chart_utils import (  # noqa: E402
+    choose_granularity,
+    create_bar_chart,
+    create_line_chart,
+)
+from utils.lazy_loading import OptionRegistry, SectionRegistry  # noqa: E402
+from utils.query_profiler import render_profiler_panel, reset_profile  # noqa: E402
 
 st.set_page_config(page_title="Archive Overview", page_icon="📰", layout="wide")
 
@@ -31,10 +37,57 @@ if client is None:
     st.error("Unable to connect to BigQuery. Please check your credentials.")
     st.stop()
 
+reset_profile()
+
 # Initialize session state for filters
 if "archive_filters_applied" not in st.session_state:
     st.session_state.archive_filters_applied = False
 
+
+def load_distinct(column: str) -> list[str]:
+    query = f"""
+    SELECT DISTINCT {column}
+    FROM {get_table_path("core", "fct_articles")}
+    WHERE {column} != 'Unknown'
+    ORDER BY {column}
+    """
+    df = run_query(client, query, label=f"filter_options:{column}")
+    return df[column].tolist() if not df.empty else []
+
+
+def load_top_authors() -> list[str]:
+    authors_query = f"""
+    SELECT author_full_name, total_articles
+    FROM {get_table_path("analytics", "agg_author_performance")}
+    WHERE author_full_name IS NOT NULL AND author_full_name != ''
+    ORDER BY total_articles DESC
+    LIMIT 500
+    """
+    authors_df = run_query(client, authors_query, label="filter_options:authors")
+    return authors_df["author_full_name"].tolist() if not authors_df.empty else []
+
+
+def load_top_keywords() -> list[str]:
+    keywords_query = f"""
+    SELECT keyword_value, SUM(article_count) as total
+    FROM {get_table_path("analytics", "agg_keyword_trends")}
+    WHERE keyword_value IS NOT NULL
+    GROUP BY keyword_value
+    ORDER BY total DESC
+    LIMIT 500
+    """
+    keywords_df = run_query(client, keywords_query, label="filter_options:keywords")
+    return keywords_df["keyword_value"].tolist() if not keywords_df.empty else []
+
+
+# Sidebar option lists load on first interaction (see utils.lazy_loading)
+filter_options = OptionRegistry("archive")
+filter_options.register("sections", lambda: load_distinct("section_name"))
+filter_options.register("news_desks", lambda: load_distinct("news_desk"))
+filter_options.register("materials", lambda: load_distinct("type_of_material"))
+filter_options.register("authors", load_top_authors)
+filter_options.register("keywords", load_top_keywords)
+
 # Sidebar filters
 with st.sidebar:
     st.header("Filters")
@@ -47,7 +100,7 @@ with st.sidebar:
     FROM {get_table_path("core", "fct_articles")}
     WHERE pub_date >= DATE_SUB(CURRENT_DATE(), INTERVAL 100 YEAR)
     """
-    date_range_df = run_query(client, date_range_query)
+    date_range_df = run_query(client, date_range_query, label="date_range")
 
     if not date_range_df.empty:
         min_date = pd.to_datetime(date_range_df["min_date"].iloc[0])
@@ -62,88 +115,33 @@ with st.sidebar:
             "To", value=max_date, min_value=min_date, max_value=max_date, key="date_to"
         )
 
-        # Get filter options
-        sections_query = f"""
-        SELECT DISTINCT section_name
-        FROM {get_table_path("core", "fct_articles")}
-        WHERE section_name != 'Unknown'
-        ORDER BY section_name
-        """
-        sections_df = run_query(client, sections_query)
-        sections_list = sections_df["section_name"].tolist() if not sections_df.empty else []
-
-        news_desk_query = f"""
-        SELECT DISTINCT news_desk
-        FROM {get_table_path("core", "fct_articles")}
-        WHERE news_desk != 'Unknown'
-        ORDER BY news_desk
-        """
-        news_desk_df = run_query(client, news_desk_query)
-        news_desk_list = news_desk_df["news_desk"].tolist() if not news_desk_df.empty else []
-
-        type_material_query = f"""
-        SELECT DISTINCT type_of_material
-        FROM {get_table_path("core", "fct_articles")}
-        WHERE type_of_material != 'Unknown'
-        ORDER BY type_of_material
-        """
-        type_material_df = run_query(client, type_material_query)
-        type_material_list = (
-            type_material_df["type_of_material"].tolist() if not type_material_df.empty else []
-        )
-
         # Section filter
         st.subheader("Sections")
-        selected_sections = st.multiselect(
-            "Select sections", options=sections_list, default=[], key="sections_filter"
-        )
+        selected_sections = filter_options.multiselect("sections", "Select sections")
 
         # News Desk filter
         st.subheader("News Desk")
-        selected_news_desks = st.multiselect(
-            "Select news desks", options=news_desk_list, default=[], key="news_desk_filter"
-        )
+        selected_news_desks = filter_options.multiselect("news_desks", "Select news desks")
 
         # Type of Material filter
         st.subheader("Type of Material")
-        selected_materials = st.multiselect(
-            "Select material types",
-            options=type_material_list,
-            default=[],
-            key="material_filter",
-        )
-
-        # Authors filter - load top authors for better UX
-        authors_query = f"""
-        SELECT author_full_name, total_articles
-        FROM {get_table_path("analytics", "agg_author_performance")}
-        WHERE author_full_name IS NOT NULL AND author_full_name != ''
-        ORDER BY total_articles DESC
-        LIMIT 500
-        """
-        authors_df = run_query(client, authors_query)
-        authors_list = authors_df["author_full_name"].tolist() if not authors_df.empty else []
+        selected_materials = filter_options.multiselect("materials", "Select material types")
 
+        # Authors filter - top 500 authors
         st.subheader("Authors")
-        selected_authors = st.multiselect(
-            "Select authors", options=authors_list, default=[], key="authors_filter"
-        )
-
-        # Keywords filter - load top keywords
-        keywords_query = f"""
-        SELECT keyword_value, SUM(article_count) as total
-        FROM {get_table_path("analytics", "agg_keyword_trends")}
-        WHERE keyword_value IS NOT NULL
-        GROUP BY keyword_value
-        ORDER BY total DESC
-        LIMIT 500
-        """
-        keywords_df = run_query(client, keywords_query)
-        keywords_list = keywords_df["keyword_value"].tolist() if not keywords_df.empty else []
+        selected_authors = filter_options.multiselect("authors", "Select authors")
 
+        # Keywords filter - top 500 keywords
         st.subheader("Keywords")
-        selected_keywords = st.multiselect(
-            "Select keywords", options=keywords_list, default=[], key="keywords_filter"
+        selected_keywords = filter_options.multiselect("keywords", "Select keywords")
+
+        # Exact counts scan fct_articles; approximate counts merge pre-aggregated HLL sketches
+        st.subheader("Count Mode")
+        approx_counts = st.toggle(
+            "Approximate counts (HLL sketches)",
+            key="approx_counts",
+            help="Much cheaper; counts are within about 1% and dates are rounded to months. "
+            "Not available with author or keyword filters.",
         )
 
         st.markdown("---")
@@ -154,36 +152,37 @@ with st.sidebar:
 
         if st.button("Reset Filters"):
             st.session_state.archive_filters_applied = False
-            for key in [
-                "sections_filter",
-                "news_desk_filter",
-                "material_filter",
-                "authors_filter",
-                "keywords_filter",
-            ]:
-                if key in st.session_state:
-                    st.session_state[key] = []
+            filter_options.reset()
             st.rerun()
 
 
 # Build WHERE clause based on filters
-def build_where_clause():
-    conditions = ["a.pub_date >= DATE_SUB(CURRENT_DATE(), INTERVAL 100 YEAR)"]
-
-    if date_from and date_to:
-        conditions.append(f"a.pub_date BETWEEN '{date_from}' AND '{date_to}'")
+def build_where_clause(alias="a", date_column="pub_date"):
+    if date_column == "pub_month":
+        # Sketch cube rows are monthly: keep every month that overlaps the range
+        conditions = [
+            f"{alias}.pub_month >= DATE_TRUNC(DATE_SUB(CURRENT_DATE(), INTERVAL 100 YEAR), MONTH)"
+        ]
+        if date_from and date_to:
+            conditions.append(
+                f"{alias}.pub_month BETWEEN DATE_TRUNC('{date_from}', MONTH) AND '{date_to}'"
+            )
+    else:
+        conditions = [f"{alias}.{date_column} >= DATE_SUB(CURRENT_DATE(), INTERVAL 100 YEAR)"]
+        if date_from and date_to:
+            conditions.append(f"{alias}.{date_column} BETWEEN '{date_from}' AND '{date_to}'")
 
     if selected_sections:
         sections_str = "', '".join(selected_sections)
-        conditions.append(f"a.section_name IN ('{sections_str}')")
+        conditions.append(f"{alias}.section_name IN ('{sections_str}')")
 
     if selected_news_desks:
         desks_str = "', '".join(selected_news_desks)
-        conditions.append(f"a.news_desk IN ('{desks_str}')")
+        conditions.append(f"{alias}.news_desk IN ('{desks_str}')")
 
     if selected_materials:
         materials_str = "', '".join(selected_materials)
-        conditions.append(f"a.type_of_material IN ('{materials_str}')")
+        conditions.append(f"{alias}.type_of_material IN ('{materials_str}')")
 
     return " AND ".join(conditions)
 
@@ -193,16 +192,11 @@ def build_author_filter():
         authors_str = "', '".join([a.replace("'", "\\'") for a in selected_authors])
         return f"""
         AND a.article_id IN (
-            SELECT DISTINCT article_id
-            FROM {get_table_path("staging", "stg_archive_articles")},
-            UNNEST(byline_person) as author
-            WHERE TRIM(CONCAT(
-                COALESCE(author.firstname, ''),
-                ' ',
-                COALESCE(author.middlename, ''),
-                ' ',
-                COALESCE(author.lastname, '')
-            )) IN ('{authors_str}')
+            SELECT ia.article_id
+            FROM {get_table_path("intermediate", "int_authors_flattened")} ia
+            INNER JOIN {get_table_path("core", "dim_authors")} da
+                ON ia.author_id = da.author_id
+            WHERE da.author_full_name IN ('{authors_str}')
         )
         """
     return ""
@@ -213,10 +207,11 @@ def build_keyword_filter():
         keywords_str = "', '".join([k.replace("'", "\\'") for k in selected_keywords])
         return f"""
         AND a.article_id IN (
-            SELECT DISTINCT article_id
-            FROM {get_table_path("staging", "stg_archive_articles")},
-            UNNEST(keywords) as keyword
-            WHERE keyword.value IN ('{keywords_str}')
+            SELECT ik.article_id
+            FROM {get_table_path("intermediate", "int_keywords_flattened")} ik
+            INNER JOIN {get_table_path("core", "dim_keywords")} dk
+                ON ik.keyword_id = dk.keyword_id
+            WHERE dk.keyword_value IN ('{keywords_str}')
         )
         """
     return ""
@@ -226,308 +221,327 @@ where_clause = build_where_clause()
 author_filter = build_author_filter()
 keyword_filter = build_keyword_filter()
 
-# Main content
-st.markdown("---")
+# Time series resolution: month, quarter or year depending on the selected span
+granularity = choose_granularity(date_from, date_to)
+period_label = granularity.lower()
+
+# Approximate mode reads the agg_article_sketches cube, which has no author/keyword grain
+use_sketches = approx_counts and not selected_authors and not selected_keywords
+sketch_where_clause = build_where_clause("s", "pub_month")
+if approx_counts and not use_sketches:
+    st.info("Approximate counts are not available with author or keyword filters; showing exact.")
 
-# Time Series: Articles Published Each Month
-st.subheader("📈 Articles Published by Month")
+SKETCH_MEASURES = {
+    "article_count": "HLL_COUNT.MERGE(article_sketch) as article_count",
+    "avg_word_count": (
+        "ROUND(SAFE_DIVIDE(SUM(total_positive_word_count), SUM(articles_with_word_count)), 0) "
+        "as avg_word_count"
+    ),
+}
 
-with st.spinner("Loading monthly article counts..."):
-    monthly_query = f"""
+
+def sketch_time_series_query(measure):
+    """Time series from the sketch cube (approximate mode)"""
+    return f"""
     SELECT
-        DATE_TRUNC(pub_date, MONTH) as pub_month,
-        COUNT(DISTINCT article_id) as article_count
-    FROM {get_table_path("core", "fct_articles")} a
-    WHERE {where_clause}
-        {author_filter}
-        {keyword_filter}
-    GROUP BY pub_month
-    ORDER BY pub_month
+        DATE_TRUNC(pub_month, {granularity}) as pub_period,
+        {SKETCH_MEASURES[measure]}
+    FROM {get_table_path("analytics", "agg_article_sketches")} s
+    WHERE {sketch_where_clause}
+    GROUP BY pub_period
+    ORDER BY pub_period
     """
-    monthly_df = run_query(client, monthly_query)
-
-if not monthly_df.empty:
-    fig_monthly = create_line_chart(
-        monthly_df,
-        x="pub_month",
-        y="article_count",
-        title="Number of Articles Published Each Month",
-        height=400,
-    )
-    st.plotly_chart(fig_monthly, use_container_width=True)
-else:
-    st.info("No data available for the selected filters.")
-
-# Average Word Count by Month
-st.subheader("📊 Average Article Word Count by Month")
-
-with st.spinner("Loading average word count by month..."):
-    avg_wc_monthly_query = f"""
+
+
+def sketch_breakdown_query(dimension):
+    """Top 15 breakdown from the sketch cube (approximate mode)"""
+    return f"""
     SELECT
-        DATE_TRUNC(pub_date, MONTH) as pub_month,
-        ROUND(AVG(CASE WHEN word_count > 0 THEN word_count END), 0) as avg_word_count
-    FROM {get_table_path("core", "fct_articles")} a
-    WHERE {where_clause}
-        {author_filter}
-        {keyword_filter}
-    GROUP BY pub_month
-    ORDER BY pub_month
+        {dimension},
+        {SKETCH_MEASURES["article_count"]},
+        {SKETCH_MEASURES["avg_word_count"]}
+    FROM {get_table_path("analytics", "agg_article_sketches")} s
+    WHERE {sketch_where_clause}
+    GROUP BY {dimension}
+    ORDER BY article_count DESC
+    LIMIT 15
     """
-    avg_wc_monthly_df = run_query(client, avg_wc_monthly_query)
-
-if not avg_wc_monthly_df.empty:
-    fig_avg_wc = create_line_chart(
-        avg_wc_monthly_df,
-        x="pub_month",
-        y="avg_word_count",
-        title="Average Word Count by Month (positive values only)",
-        height=400,
-    )
-    st.plotly_chart(fig_avg_wc, use_container_width=True)
-else:
-    st.info("No data available for the selected filters.")
 
+
+# Main content: sections fetch their data only when opened (see utils.lazy_loading)
 st.markdown("---")
 
-# Breakdowns section
-col1, col2 = st.columns(2)
+sections = SectionRegistry("archive")
 
-with col1:
-    # Section breakdown
-    st.subheader("📑 By Section")
 
-    with st.spinner("Loading section breakdown..."):
-        section_query = f"""
+@sections.section("📈 Articles Published Over Time", eager=True)
+def monthly_articles():
+    with st.spinner(f"Loading article counts by {period_label}..."):
+        monthly_query = f"""
         SELECT
-            section_name,
-            COUNT(DISTINCT article_id) as article_count,
-            ROUND(AVG(CASE WHEN word_count > 0 THEN word_count END), 0) as avg_word_count
+            DATE_TRUNC(pub_date, {granularity}) as pub_period,
+            COUNT(DISTINCT article_id) as article_count
         FROM {get_table_path("core", "fct_articles")} a
         WHERE {where_clause}
             {author_filter}
             {keyword_filter}
-        GROUP BY section_name
-        ORDER BY article_count DESC
-        LIMIT 15
+        GROUP BY pub_period
+        ORDER BY pub_period
         """
-        section_df = run_query(client, section_query)
-
-    if not section_df.empty:
-        fig_section = create_bar_chart(
-            section_df,
-            x="section_name",
+        if use_sketches:
+            monthly_query = sketch_time_series_query("article_count")
+        monthly_df = run_query(client, monthly_query, label="monthly_articles")
+
+    if not monthly_df.empty:
+        fig_monthly = create_line_chart(
+            monthly_df,
+            x="pub_period",
             y="article_count",
-            title="Top 15 Sections by Article Count",
-            height=350,
-        )
-        st.plotly_chart(fig_section, use_container_width=True)
-
-        st.dataframe(
-            section_df[["section_name", "article_count", "avg_word_count"]],
-            hide_index=True,
-            use_container_width=True,
-            height=300,
+            title=f"Number of Articles Published per {period_label.title()}",
+            height=400,
         )
+        st.plotly_chart(fig_monthly, use_container_width=True)
     else:
-        st.info("No section data available.")
+        st.info("No data available for the selected filters.")
 
-with col2:
-    # News Desk breakdown
-    st.subheader("🏢 By News Desk")
 
-    with st.spinner("Loading news desk breakdown..."):
-        news_desk_query = f"""
+@sections.section("📊 Average Article Word Count Over Time")
+def monthly_avg_word_count():
+    with st.spinner(f"Loading average word count by {period_label}..."):
+        avg_wc_monthly_query = f"""
         SELECT
-            news_desk,
-            COUNT(DISTINCT article_id) as article_count,
+            DATE_TRUNC(pub_date, {granularity}) as pub_period,
             ROUND(AVG(CASE WHEN word_count > 0 THEN word_count END), 0) as avg_word_count
         FROM {get_table_path("core", "fct_articles")} a
         WHERE {where_clause}
             {author_filter}
             {keyword_filter}
-        GROUP BY news_desk
-        ORDER BY article_count DESC
-        LIMIT 15
+        GROUP BY pub_period
+        ORDER BY pub_period
         """
-        news_desk_breakdown_df = run_query(client, news_desk_query)
-
-    if not news_desk_breakdown_df.empty:
-        fig_desk = create_bar_chart(
-            news_desk_breakdown_df,
-            x="news_desk",
-            y="article_count",
-            title="Top 15 News Desks by Article Count",
-            height=350,
-        )
-        st.plotly_chart(fig_desk, use_container_width=True)
-
-        st.dataframe(
-            news_desk_breakdown_df[["news_desk", "article_count", "avg_word_count"]],
-            hide_index=True,
-            use_container_width=True,
-            height=300,
+        if use_sketches:
+            avg_wc_monthly_query = sketch_time_series_query("avg_word_count")
+        avg_wc_monthly_df = run_query(client, avg_wc_monthly_query, label="monthly_avg_word_count")
+
+    if not avg_wc_monthly_df.empty:
+        fig_avg_wc = create_line_chart(
+            avg_wc_monthly_df,
+            x="pub_period",
+            y="avg_word_count",
+            title=f"Average Word Count by {period_label.title()} (positive values only)",
+            height=400,
         )
+        st.plotly_chart(fig_avg_wc, use_container_width=True)
     else:
-        st.info("No news desk data available.")
+        st.info("No data available for the selected filters.")
 
-st.markdown("---")
 
-# Type of Material breakdown
-st.subheader("📄 By Type of Material")
-
-with st.spinner("Loading material type breakdown..."):
-    material_query = f"""
-    SELECT
-        type_of_material,
-        COUNT(DISTINCT article_id) as article_count,
-        ROUND(AVG(CASE WHEN word_count > 0 THEN word_count END), 0) as avg_word_count
-    FROM {get_table_path("core", "fct_articles")} a
-    WHERE {where_clause}
-        {author_filter}
-        {keyword_filter}
-    GROUP BY type_of_material
-    ORDER BY article_count DESC
-    LIMIT 15
-    """
-    material_df = run_query(client, material_query)
-
-if not material_df.empty:
-    col1, col2 = st.columns([2, 1])
+@sections.section("📑 By Section / 🏢 By News Desk")
+def section_and_news_desk_breakdown():
+    col1, col2 = st.columns(2)
 
     with col1:
-        fig_material = create_bar_chart(
-            material_df,
-            x="type_of_material",
-            y="article_count",
-            title="Top 15 Material Types by Article Count",
-            height=400,
-        )
-        st.plotly_chart(fig_material, use_container_width=True)
-
-    with col2:
-        st.dataframe(
-            material_df[["type_of_material", "article_count", "avg_word_count"]],
-            hide_index=True,
-            use_container_width=True,
-            height=400,
-        )
-else:
-    st.info("No material type data available.")
-
-st.markdown("---")
-
-# Top Keywords and Authors
-col1, col2 = st.columns(2)
+        # Section breakdown
+        st.subheader("📑 By Section")
 
-with col1:
-    st.subheader("🏷️ Top 10 Keywords")
-
-    with st.spinner("Loading top keywords..."):
-        if selected_keywords:
-            # If keywords are filtered, show those specific keywords
-            keywords_str = "', '".join([k.replace("'", "\\'") for k in selected_keywords])
-            top_keywords_query = f"""
+        with st.spinner("Loading section breakdown..."):
+            section_query = f"""
             SELECT
-                keyword.value as keyword_value,
-                COUNT(DISTINCT a.article_id) as article_count,
-                ROUND(AVG(CASE WHEN a.word_count > 0 THEN a.word_count END), 0) as avg_word_count
+                section_name,
+                COUNT(DISTINCT article_id) as article_count,
+                ROUND(AVG(CASE WHEN word_count > 0 THEN word_count END), 0) as avg_word_count
             FROM {get_table_path("core", "fct_articles")} a
-            CROSS JOIN {get_table_path("staging", "stg_archive_articles")} sa
-            CROSS JOIN UNNEST(sa.keywords) as keyword
-            WHERE a.article_id = sa.article_id
-                AND keyword.value IN ('{keywords_str}')
-                AND {where_clause}
+            WHERE {where_clause}
                 {author_filter}
-            GROUP BY keyword.value
+                {keyword_filter}
+            GROUP BY section_name
             ORDER BY article_count DESC
-            LIMIT 10
+            LIMIT 15
             """
+            if use_sketches:
+                section_query = sketch_breakdown_query("section_name")
+            section_df = run_query(client, section_query, label="section_breakdown")
+
+        if not section_df.empty:
+            fig_section = create_bar_chart(
+                section_df,
+                x="section_name",
+                y="article_count",
+                title="Top 15 Sections by Article Count",
+                height=350,
+            )
+            st.plotly_chart(fig_section, use_container_width=True)
+
+            st.dataframe(
+                section_df[["section_name", "article_count", "avg_word_count"]],
+                hide_index=True,
+                use_container_width=True,
+                height=300,
+            )
         else:
-            top_keywords_query = f"""
+            st.info("No section data available.")
+
+    with col2:
+        # News Desk breakdown
+        st.subheader("🏢 By News Desk")
+
+        with st.spinner("Loading news desk breakdown..."):
+            news_desk_query = f"""
             SELECT
-                keyword.value as keyword_value,
-                COUNT(DISTINCT a.article_id) as article_count,
-                ROUND(AVG(CASE WHEN a.word_count > 0 THEN a.word_count END), 0) as avg_word_count
+                news_desk,
+                COUNT(DISTINCT article_id) as article_count,
+                ROUND(AVG(CASE WHEN word_count > 0 THEN word_count END), 0) as avg_word_count
             FROM {get_table_path("core", "fct_articles")} a
-            INNER JOIN {get_table_path("staging", "stg_archive_articles")} sa
-                ON a.article_id = sa.article_id
-            CROSS JOIN UNNEST(sa.keywords) as keyword
             WHERE {where_clause}
                 {author_filter}
-            GROUP BY keyword.value
+                {keyword_filter}
+            GROUP BY news_desk
             ORDER BY article_count DESC
-            LIMIT 10
+            LIMIT 15
             """
-        top_keywords_df = run_query(client, top_keywords_query)
+            if use_sketches:
+                news_desk_query = sketch_breakdown_query("news_desk")
+            news_desk_breakdown_df = run_query(client, news_desk_query, label="news_desk_breakdown")
+
+        if not news_desk_breakdown_df.empty:
+            fig_desk = create_bar_chart(
+                news_desk_breakdown_df,
+                x="news_desk",
+                y="article_count",
+                title="Top 15 News Desks by Article Count",
+                height=350,
+            )
+            st.plotly_chart(fig_desk, use_container_width=True)
+
+            st.dataframe(
+                news_desk_breakdown_df[["news_desk", "article_count", "avg_word_count"]],
+                hide_index=True,
+                use_container_width=True,
+                height=300,
+            )
+        else:
+            st.info("No news desk data available.")
+
 
-    if not top_keywords_df.empty:
-        st.dataframe(top_keywords_df, hide_index=True, use_container_width=True, height=400)
+@sections.section("📄 By Type of Material")
+def material_breakdown():
+    with st.spinner("Loading material type breakdown..."):
+        material_query = f"""
+        SELECT
+            type_of_material,
+            COUNT(DISTINCT article_id) as article_count,
+            ROUND(AVG(CASE WHEN word_count > 0 THEN word_count END), 0) as avg_word_count
+        FROM {get_table_path("core", "fct_articles")} a
+        WHERE {where_clause}
+            {author_filter}
+            {keyword_filter}
+        GROUP BY type_of_material
+        ORDER BY article_count DESC
+        LIMIT 15
+        """
+        if use_sketches:
+            material_query = sketch_breakdown_query("type_of_material")
+        material_df = run_query(client, material_query, label="material_breakdown")
+
+    if not material_df.empty:
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            fig_material = create_bar_chart(
+                material_df,
+                x="type_of_material",
+                y="article_count",
+                title="Top 15 Material Types by Article Count",
+                height=400,
+            )
+            st.plotly_chart(fig_material, use_container_width=True)
+
+        with col2:
+            st.dataframe(
+                material_df[["type_of_material", "article_count", "avg_word_count"]],
+                hide_index=True,
+                use_container_width=True,
+                height=400,
+            )
     else:
-        st.info("No keyword data available.")
+        st.info("No material type data available.")
 
-with col2:
-    st.subheader("✍️ Top 10 Authors")
 
-    with st.spinner("Loading top authors..."):
-        if selected_authors:
-            # If authors are filtered, show those specific authors
-            authors_str = "', '".join([a.replace("'", "\\'") for a in selected_authors])
-            top_authors_query = f"""
+@sections.section("🏷️ Top 10 Keywords / ✍️ Top 10 Authors")
+def top_keywords_and_authors():
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("🏷️ Top 10 Keywords")
+
+        with st.spinner("Loading top keywords..."):
+            keyword_condition = ""
+            if selected_keywords:
+                # If keywords are filtered, show those specific keywords
+                keywords_str = "', '".join([k.replace("'", "\\'") for k in selected_keywords])
+                keyword_condition = f"AND dk.keyword_value IN ('{keywords_str}')"
+            top_keywords_query = f"""
             SELECT
-                TRIM(CONCAT(
-                    COALESCE(author.firstname, ''),
-                    ' ',
-                    COALESCE(author.middlename, ''),
-                    ' ',
-                    COALESCE(author.lastname, '')
-                )) as author_full_name,
+                dk.keyword_value,
                 COUNT(DISTINCT a.article_id) as article_count,
-                ROUND(AVG(CASE WHEN a.word_count > 0 THEN a.word_count END), 0) as avg_word_count
+                ROUND(AVG(CASE WHEN a.word_count > 0 THEN a.word_count END), 0)
+                    as avg_word_count
             FROM {get_table_path("core", "fct_articles")} a
-            INNER JOIN {get_table_path("staging", "stg_archive_articles")} sa
-                ON a.article_id = sa.article_id
-            CROSS JOIN UNNEST(sa.byline_person) as author
-            WHERE TRIM(CONCAT(
-                    COALESCE(author.firstname, ''),
-                    ' ',
-                    COALESCE(author.middlename, ''),
-                    ' ',
-                    COALESCE(author.lastname, '')
-                )) IN ('{authors_str}')
-                AND {where_clause}
-                {keyword_filter}
-            GROUP BY author_full_name
+            INNER JOIN {get_table_path("intermediate", "int_keywords_flattened")} ik
+                ON a.article_id = ik.article_id
+            INNER JOIN {get_table_path("core", "dim_keywords")} dk
+                ON ik.keyword_id = dk.keyword_id
+            WHERE {where_clause}
+                {keyword_condition}
+                {author_filter}
+            GROUP BY dk.keyword_value
             ORDER BY article_count DESC
             LIMIT 10
             """
+            top_keywords_df = run_query(client, top_keywords_query, label="top_keywords")
+
+        if not top_keywords_df.empty:
+            st.dataframe(top_keywords_df, hide_index=True, use_container_width=True, height=400)
         else:
+            st.info("No keyword data available.")
+
+    with col2:
+        st.subheader("✍️ Top 10 Authors")
+
+        with st.spinner("Loading top authors..."):
+            author_condition = ""
+            if selected_authors:
+                # If authors are filtered, show those specific authors
+                authors_str = "', '".join([a.replace("'", "\\'") for a in selected_authors])
+                author_condition = f"AND da.author_full_name IN ('{authors_str}')"
             top_authors_query = f"""
             SELECT
-                TRIM(CONCAT(
-                    COALESCE(author.firstname, ''),
-                    ' ',
-                    COALESCE(author.middlename, ''),
-                    ' ',
-                    COALESCE(author.lastname, '')
-                )) as author_full_name,
+                da.author_full_name,
                 COUNT(DISTINCT a.article_id) as article_count,
-                ROUND(AVG(CASE WHEN a.word_count > 0 THEN a.word_count END), 0) as avg_word_count
+                ROUND(AVG(CASE WHEN a.word_count > 0 THEN a.word_count END), 0)
+                    as avg_word_count
             FROM {get_table_path("core", "fct_articles")} a
-            INNER JOIN {get_table_path("staging", "stg_archive_articles")} sa
-                ON a.article_id = sa.article_id
-            CROSS JOIN UNNEST(sa.byline_person) as author
+            INNER JOIN {get_table_path("intermediate", "int_authors_flattened")} ia
+                ON a.article_id = ia.article_id
+            INNER JOIN {get_table_path("core", "dim_authors")} da
+                ON ia.author_id = da.author_id
             WHERE {where_clause}
+                {author_condition}
                 {keyword_filter}
-            GROUP BY author_full_name
+            GROUP BY da.author_full_name
             ORDER BY article_count DESC
             LIMIT 10
             """
-        top_authors_df = run_query(client, top_authors_query)
+            top_authors_df = run_query(client, top_authors_query, label="top_authors")
 
-    if not top_authors_df.empty:
-        st.dataframe(top_authors_df, hide_index=True, use_container_width=True, height=400)
-    else:
-        st.info("No author data available.")
+        if not top_authors_df.empty:
+            st.dataframe(top_authors_df, hide_index=True, use_container_width=True, height=400)
+        else:
+            st.info("No author data available.")
+
+
+sections.render()
+render_profiler_panel()
 
 # Footer
 st.markdown("---")
@@ -537,5 +551,7 @@ st.caption(
 - Only articles within the last 100 years are included (stray earlier articles filtered out)
 - Average word counts exclude articles with 0 word count
 - All filters are interconnected and apply to all visualizations
+- Time series switch to quarterly or yearly points for long date ranges
+- Sections and filter lists load on demand; switch a section on to run its queries
 """
 )
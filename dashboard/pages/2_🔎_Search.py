@@ -0,0 +1,83 @@
+"""
+Archive Search Dashboard Page
+Full-text lookup over headlines, abstracts and snippets using the fct_articles search index
+"""
+
+import sys
+from pathlib import Path
+
+# Add dashboard dir to path so "utils" resolves when run from project root or dashboard/
+_dashboard_dir = Path(__file__).resolve().parent.parent
+if str(_dashboard_dir) not in sys.path:
+    sys.path.insert(0, str(_dashboard_dir))
+
+import streamlit as st  # noqa: E402
+from utils.bigquery_utils import (  # noqa: E402
+    format_number,
+    get_bigquery_client,
+    get_table_path,
+    run_query,
+)
+from utils.query_profiler import render_profiler_panel, reset_profile  # noqa: E402
+from utils.search_query import build_search_query  # noqa: E402
+
+st.set_page_config(page_title="Archive Search", page_icon="🔎", layout="wide")
+
+st.title("🔎 Archive Search")
+st.markdown("*Find archive articles by words in the headline, abstract or snippet*")
+
+client = get_bigquery_client()
+
+if client is None:
+    st.error("Unable to connect to BigQuery. Please check your credentials.")
+    st.stop()
+
+reset_profile()
+
+
+with st.sidebar:
+    st.header("🔍 Search Options")
+    year_range = st.slider("Publication year", 1900, 2030, (1900, 2030))
+    limit = st.select_slider("Max results", options=[25, 50, 100, 250, 500], value=100)
+
+search_text = st.text_input(
+    "Search terms",
+    placeholder="e.g. moon landing",
+    help=(
+        "Every term must appear somewhere in the headline, abstract or snippet (case-insensitive)."
+    ),
+)
+
+if not search_text.strip():
+    st.info("Enter one or more words to search the archive.")
+    render_profiler_panel()
+    st.stop()
+
+search_query = build_search_query(
+    get_table_path("core", "fct_articles"), search_text, year_range, limit
+)
+
+results_df = run_query(client, search_query, label="search_results")
+
+if results_df.empty:
+    st.warning("No articles match these terms.")
+else:
+    st.caption(
+        f"Showing {format_number(len(results_df))} most recent matches"
+        + (" (limit reached)" if len(results_df) >= limit else "")
+    )
+    st.dataframe(
+        results_df,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "pub_date": st.column_config.DateColumn("Published"),
+            "headline_main": st.column_config.TextColumn("Headline", width="large"),
+            "section_name": "Section",
+            "type_of_material": "Material",
+            "abstract": st.column_config.TextColumn("Abstract", width="large"),
+            "web_url": st.column_config.LinkColumn("Link", display_text="Open"),
+        },
+    )
+
+render_profiler_panel()
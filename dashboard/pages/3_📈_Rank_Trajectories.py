@@ -0,0 +1,138 @@
+"""
+Rank Trajectories Dashboard Page
+How articles moved through the Most Popular lists, from agg_article_rank_trajectories
+"""
+
+import sys
+from pathlib import Path
+
+# Add dashboard dir to path so "utils" resolves when run from project root or dashboard/
+_dashboard_dir = Path(__file__).resolve().parent.parent
+if str(_dashboard_dir) not in sys.path:
+    sys.path.insert(0, str(_dashboard_dir))
+
+import pandas as pd  # noqa: E402
+import streamlit as st  # noqa: E402
+from utils.bigquery_utils import (  # noqa: E402
+    get_bigquery_client,
+    get_table_path,
+    run_query,
+)
+from utils.chart_utils import create_line_chart  # noqa: E402
+from utils.query_profiler import render_profiler_panel, reset_profile  # noqa: E402
+
+FEEDS = {"Most viewed": "viewed", "Most emailed": "emailed", "Most shared": "shared"}
+PERIODS = {"Last day": 1, "Last 7 days": 7, "Last 30 days": 30}
+
+st.set_page_config(page_title="Rank Trajectories", page_icon="📈", layout="wide")
+
+st.title("📈 Rank Trajectories")
+st.markdown("*How articles rose and fell in the Most Popular lists*")
+
+client = get_bigquery_client()
+
+if client is None:
+    st.error("Unable to connect to BigQuery. Please check your credentials.")
+    st.stop()
+
+reset_profile()
+
+trajectories_table = get_table_path("analytics", "agg_article_rank_trajectories")
+
+with st.sidebar:
+    st.header("🔍 List")
+    feed = FEEDS[st.selectbox("Feed", list(FEEDS))]
+    period = PERIODS[st.selectbox("Period", list(PERIODS), index=2)]
+    lookback_days = st.slider("Seen in the last (days)", 1, 365, 30)
+
+# One row per article: no snapshot partitions are scanned
+articles_query = f"""
+SELECT
+    article_id,
+    title,
+    section,
+    url,
+    best_rank,
+    latest_rank,
+    days_in_top,
+    captures_in_top,
+    first_seen_at,
+    last_seen_at
+FROM {trajectories_table}
+WHERE feed = '{feed}'
+    AND period = {period}
+    AND last_seen_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {lookback_days} DAY)
+ORDER BY last_seen_at DESC, best_rank
+LIMIT 500
+"""
+articles_df = run_query(client, articles_query, label="trajectory_articles")
+
+if articles_df.empty:
+    st.info("No articles in this list for the selected window.")
+    render_profiler_panel()
+    st.stop()
+
+st.subheader("🏆 Articles in the List")
+st.dataframe(
+    articles_df.drop(columns=["article_id"]),
+    hide_index=True,
+    use_container_width=True,
+    column_config={
+        "title": st.column_config.TextColumn("Title", width="large"),
+        "section": "Section",
+        "url": st.column_config.LinkColumn("Link", display_text="Open"),
+        "best_rank": "Best rank",
+        "latest_rank": "Latest rank",
+        "days_in_top": "Days in top 20",
+        "captures_in_top": "Captures",
+        "first_seen_at": st.column_config.DatetimeColumn("First seen"),
+        "last_seen_at": st.column_config.DatetimeColumn("Last seen"),
+    },
+)
+
+st.markdown("---")
+st.subheader("📉 Trajectory")
+
+titles = dict(zip(articles_df["article_id"], articles_df["title"], strict=True))
+selected_ids = st.multiselect(
+    "Articles to compare",
+    options=list(titles),
+    default=list(titles)[:3],
+    format_func=lambda article_id: titles[article_id] or str(article_id),
+    max_selections=10,
+)
+
+if selected_ids:
+    ids_str = ", ".join(str(int(article_id)) for article_id in selected_ids)
+    history_query = f"""
+    SELECT
+        t.article_id,
+        h.captured_at,
+        h.rank
+    FROM {trajectories_table} t
+    CROSS JOIN UNNEST(t.rank_history) h
+    WHERE t.feed = '{feed}'
+        AND t.period = {period}
+        AND t.article_id IN ({ids_str})
+        AND h.rank IS NOT NULL
+    ORDER BY t.article_id, h.captured_at
+    """
+    history_df = run_query(client, history_query, label="trajectory_history")
+
+    if history_df.empty:
+        st.info("No ranked captures for the selected articles.")
+    else:
+        history_df["title"] = history_df["article_id"].map(titles)
+        history_df["captured_at"] = pd.to_datetime(history_df["captured_at"])
+        fig = create_line_chart(
+            history_df,
+            x="captured_at",
+            y="rank",
+            title="Rank over time (1 = top)",
+            color="title",
+        )
+        fig.update_traces(mode="lines+markers")
+        fig.update_yaxes(autorange="reversed", dtick=1)
+        st.plotly_chart(fig, use_container_width=True)
+
+render_profiler_panel()
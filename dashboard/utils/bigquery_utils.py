@@ -2,59 +2,195 @@
 NYT Analytics Dashboard - Utility functions for BigQuery and data processing
 """
 
+import logging
 import os
+import threading
+import time
+from pathlib import Path
 
+import google.auth
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 from google.cloud import bigquery
 from google.oauth2 import service_account
+from utils.query_cache import QueryCache
+from utils.query_profiler import QueryStats, log_stats, record, stats_from_job
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
+# Datasets whose last modification time versions the query cache
+VERSIONED_DATASETS = ("staging", "intermediate", "core", "analytics")
+
+
+# Scope requested for application default credentials (BigQuery and Storage Read API)
+CLOUD_PLATFORM_SCOPE = "https://www.googleapis.com/auth/cloud-platform"
+
+
+@st.cache_resource
+def get_credentials():
+    """Load and cache the credentials shared by the BigQuery and Storage Read clients"""
+    # Try to use credentials from environment
+    credentials_path = os.getenv("GCP_CREDENTIALS_PATH")
+    if credentials_path and os.path.exists(credentials_path):
+        return service_account.Credentials.from_service_account_file(
+            credentials_path, scopes=[CLOUD_PLATFORM_SCOPE]
+        )
+    # Fall back to application default credentials
+    credentials, _ = google.auth.default(scopes=[CLOUD_PLATFORM_SCOPE])
+    return credentials
+
 
 @st.cache_resource
 def get_bigquery_client():
     """Initialize and cache BigQuery client"""
     try:
-        # Try to use credentials from environment
-        credentials_path = os.getenv("GCP_CREDENTIALS_PATH")
         project_id = os.getenv("GCP_PROJECT_ID", "times-api-ingest")
-
-        if credentials_path and os.path.exists(credentials_path):
-            credentials = service_account.Credentials.from_service_account_file(credentials_path)
-            client = bigquery.Client(credentials=credentials, project=project_id)
-        else:
-            # Fall back to application default credentials
-            client = bigquery.Client(project=project_id)
-
-        return client
+        return bigquery.Client(credentials=get_credentials(), project=project_id)
     except Exception as e:
         st.error(f"Failed to initialize BigQuery client: {str(e)}")
         st.info("Make sure you have set up your credentials. See README for instructions.")
         return None
 
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def run_query(_client, query: str) -> pd.DataFrame:
+@st.cache_resource
+def get_bqstorage_client():
+    """
+    Initialize and cache a BigQuery Storage Read API client
+
+    Returns None when DASHBOARD_USE_BQ_STORAGE=0, when google-cloud-bigquery-storage
+    is not installed, or when the client cannot be created; queries then fall back to
+    REST row paging. Uses the same credentials as get_bigquery_client.
+    """
+    if os.getenv("DASHBOARD_USE_BQ_STORAGE", "1").lower() in ("0", "false", "no"):
+        return None
+    try:
+        from google.cloud import bigquery_storage
+    except ImportError:
+        logger.info("google-cloud-bigquery-storage not installed; using REST row paging")
+        return None
+    try:
+        return bigquery_storage.BigQueryReadClient(credentials=get_credentials())
+    except Exception as e:
+        logger.warning("Could not create BigQuery Storage client, using REST: %s", e)
+        return None
+
+
+def fetch_dataframe(job, bqstorage_client) -> pd.DataFrame:
+    """
+    Fetch a query job's results as a DataFrame
+
+    With a Storage Read API client, results stream as Arrow record batches and stay
+    Arrow-backed (pd.ArrowDtype) instead of being converted row by row. Any failure on
+    that path falls back to REST row paging.
+    """
+    if bqstorage_client is not None:
+        try:
+            table = job.to_arrow(bqstorage_client=bqstorage_client)
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        except Exception as e:
+            logger.warning("Storage Read API fetch failed, falling back to REST: %s", e)
+    return job.to_dataframe()
+
+
+@st.cache_resource
+def get_query_cache() -> QueryCache:
+    """Initialize and cache the persistent query result cache (shared across sessions)"""
+    default_dir = Path(__file__).resolve().parent.parent / ".cache" / "queries"
+    return QueryCache(
+        cache_dir=Path(os.getenv("DASHBOARD_CACHE_DIR", str(default_dir))),
+        ttl_seconds=float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "3600")),
+        max_stale_seconds=float(os.getenv("DASHBOARD_CACHE_MAX_STALE_SECONDS", "86400")),
+        max_memory_entries=int(os.getenv("DASHBOARD_CACHE_MAX_MEMORY_ENTRIES", "128")),
+        max_disk_bytes=int(os.getenv("DASHBOARD_CACHE_MAX_DISK_MB", "512")) * 1024 * 1024,
+    )
+
+
+@st.cache_data(ttl=300)  # Re-check the dbt build time every 5 minutes
+def get_data_version(_client) -> str | None:
+    """
+    Return the last time dbt rebuilt any dashboard model, used to invalidate cached results
+
+    Reads table metadata (__TABLES__), which is free and does not scan data.
+    Returns None if the metadata cannot be read, in which case entries only expire by age.
+    """
+    project = get_project_id()
+    selects = [
+        f"SELECT MAX(last_modified_time) AS modified FROM `{project}.{dataset}.__TABLES__`"
+        for dataset in dict.fromkeys(get_dataset_name(t) for t in VERSIONED_DATASETS)
+    ]
+    query = f"SELECT MAX(modified) AS version FROM ({' UNION ALL '.join(selects)})"
+    try:
+        rows = list(_client.query(query).result())
+    except Exception:
+        return None
+    if not rows or rows[0].version is None:
+        return None
+    return str(rows[0].version)
+
+
+def get_query_job_config() -> bigquery.QueryJobConfig:
+    """Job config applied to every dashboard query (per-query bytes-billed guard)"""
+    max_bytes = int(os.getenv("DASHBOARD_MAX_BYTES_BILLED", "0"))
+    return bigquery.QueryJobConfig(maximum_bytes_billed=max_bytes or None)
+
+
+def run_query(_client, query: str, label: str = "unlabeled") -> pd.DataFrame:
     """
     Run a BigQuery query and return results as DataFrame
 
+    Results are served from the persistent query cache (see utils.query_cache) and
+    invalidated when dbt rebuilds a model. Job statistics are attributed to `label`
+    for the query profiler (see utils.query_profiler).
+
     Args:
         _client: BigQuery client (prefixed with _ to avoid hashing by streamlit)
         query: SQL query string
+        label: Widget the query belongs to, shown in the profiler and logs
 
     Returns:
         pandas DataFrame with query results
     """
-    try:
-        df = _client.query(query).to_dataframe()
+    fetched: list[QueryStats] = []
+    caller = threading.get_ident()
+
+    def fetch() -> pd.DataFrame:
+        started = time.monotonic()
+        job = _client.query(query, job_config=get_query_job_config())
+        df = fetch_dataframe(job, get_bqstorage_client())
+        stats = stats_from_job(label, job, time.monotonic() - started)
+        log_stats(stats)
+        # Background (stale-while-revalidate) refreshes are logged but not attributed
+        if threading.get_ident() == caller:
+            fetched.append(stats)
         return df
+
+    started = time.monotonic()
+    try:
+        df = get_query_cache().get_or_fetch(
+            query,
+            fetch=fetch,
+            version=get_data_version(_client),
+        )
     except Exception as e:
-        st.error(f"Query failed: {str(e)}")
+        st.error(f"Query failed ({label}): {str(e)}")
         return pd.DataFrame()
 
+    if fetched:
+        record(fetched[0])
+    else:
+        stats = QueryStats(
+            label=label,
+            result_cache_hit=True,
+            elapsed_ms=round((time.monotonic() - started) * 1000, 1),
+        )
+        log_stats(stats)
+        record(stats)
+    return df
+
 
 def format_number(num: float, decimals: int = 0) -> str:
     """Format number with commas and optional decimals"""
@@ -74,7 +210,12 @@ def format_percentage(num: float, decimals: int = 1) -> str:
 
 def get_dataset_name(dataset_type: str = "core") -> str:
     """Get dataset name from environment or use default"""
-    defaults = {"core": "dbt_core", "analytics": "dbt_analytics", "staging": "dbt_staging"}
+    defaults = {
+        "core": "dbt_core",
+        "analytics": "dbt_analytics",
+        "staging": "dbt_staging",
+        "intermediate": "dbt_intermediate",
+    }
     env_key = f"DBT_{dataset_type.upper()}_DATASET"
     return os.getenv(env_key, defaults.get(dataset_type, "dbt_core"))
 
@@ -2,6 +2,10 @@
 Plotly chart configurations and helper functions
 """
 
+from datetime import date
+
+import numpy as np
+import pandas as pd
 import plotly.express as px
 
 # Color schemes
@@ -26,9 +30,82 @@ COLOR_PALETTE = [
     "#558B2F",
 ]
 
+# Upper bound on points per series sent to the browser
+MAX_CHART_POINTS = 500
+
+# Time-series granularities, finest first, with their length in months
+GRANULARITY_MONTHS = {"MONTH": 1, "QUARTER": 3, "YEAR": 12}
+
+
+def choose_granularity(start: date, end: date, max_points: int = MAX_CHART_POINTS) -> str:
+    """
+    Pick the finest granularity (MONTH, QUARTER or YEAR) that keeps a date span
+    within max_points buckets. The result can be used directly in DATE_TRUNC.
+    """
+    months = (end.year - start.year) * 12 + (end.month - start.month) + 1
+    for granularity, size in GRANULARITY_MONTHS.items():
+        if months / size <= max_points:
+            return granularity
+    return "YEAR"
+
+
+def lttb_downsample(df: pd.DataFrame, x: str, y: str, threshold: int) -> pd.DataFrame:
+    """
+    Downsample a time series to `threshold` rows with Largest-Triangle-Three-Buckets
+
+    Keeps the first and last points and, from each bucket in between, the point that
+    forms the largest triangle with its neighbours, so peaks and troughs survive.
+    Returns df unchanged when it is already small enough.
+    """
+    n = len(df)
+    if threshold >= n or threshold < 3:
+        return df
+
+    df = df.sort_values(x)
+    x_values = df[x]
+    if not pd.api.types.is_numeric_dtype(x_values):
+        # Dates (numpy or Arrow-backed) become nanoseconds since the epoch
+        x_values = pd.to_datetime(x_values).astype("datetime64[ns]").astype(np.int64)
+    xs = x_values.to_numpy(dtype=np.float64)
+    ys = df[y].to_numpy(dtype=np.float64, na_value=np.nan)
+    ys = np.nan_to_num(ys)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # Average of the next bucket is the third triangle vertex
+        next_x = xs[end:next_end].mean() if next_end > end else xs[-1]
+        next_y = ys[end:next_end].mean() if next_end > end else ys[-1]
+        areas = np.abs(
+            (xs[a] - next_x) * (ys[start:end] - ys[a]) - (xs[a] - xs[start:end]) * (next_y - ys[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return df.iloc[selected]
+
+
+def limit_points(
+    df: pd.DataFrame, x: str, y: str, color: str | None = None, max_points: int = MAX_CHART_POINTS
+) -> pd.DataFrame:
+    """Apply LTTB per series so no series sends more than max_points to the browser"""
+    if color is None:
+        return lttb_downsample(df, x, y, max_points)
+    return pd.concat(
+        [lttb_downsample(group, x, y, max_points) for _, group in df.groupby(color, sort=False)],
+        ignore_index=True,
+    )
+
 
-def create_line_chart(df, x, y, title, color=None, height=400):
-    """Create a line chart with NYT styling"""
+def create_line_chart(df, x, y, title, color=None, height=400, max_points=MAX_CHART_POINTS):
+    """Create a line chart with NYT styling, downsampled to at most max_points per series"""
+    df = limit_points(df, x, y, color, max_points)
     if color:
         fig = px.line(df, x=x, y=y, color=color, title=title, height=height)
     else:
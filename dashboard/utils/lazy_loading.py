@@ -0,0 +1,104 @@
+"""
+Lazy, on-demand rendering for dashboard pages
+
+Page sections and sidebar option lists are registered with a small registry and only
+run their queries once the user opens them. Open/loaded state lives in
+st.session_state, so a section stays loaded across reruns until it is switched off.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import streamlit as st
+
+
+@dataclass
+class Section:
+    """A collapsible page section whose render function runs only when opened"""
+
+    key: str
+    title: str
+    render: Callable[[], None]
+    eager: bool = False
+
+
+class SectionRegistry:
+    """
+    Ordered registry of lazily rendered page sections
+
+    Usage:
+        sections = SectionRegistry("archive")
+
+        @sections.section("📈 Articles Published by Month", eager=True)
+        def monthly_chart():
+            ...
+
+        sections.render()
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._sections: dict[str, Section] = {}
+
+    def section(
+        self, title: str, key: str | None = None, eager: bool = False
+    ) -> Callable[[Callable[[], None]], Callable[[], None]]:
+        """Decorator registering a render function; eager sections are open by default"""
+
+        def register(render: Callable[[], None]) -> Callable[[], None]:
+            section_key = key or render.__name__
+            self._sections[section_key] = Section(section_key, title, render, eager)
+            return render
+
+        return register
+
+    def render(self) -> None:
+        """Render every section as an expander; fetch data only for open sections"""
+        for section in self._sections.values():
+            state_key = f"{self.namespace}_section_{section.key}"
+            is_open = st.session_state.get(state_key, section.eager)
+            with st.expander(section.title, expanded=is_open):
+                if st.toggle("Load data", value=section.eager, key=state_key):
+                    section.render()
+                else:
+                    st.caption("Switch on to load this section.")
+
+
+class OptionRegistry:
+    """
+    Registry of sidebar option lists that load on first interaction
+
+    The loader (usually a query) runs only after the user asks for the list; once
+    loaded, the list is reloaded from the query cache on later reruns.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._loaders: dict[str, Callable[[], list[str]]] = {}
+
+    def register(self, key: str, loader: Callable[[], list[str]]) -> None:
+        self._loaders[key] = loader
+
+    def widget_key(self, key: str) -> str:
+        """Session state key holding the current selection for an option list"""
+        return f"{self.namespace}_{key}_filter"
+
+    def is_loaded(self, key: str) -> bool:
+        return bool(st.session_state.get(f"{self.namespace}_{key}_loaded"))
+
+    def multiselect(self, key: str, label: str) -> list[str]:
+        """Render a multiselect for a registered option list, loading it on first use"""
+        loaded_key = f"{self.namespace}_{key}_loaded"
+        if not st.session_state.get(loaded_key):
+            if not st.button(f"Load {label.lower()}", key=f"{self.namespace}_{key}_load"):
+                return []
+            st.session_state[loaded_key] = True
+
+        options = self._loaders[key]()
+        return st.multiselect(label, options=options, default=[], key=self.widget_key(key))
+
+    def reset(self) -> None:
+        """Clear the selections of all loaded option lists"""
+        for key in self._loaders:
+            if self.widget_key(key) in st.session_state:
+                st.session_state[self.widget_key(key)] = []
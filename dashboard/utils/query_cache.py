@@ -0,0 +1,208 @@
+"""
+Two-tier persistent cache for dashboard query results
+
+An in-memory LRU sits in front of an on-disk store so results survive restarts and
+can be shared by replicas that mount the same cache directory. Entries are keyed by
+normalized SQL and tagged with a data version (the last dbt build time); an entry
+whose version no longer matches is treated as a miss. Entries older than the TTL are
+served stale while a background thread refreshes them.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# A quoted string literal or identifier (group 1, kept verbatim), or a run of whitespace
+_LITERAL_OR_WHITESPACE = re.compile(
+    r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|\s+""", re.DOTALL
+)
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Collapse whitespace outside quoted literals and strip trailing semicolons so
+    equivalent queries share a key. Whitespace inside literals is significant
+    ('New  York' and 'New York' are different queries) and is kept as-is.
+    """
+    collapsed = _LITERAL_OR_WHITESPACE.sub(lambda m: m.group(1) or " ", query)
+    return collapsed.strip().rstrip(";").strip()
+
+
+def cache_key(query: str) -> str:
+    """Stable cache key for a SQL query"""
+    return hashlib.sha256(normalize_sql(query).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """A cached query result with the time it was fetched and the data version it reflects"""
+
+    value: Any
+    fetched_at: float
+    version: str | None = None
+
+
+class QueryCache:
+    """
+    In-memory LRU in front of an on-disk pickle store, with stale-while-revalidate
+
+    Args:
+        cache_dir: Directory for on-disk entries (created if missing)
+        ttl_seconds: Age after which an entry is refreshed in the background
+        max_stale_seconds: Age after which a stale entry is no longer served
+        max_memory_entries: Number of entries kept in the in-memory LRU
+        max_disk_bytes: Total size of on-disk entries before the oldest are evicted
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_seconds: float = 3600,
+        max_stale_seconds: float = 86400,
+        max_memory_entries: int = 128,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+
+    def get_or_fetch(
+        self,
+        query: str,
+        fetch: Callable[[], Any],
+        version: str | None = None,
+    ) -> Any:
+        """
+        Return the cached result for a query, fetching it on a miss
+
+        Fresh entries are returned as-is. Entries past the TTL (but within
+        max_stale_seconds) are returned immediately and refreshed in a background
+        thread. Entries from another data version, or too old to serve, are fetched
+        synchronously. Exceptions from fetch propagate and nothing is cached.
+        """
+        key = cache_key(query)
+        entry = self._get(key)
+        now = time.time()
+
+        if entry is not None and entry.version == version:
+            age = now - entry.fetched_at
+            if age <= self.ttl_seconds:
+                return entry.value
+            if age <= self.max_stale_seconds:
+                self._refresh_in_background(key, fetch, version)
+                return entry.value
+
+        value = fetch()
+        self._put(key, CacheEntry(value=value, fetched_at=time.time(), version=version))
+        return value
+
+    def invalidate(self) -> None:
+        """Drop every entry from memory and disk"""
+        with self._lock:
+            self._memory.clear()
+            for path in self.cache_dir.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+
+    def _get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Discarding unreadable cache entry %s: %s", path.name, e)
+            path.unlink(missing_ok=True)
+            return None
+
+        # Touch so disk eviction sees this entry as recently used
+        os.utime(path)
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+    def _put(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._remember(key, entry)
+
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("Could not persist cache entry %s: %s", path.name, e)
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._evict_disk()
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        """Insert into the in-memory LRU (caller holds the lock)"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        """Remove least recently used files until the store fits in max_disk_bytes"""
+        files = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _refresh_in_background(
+        self, key: str, fetch: Callable[[], Any], version: str | None
+    ) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh() -> None:
+            try:
+                value = fetch()
+                self._put(key, CacheEntry(value=value, fetched_at=time.time(), version=version))
+            except Exception as e:
+                logger.warning("Background refresh failed for %s: %s", key[:12], e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"query-cache-{key[:12]}", daemon=True).start()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
@@ -0,0 +1,125 @@
+"""
+Per-widget query profiling for the dashboard
+
+run_query attributes BigQuery job statistics (bytes processed/billed, cache hit,
+slot time, elapsed time) to a widget label. Stats are written as one JSON log line
+per query to stderr (DASHBOARD_QUERY_LOG=0 turns them off) and collected per rerun
+in st.session_state for the developer-mode panel.
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger("dashboard.query_profile")
+
+PROFILE_STATE_KEY = "query_profile"
+
+
+def configure_query_log() -> None:
+    """Send the per-query JSON lines to stderr at INFO unless DASHBOARD_QUERY_LOG=0
+
+    Nothing else in the dashboard configures logging, so without this the root
+    WARNING level drops every record.
+    """
+    if os.getenv("DASHBOARD_QUERY_LOG", "1").lower() in ("0", "false", "no"):
+        logger.setLevel(logging.WARNING)
+        return
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+
+
+configure_query_log()
+
+
+@dataclass
+class QueryStats:
+    """Statistics for one run_query call"""
+
+    label: str
+    bytes_processed: int = 0
+    bytes_billed: int = 0
+    bq_cache_hit: bool = False
+    result_cache_hit: bool = False
+    slot_ms: int = 0
+    elapsed_ms: float = 0.0
+    job_id: str | None = None
+
+
+def stats_from_job(label: str, job, elapsed_seconds: float) -> QueryStats:
+    """Build QueryStats from a finished BigQuery QueryJob"""
+    return QueryStats(
+        label=label,
+        bytes_processed=job.total_bytes_processed or 0,
+        bytes_billed=job.total_bytes_billed or 0,
+        bq_cache_hit=bool(job.cache_hit),
+        slot_ms=job.slot_millis or 0,
+        elapsed_ms=round(elapsed_seconds * 1000, 1),
+        job_id=job.job_id,
+    )
+
+
+def log_stats(stats: QueryStats) -> None:
+    """Emit one structured (JSON) log line for a query"""
+    logger.info(json.dumps({"event": "dashboard_query", **asdict(stats)}))
+
+
+def reset_profile() -> None:
+    """Start a fresh profile for this rerun"""
+    st.session_state[PROFILE_STATE_KEY] = []
+
+
+def record(stats: QueryStats) -> None:
+    """Attach stats to the current session's profile"""
+    st.session_state.setdefault(PROFILE_STATE_KEY, []).append(stats)
+
+
+def is_dev_mode() -> bool:
+    """Developer mode is on with DASHBOARD_DEV_MODE=1 or the ?dev=1 query parameter"""
+    if os.getenv("DASHBOARD_DEV_MODE", "").lower() in ("1", "true", "yes"):
+        return True
+    return st.query_params.get("dev") == "1"
+
+
+def render_profiler_panel() -> None:
+    """Sidebar panel listing the queries of this rerun, most expensive first (dev mode only)"""
+    if not is_dev_mode():
+        return
+
+    profile = st.session_state.get(PROFILE_STATE_KEY, [])
+    with st.sidebar:
+        st.markdown("---")
+        st.header("🛠️ Query Profiler")
+        if not profile:
+            st.caption("No queries ran in this rerun.")
+            return
+
+        df = pd.DataFrame([asdict(s) for s in profile])
+        df["mb_billed"] = (df["bytes_billed"] / 1024**2).round(1)
+        df["mb_processed"] = (df["bytes_processed"] / 1024**2).round(1)
+        df = df.sort_values(["bytes_billed", "elapsed_ms"], ascending=False)
+
+        st.metric("Billed this rerun", f"{df['mb_billed'].sum():,.1f} MB")
+        st.metric("Slot time this rerun", f"{df['slot_ms'].sum() / 1000:,.1f} s")
+        st.dataframe(
+            df[
+                [
+                    "label",
+                    "mb_billed",
+                    "mb_processed",
+                    "slot_ms",
+                    "elapsed_ms",
+                    "bq_cache_hit",
+                    "result_cache_hit",
+                ]
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
@@ -0,0 +1,41 @@
+"""
+Full-text search query for the Archive Search page
+
+Builds the SEARCH() query over the columns covered by the fct_articles search index
+(fct_articles_text_idx). Kept free of Streamlit so the SQL can be tested on its own.
+"""
+
+# Columns covered by fct_articles_text_idx; SEARCH() on other columns would not use the index
+SEARCH_COLUMNS = ("headline_main", "abstract", "snippet")
+
+
+def quote_search_string(text: str) -> str:
+    """Escape user input for use as a SQL string literal"""
+    return text.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def build_search_query(
+    table_path: str, search_text: str, year_range: tuple[int, int], limit: int
+) -> str:
+    """
+    Most recent articles in table_path matching every term of search_text
+
+    The indexed columns are searched as one unit, so each term may match in a
+    different column (headline, abstract or snippet), like archive.search locally.
+    """
+    search_string = quote_search_string(search_text.strip())
+    columns = ", ".join(f"a.{col}" for col in SEARCH_COLUMNS)
+    return f"""
+SELECT
+    a.pub_date,
+    a.headline_main,
+    a.section_name,
+    a.type_of_material,
+    a.abstract,
+    a.web_url
+FROM {table_path} a
+WHERE SEARCH(({columns}), '{search_string}')
+    AND a.pub_year BETWEEN {year_range[0]} AND {year_range[1]}
+ORDER BY a.pub_date DESC
+LIMIT {limit}
+"""
@@ -0,0 +1,29 @@
+{% macro article_key(uri_column, url_column) %}
+    {#
+        SQL version of common.keys.article_key (keep the two in step): the nyt:// URI
+        without its scheme, lowercased; otherwise 'url:' + the URL lowercased without
+        scheme, www., query string, fragment and trailing slashes; otherwise NULL.
+
+        Used for rows loaded before the transforms wrote article_key:
+            coalesce(article_key, {{ article_key('uri', 'web_url') }})
+    #}
+    coalesce(
+        case
+            when regexp_contains(lower(trim({{ uri_column }})), r'^nyt://[a-z]+/[0-9a-f-]+$')
+            then regexp_replace(lower(trim({{ uri_column }})), r'^nyt://', '')
+        end,
+        'url:' || nullif(
+            regexp_replace(
+                regexp_replace(
+                    regexp_replace(
+                        regexp_replace(lower(trim({{ url_column }})), r'^[a-z][a-z0-9+.-]*://', ''),
+                        r'^www\.', ''
+                    ),
+                    r'[?#].*$', ''
+                ),
+                r'/+$', ''
+            ),
+            ''
+        )
+    )
+{% endmacro %}
@@ -1,25 +1,68 @@
-{% macro get_incremental_filter(date_column, lookback_days=None) %}
+{% macro get_incremental_filter(loaded_at_column='_source_loaded_at') %}
     {#
-        Returns an incremental filter clause for date-based incremental models.
-        
+        Returns an incremental filter clause keyed on load time.
+
         Args:
-            date_column: The date column to filter on
-            lookback_days: (unused) retained for backwards compatibility
-        
+            loaded_at_column: Timestamp column recording when the partition a row belongs
+                to was last loaded (see loaded_partitions). Must exist in {{ this }}.
+
         Behavior:
             - On the first run (non-incremental), the model loads all history.
-            - On incremental runs, only rows with {{ date_column }} strictly
-              greater than the current max {{ date_column }} in {{ this }} are processed
-              (append-only incremental loading).
-        
+            - On incremental runs, only rows whose {{ loaded_at_column }} is later than the
+              latest one already in {{ this }} are processed. Every row of a reloaded
+              partition carries the same load time, so a backfilled older month selects
+              that whole month; with incremental_strategy='insert_overwrite' the model
+              then replaces exactly the partitions touched since its last run.
+            - When the manifest_until var is set (common/dbt_orchestrator.py), rows loaded
+              after it are left for the next run, so the watermark never passes a load
+              the partition hints did not cover.
+
         Usage:
             {% if is_incremental() %}
-                where {{ get_incremental_filter('pub_date') }}
+                where {{ get_incremental_filter() }}
             {% endif %}
     #}
-    
-    {{ date_column }} > (
-        select max({{ date_column }})
+
+    {{ loaded_at_column }} > (
+        select coalesce(max({{ loaded_at_column }}), timestamp('1970-01-01'))
         from {{ this }}
     )
+    {%- if var('manifest_until', none) %}
+    and {{ loaded_at_column }} <= timestamp '{{ var('manifest_until') }}'
+    {%- endif %}
+{% endmacro %}
+
+
+{% macro manifest_partition_date(source_name) %}
+    {#
+        SQL expression mapping load_manifest.path to the partition it loaded:
+        archive_slim/YYYY/MM.ndjson -> first day of the month,
+        most_popular_slim/YYYY-MM-DD/... -> snapshot date.
+    #}
+    {%- if source_name == 'archive_slim' -%}
+        safe.parse_date('%Y/%m', regexp_extract(path, r'archive_slim/(\d{4}/\d{2})\.ndjson$'))
+    {%- elif source_name == 'most_popular_slim' -%}
+        safe.parse_date('%Y-%m-%d', regexp_extract(path, r'most_popular_slim/(\d{4}-\d{2}-\d{2})/'))
+    {%- else -%}
+        {{ exceptions.raise_compiler_error("Unknown manifest source: " ~ source_name) }}
+    {%- endif -%}
+{% endmacro %}
+
+
+{% macro loaded_partitions(source_name) %}
+    {#
+        One row per partition of a raw source with the last time any of its files was
+        loaded (partition_date, _source_loaded_at), read from metadata.load_manifest.
+        Loads after the manifest_until var (when set) are ignored: they are outside
+        the run's partition hints and are picked up by the next run.
+    #}
+    select
+        {{ manifest_partition_date(source_name) }} as partition_date,
+        max(loaded_at) as _source_loaded_at
+    from {{ source('nyt_metadata', 'load_manifest') }}
+    where source = '{{ source_name }}'
+    {%- if var('manifest_until', none) %}
+        and loaded_at <= timestamp '{{ var('manifest_until') }}'
+    {%- endif %}
+    group by 1
 {% endmacro %}
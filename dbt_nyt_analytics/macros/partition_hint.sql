@@ -0,0 +1,37 @@
+{% macro partition_hint(column, var_name, granularity='day') %}
+    {#
+        Extra predicate restricting a source scan to the partitions named in a var.
+
+        Args:
+            column: Partition column of the source table (DATE)
+            var_name: Var holding a list of YYYY-MM-DD dates, set by
+                common/dbt_orchestrator.py (changed_archive_months, changed_snapshot_dates)
+            granularity: 'month' (dates are month starts) or 'day'
+
+        Returns an empty string when the var is not set, so manual runs behave as
+        before. The load-time filter still decides which partitions are rebuilt; the
+        hint only gives BigQuery constant ranges to prune the scan with. A partition
+        left out of the hint is not rebuilt, never emptied (insert_overwrite only
+        replaces partitions present in the result). The orchestrator also sets
+        manifest_until, which caps the load-time filter at the same manifest cutoff
+        the hint was built from.
+
+        Usage:
+            {% if is_incremental() %}
+                where ... {{ partition_hint('s.pub_date', 'changed_archive_months', 'month') }}
+            {% endif %}
+    #}
+    {%- set dates = var(var_name, []) -%}
+    {%- if dates -%}
+        and (
+        {%- for d in dates %}
+            {%- if granularity == 'month' %}
+            {{ column }} between date '{{ d }}' and last_day(date '{{ d }}', month)
+            {%- else %}
+            {{ column }} = date '{{ d }}'
+            {%- endif %}
+            {%- if not loop.last %} or{% endif %}
+        {%- endfor %}
+        )
+    {%- endif -%}
+{% endmacro %}
@@ -0,0 +1,30 @@
+{% macro stable_id(id_column, key_column, existing_alias='existing') %}
+    {#
+        Stable INT64 surrogate id for an incremental dimension merged on a natural-key
+        hash (key_column, e.g. 'seen.keyword_key').
+
+        Rows already in {{ this }} keep their id ({{ existing_alias }}.{{ id_column }}, from
+        a left join on the key); new keys get max(id) + 1, + 2, ... ordered by key. The
+        first (or a --full-refresh) run numbers all keys 1..n. Ids are never reused, so
+        facts and bridge tables can store them instead of the strings; a full refresh
+        of a dimension renumbers it, so refresh its dependents with it.
+
+        Usage (model config: incremental_strategy='merge', unique_key=<key column>):
+            select {{ stable_id('keyword_id', 'seen.keyword_key') }} as keyword_id, ...
+            from seen
+            {% if is_incremental() %}
+            left join existing on existing.keyword_key = seen.keyword_key
+            {% endif %}
+    #}
+    {%- if is_incremental() -%}
+        coalesce(
+            {{ existing_alias }}.{{ id_column }},
+            (select coalesce(max({{ id_column }}), 0) from {{ this }})
+                + countif({{ existing_alias }}.{{ id_column }} is null) over (
+                    order by {{ key_column }} rows between unbounded preceding and current row
+                )
+        )
+    {%- else -%}
+        row_number() over (order by {{ key_column }})
+    {%- endif -%}
+{% endmacro %}
@@ -0,0 +1,82 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='insert_overwrite',
+        partition_by={
+            "field": "pub_month",
+            "data_type": "date",
+            "granularity": "month"
+        },
+        cluster_by=['author_id']
+    )
+}}
+
+-- Mergeable partial aggregates per author and month: counts, sums, min/max and
+-- HLL sketches for distinct counts. agg_author_performance merges them per author_id
+-- (see dim_authors).
+
+with authors as (
+    select * from {{ ref('int_authors_flattened') }}
+    {% if is_incremental() %}
+    where {{ get_incremental_filter() }}
+    {% endif %}
+),
+
+-- Only the months being rebuilt: the load-time filter selects the same months as
+-- above, and the hint lets BigQuery prune fct_articles' partitions to them
+articles as (
+    select
+        article_id,
+        word_count,
+        keyword_count
+    from {{ ref('fct_articles') }}
+    {% if is_incremental() %}
+    where {{ get_incremental_filter() }}
+        {{ partition_hint('pub_date', 'changed_archive_months', 'month') }}
+    {% endif %}
+),
+
+author_articles as (
+    select
+        af.author_id,
+        af.article_id,
+        af.pub_date,
+        af.pub_year,
+        af.section_id,
+        fa.word_count,
+        fa.keyword_count,
+        af._source_loaded_at
+    from authors af
+    inner join articles fa on af.article_id = fa.article_id
+    where af.author_id is not null
+),
+
+monthly as (
+    select
+        author_id,
+        date_trunc(pub_date, month) as pub_month,
+        
+        -- Counts (an article falls in exactly one month, so these sum across months)
+        count(distinct article_id) as article_count,
+        count(*) as author_article_rows,
+        
+        -- Sums and extremes
+        sum(word_count) as total_words,
+        max(word_count) as longest_article_words,
+        sum(keyword_count) as total_keywords,
+        min(pub_date) as first_article_date,
+        max(pub_date) as last_article_date,
+        min(pub_year) as first_year,
+        max(pub_year) as last_year,
+        
+        -- Sketches for distinct counts across months
+        hll_count.init(pub_year) as pub_year_sketch,
+        hll_count.init(section_id) as section_sketch,
+        
+        max(_source_loaded_at) as _source_loaded_at
+        
+    from author_articles
+    group by 1, 2
+)
+
+select * from monthly
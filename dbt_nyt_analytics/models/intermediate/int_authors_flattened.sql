@@ -1,24 +1,40 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='insert_overwrite',
+        partition_by={
+            "field": "pub_date",
+            "data_type": "date",
+            "granularity": "month"
+        },
+        cluster_by=['author_id']
+    )
+}}
+
+-- Article/author bridge. Authors and sections are carried as integer ids from
+-- dim_authors and dim_sections; names are looked up in the dims.
+
 with source as (
     select
         article_id,
         pub_date,
         pub_year,
         section_name,
-        byline_person
+        byline_person,
+        _source_loaded_at
     from {{ ref('stg_archive_articles') }}
     where has_authors = true
+    {% if is_incremental() %}
+        and {{ get_incremental_filter() }}
+    {% endif %}
 ),
 
-flattened as (
+unnested as (
     select
         article_id,
         pub_date,
         pub_year,
         section_name,
-        author.firstname as firstname,
-        author.middlename as middlename,
-        author.lastname as lastname,
-        author.qualifier as qualifier,
         -- Construct full name
         trim(concat(
             coalesce(author.firstname, ''),
@@ -26,11 +42,26 @@ flattened as (
             coalesce(author.middlename, ''),
             ' ',
             coalesce(author.lastname, '')
-        )) as author_full_name
+        )) as author_full_name,
+        _source_loaded_at
     from source
     cross join unnest(byline_person) as author
     where author.lastname is not null
         or author.firstname is not null
+),
+
+flattened as (
+    select
+        u.article_id,
+        u.pub_date,
+        u.pub_year,
+        s.section_id,
+        a.author_id,
+        u._source_loaded_at
+    from unnested u
+    left join {{ ref('dim_sections') }} s on u.section_name = s.section_name
+    left join {{ ref('dim_authors') }} a
+        on {{ dbt_utils.generate_surrogate_key(['u.author_full_name']) }} = a.author_key
 )
 
 select * from flattened
@@ -1,26 +1,62 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='insert_overwrite',
+        partition_by={
+            "field": "pub_date",
+            "data_type": "date",
+            "granularity": "month"
+        },
+        cluster_by=['keyword_id']
+    )
+}}
+
+-- Article/keyword bridge. Keywords and sections are carried as integer ids from
+-- dim_keywords and dim_sections; keyword_id is null for blank keyword values, which
+-- still count towards fct_articles.keyword_count.
+
 with source as (
     select
         article_id,
         pub_date,
         pub_year,
         section_name,
-        keywords
+        keywords,
+        _source_loaded_at
     from {{ ref('stg_archive_articles') }}
     where has_keywords = true
+    {% if is_incremental() %}
+        and {{ get_incremental_filter() }}
+    {% endif %}
 ),
 
-flattened as (
+unnested as (
     select
         article_id,
         pub_date,
         pub_year,
         section_name,
-        keyword.name as keyword_name,
-        keyword.value as keyword_value,
+        {{ dbt_utils.generate_surrogate_key(['keyword.name', 'keyword.value']) }} as keyword_key,
         keyword.rank as keyword_rank,
-        keyword.major as keyword_major
+        keyword.major as keyword_major,
+        _source_loaded_at
     from source
     cross join unnest(keywords) as keyword
+),
+
+flattened as (
+    select
+        u.article_id,
+        u.pub_date,
+        u.pub_year,
+        s.section_id,
+        k.keyword_id,
+        u.keyword_rank,
+        u.keyword_major,
+        u._source_loaded_at
+    from unnested u
+    left join {{ ref('dim_sections') }} s on u.section_name = s.section_name
+    left join {{ ref('dim_keywords') }} k on u.keyword_key = k.keyword_key
 )
 
 select * from flattened
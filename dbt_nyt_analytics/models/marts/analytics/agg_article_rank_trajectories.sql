@@ -0,0 +1,128 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='trajectory_key',
+        cluster_by=['feed', 'period', 'article_id'],
+        post_hook="delete from {{ this }} where captures_in_top = 0"
+    )
+}}
+
+-- One row per article per list (feed x period) with its whole rank history, so a
+-- trajectory is a single clustered lookup instead of a scan of every snapshot day.
+-- Clustered on the list first: the dashboard reads all trajectories of one list.
+-- Incremental runs rebuild only the trajectories captured on a reloaded snapshot
+-- day, before or after the reload; captures from those days are replaced, not
+-- duplicated. A trajectory left with no captures is written with captures_in_top = 0
+-- and deleted by the post-hook.
+
+with new_captures as (
+    select
+        {{ dbt_utils.generate_surrogate_key(['article_id', 'feed', 'period']) }} as trajectory_key,
+        article_id,
+        feed,
+        period,
+        snapshot_date,
+        captured_at,
+        rank,
+        title,
+        section,
+        url,
+        _source_loaded_at
+    from {{ ref('fct_article_popularity') }}
+    {% if is_incremental() %}
+    where {{ get_incremental_filter() }}
+    {% endif %}
+),
+
+{% if is_incremental() %}
+reloaded_days as (
+    -- Snapshot days loaded since the last run (also those a reload left empty)
+    select partition_date as snapshot_date
+    from ({{ loaded_partitions('most_popular_slim') }})
+    where {{ get_incremental_filter() }}
+    union distinct
+    select distinct snapshot_date from new_captures
+),
+
+-- Trajectories with a capture on a reloaded day, in the reload or in the stored history
+affected as (
+    select trajectory_key from new_captures
+    union distinct
+    select t.trajectory_key
+    from {{ this }} t
+    where exists (
+        select 1
+        from unnest(t.rank_history) h
+        where h.snapshot_date in (select snapshot_date from reloaded_days)
+    )
+),
+
+prior_captures as (
+    select
+        t.trajectory_key,
+        t.article_id,
+        t.feed,
+        t.period,
+        h.snapshot_date,
+        h.captured_at,
+        h.rank,
+        t.title,
+        t.section,
+        t.url,
+        t._source_loaded_at
+    from {{ this }} t
+    cross join unnest(t.rank_history) h
+    where t.trajectory_key in (select trajectory_key from affected)
+        and h.snapshot_date not in (select snapshot_date from reloaded_days)
+),
+{% endif %}
+
+captures as (
+    select * from new_captures
+    {% if is_incremental() %}
+    union all
+    select * from prior_captures
+    {% endif %}
+),
+
+trajectories as (
+    select
+        trajectory_key,
+        article_id,
+        feed,
+        period,
+
+        -- Latest attributes
+        array_agg(title ignore nulls order by captured_at desc limit 1)[safe_offset(0)] as title,
+        array_agg(section ignore nulls order by captured_at desc limit 1)[safe_offset(0)] as section,
+        array_agg(url ignore nulls order by captured_at desc limit 1)[safe_offset(0)] as url,
+
+        -- Time in the list
+        min(captured_at) as first_seen_at,
+        max(captured_at) as last_seen_at,
+        count(distinct snapshot_date) as days_in_top,
+        count(*) as captures_in_top,
+
+        -- Rank (NULL for captures loaded before ranks were kept)
+        min(rank) as best_rank,
+        array_agg(rank ignore nulls order by captured_at desc limit 1)[safe_offset(0)] as latest_rank,
+        array_agg(
+            struct(snapshot_date, captured_at, rank)
+            order by captured_at
+        ) as rank_history,
+
+        max(_source_loaded_at) as _source_loaded_at
+
+    from captures
+    group by 1, 2, 3, 4
+)
+
+select * from trajectories
+{% if is_incremental() %}
+union all
+-- Affected trajectories the reload left without captures (deleted by the post-hook)
+select * replace (0 as captures_in_top)
+from {{ this }}
+where trajectory_key in (select trajectory_key from affected)
+    and trajectory_key not in (select trajectory_key from trajectories)
+{% endif %}
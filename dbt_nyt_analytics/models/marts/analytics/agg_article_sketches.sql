@@ -0,0 +1,46 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='insert_overwrite',
+        partition_by={
+            "field": "pub_month",
+            "data_type": "date",
+            "granularity": "month"
+        },
+        cluster_by=['section_name', 'news_desk', 'type_of_material']
+    )
+}}
+
+-- Roll-up cube for the dashboard's approximate mode: one row per month and
+-- section / news desk / material type, with an HLL++ sketch of article ids.
+-- Distinct counts over any date range and filter combination are
+-- HLL_COUNT.MERGE(article_sketch) over the matching rows.
+
+with articles as (
+    select * from {{ ref('fct_articles') }}
+    {% if is_incremental() %}
+    where {{ get_incremental_filter() }}
+    {% endif %}
+),
+
+cube as (
+    select
+        date_trunc(pub_date, month) as pub_month,
+        section_name,
+        news_desk,
+        type_of_material,
+        
+        count(*) as article_count,
+        hll_count.init(article_id) as article_sketch,
+        
+        -- Word count parts (averages exclude articles with 0 words, as in the dashboard)
+        countif(word_count > 0) as articles_with_word_count,
+        sum(if(word_count > 0, word_count, 0)) as total_positive_word_count,
+        
+        max(_source_loaded_at) as _source_loaded_at
+        
+    from articles
+    group by 1, 2, 3, 4
+)
+
+select * from cube
@@ -32,7 +32,13 @@ monthly_stats as (
         count(distinct news_desk) as unique_news_desks,
         
         -- Material types
-        count(distinct type_of_material) as unique_material_types
+        count(distinct type_of_material) as unique_material_types,
+        
+        -- Sketches for approximate distinct counts across months
+        hll_count.init(article_id) as article_sketch,
+        hll_count.init(section_name) as section_sketch,
+        hll_count.init(news_desk) as news_desk_sketch,
+        hll_count.init(type_of_material) as material_sketch
         
     from articles
     group by 1
@@ -61,7 +67,12 @@ final as (
         -- Percentages
         round(100.0 * articles_with_authors / nullif(total_articles, 0), 1) as pct_with_authors,
         round(100.0 * articles_with_keywords / nullif(total_articles, 0), 1) as pct_with_keywords,
-        round(100.0 * articles_with_multimedia / nullif(total_articles, 0), 1) as pct_with_multimedia
+        round(100.0 * articles_with_multimedia / nullif(total_articles, 0), 1) as pct_with_multimedia,
+        
+        article_sketch,
+        section_sketch,
+        news_desk_sketch,
+        material_sketch
     
     from monthly_stats
     order by pub_month
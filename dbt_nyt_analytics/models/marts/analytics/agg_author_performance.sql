@@ -1,55 +1,85 @@
-with author_articles as (
-    select
-        af.author_full_name,
-        af.firstname,
-        af.lastname,
-        af.article_id,
-        af.pub_date,
-        af.pub_year,
-        af.section_name,
-        fa.word_count,
-        fa.keyword_count
-    from {{ ref('int_authors_flattened') }} af
-    inner join {{ ref('fct_articles') }} fa on af.article_id = fa.article_id
+{{
+    config(
+        materialized='incremental',
+        unique_key='author_id',
+        cluster_by=['author_full_name'],
+        post_hook="delete from {{ this }} where author_id not in (select author_id from {{ ref('int_author_monthly_stats') }})"
+    )
+}}
+
+-- Incremental runs only re-merge authors whose monthly partials were rebuilt
+-- (see int_author_monthly_stats), or who this table had in a reloaded month: a
+-- reload may have dropped them from that month. Every other author row is left
+-- untouched. Authors left with no partials at all are deleted by the post-hook.
+
+{% if is_incremental() %}
+with reloaded_months as (
+    -- Archive months loaded since the last run
+    select partition_date as pub_month
+    from ({{ loaded_partitions('archive_slim') }})
+    where {{ get_incremental_filter() }}
+),
+
+affected_authors as (
+    select author_id
+    from {{ ref('int_author_monthly_stats') }}
+    where {{ get_incremental_filter() }}
+    union distinct
+    select t.author_id
+    from {{ this }} t
+    inner join reloaded_months m
+        on t.first_article_date <= last_day(m.pub_month, month)
+        and t.last_article_date >= m.pub_month
 ),
 
+monthly as (
+    select * from {{ ref('int_author_monthly_stats') }}
+    where author_id in (select author_id from affected_authors)
+),
+{% else %}
+with monthly as (
+    select * from {{ ref('int_author_monthly_stats') }}
+),
+{% endif %}
+
 author_stats as (
     select
-        author_full_name,
-        firstname,
-        lastname,
+        author_id,
         
         -- Article counts
-        count(distinct article_id) as total_articles,
+        sum(article_count) as total_articles,
         
         -- Date range
-        min(pub_date) as first_article_date,
-        max(pub_date) as last_article_date,
-        date_diff(max(pub_date), min(pub_date), day) as career_span_days,
+        min(first_article_date) as first_article_date,
+        max(last_article_date) as last_article_date,
+        date_diff(max(last_article_date), min(first_article_date), day) as career_span_days,
         
         -- Years active
-        count(distinct pub_year) as years_active,
-        min(pub_year) as first_year,
-        max(pub_year) as last_year,
+        hll_count.merge(pub_year_sketch) as years_active,
+        min(first_year) as first_year,
+        max(last_year) as last_year,
         
         -- Content metrics
-        avg(word_count) as avg_word_count,
-        sum(word_count) as total_words_written,
-        max(word_count) as longest_article_words,
+        sum(total_words) / sum(author_article_rows) as avg_word_count,
+        sum(total_words) as total_words_written,
+        max(longest_article_words) as longest_article_words,
         
         -- Topic diversity
-        count(distinct section_name) as sections_written_for,
-        avg(keyword_count) as avg_keywords_per_article
+        hll_count.merge(section_sketch) as sections_written_for,
+        sum(total_keywords) / sum(author_article_rows) as avg_keywords_per_article,
         
-    from author_articles
-    group by 1, 2, 3
+        max(_source_loaded_at) as _source_loaded_at
+        
+    from monthly
+    group by 1
 ),
 
 final as (
     select
-        author_full_name,
-        firstname,
-        lastname,
+        s.author_id,
+        d.author_full_name,
+        d.firstname,
+        d.lastname,
         
         total_articles,
         first_article_date,
@@ -68,10 +98,12 @@ final as (
         round(avg_keywords_per_article, 1) as avg_keywords_per_article,
         
         -- Productivity metric
-        round(total_articles / nullif(years_active, 0), 1) as articles_per_year
+        round(total_articles / nullif(years_active, 0), 1) as articles_per_year,
+        
+        s._source_loaded_at
     
-    from author_stats
-    order by total_articles desc
+    from author_stats s
+    inner join {{ ref('dim_authors') }} d on s.author_id = d.author_id
 )
 
 select * from final
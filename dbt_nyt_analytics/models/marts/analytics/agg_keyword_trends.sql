@@ -1,20 +1,50 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='insert_overwrite',
+        partition_by={
+            "field": "pub_year",
+            "data_type": "int64",
+            "range": {"start": 1850, "end": 2100, "interval": 1}
+        },
+        cluster_by=['keyword_id']
+    )
+}}
+
+{% if is_incremental() %}
+with affected_years as (
+    -- Years with reloaded partitions, plus the following year (its YoY fields change)
+    select distinct pub_year + year_offset as pub_year
+    from {{ ref('int_keywords_flattened') }}
+    cross join unnest([0, 1]) as year_offset
+    where {{ get_incremental_filter() }}
+),
+
+keywords as (
+    -- Affected years and the year before each (for prior-year counts and ranks)
+    select * from {{ ref('int_keywords_flattened') }}
+    where pub_year in (select pub_year from affected_years)
+        or pub_year + 1 in (select pub_year from affected_years)
+),
+{% else %}
 with keywords as (
     select * from {{ ref('int_keywords_flattened') }}
 ),
+{% endif %}
 
 yearly_keyword_stats as (
     select
-        keyword_name,
-        keyword_value,
+        keyword_id,
         pub_year,
         
         count(distinct article_id) as article_count,
-        count(*) as keyword_occurrences
+        count(*) as keyword_occurrences,
+        max(_source_loaded_at) as _source_loaded_at
         
     from keywords
-    where keyword_value is not null
-        and trim(keyword_value) != ''
-    group by 1, 2, 3
+    -- Blank keyword values have no keyword_id
+    where keyword_id is not null
+    group by 1, 2
 ),
 
 with_rankings as (
@@ -25,53 +55,54 @@ with_rankings as (
         row_number() over (
             partition by pub_year 
             order by article_count desc
-        ) as rank_in_year,
-        
-        -- Prior year article count
-        lag(article_count) over (
-            partition by keyword_name, keyword_value 
-            order by pub_year
-        ) as prior_year_count
+        ) as rank_in_year
         
     from yearly_keyword_stats
 ),
 
-with_prior_rank as (
+with_prior_year as (
     select
-        *,
+        cur.*,
         
-        -- Get prior year rank by using lag on the already computed rank_in_year
-        lag(rank_in_year) over (
-            partition by keyword_name, keyword_value 
-            order by pub_year
-        ) as prior_year_rank
+        -- Count and rank in the previous calendar year (null if absent that year)
+        prev.article_count as prior_year_count,
+        prev.rank_in_year as prior_year_rank
         
-    from with_rankings
+    from with_rankings cur
+    left join with_rankings prev
+        on prev.keyword_id = cur.keyword_id
+        and prev.pub_year = cur.pub_year - 1
 ),
 
 final as (
     select
-        keyword_name,
-        keyword_value,
-        pub_year,
+        y.keyword_id,
+        d.keyword_name,
+        d.keyword_value,
+        y.pub_year,
         
-        article_count,
-        keyword_occurrences,
-        rank_in_year,
+        y.article_count,
+        y.keyword_occurrences,
+        y.rank_in_year,
         
-        prior_year_count,
-        article_count - coalesce(prior_year_count, 0) as yoy_change,
+        y.prior_year_count,
+        y.article_count - coalesce(y.prior_year_count, 0) as yoy_change,
         case 
-            when prior_year_count > 0 
-            then round(100.0 * (article_count - prior_year_count) / prior_year_count, 1)
+            when y.prior_year_count > 0 
+            then round(100.0 * (y.article_count - y.prior_year_count) / y.prior_year_count, 1)
             else null 
         end as yoy_change_pct,
         
-        prior_year_rank,
-        coalesce(prior_year_rank, 0) - rank_in_year as rank_change
+        y.prior_year_rank,
+        coalesce(y.prior_year_rank, 0) - y.rank_in_year as rank_change,
+        
+        y._source_loaded_at
         
-    from with_prior_rank
-    order by pub_year desc, article_count desc
+    from with_prior_year y
+    inner join {{ ref('dim_keywords') }} d on y.keyword_id = d.keyword_id
+    {% if is_incremental() %}
+    where y.pub_year in (select pub_year from affected_years)
+    {% endif %}
 )
 
 select * from final
@@ -12,8 +12,8 @@ yearly_totals as (
 
 section_yearly as (
     select
-        a.section_name,
-        a.news_desk,
+        a.section_id,
+        a.news_desk_id,
         a.pub_year,
         
         count(*) as article_count,
@@ -24,7 +24,10 @@ section_yearly as (
         countif(a.has_keywords) as articles_with_keywords,
         
         avg(a.author_count) as avg_authors,
-        avg(a.keyword_count) as avg_keywords
+        avg(a.keyword_count) as avg_keywords,
+        
+        -- Sketch for approximate distinct counts across years / desks
+        hll_count.init(a.article_id) as article_sketch
         
     from articles a
     group by 1, 2, 3
@@ -38,7 +41,7 @@ with_percentages as (
         
         -- Year-over-year change
         lag(sy.article_count) over (
-            partition by sy.section_name, sy.news_desk 
+            partition by sy.section_id, sy.news_desk_id 
             order by sy.pub_year
         ) as prior_year_count
         
@@ -48,33 +51,39 @@ with_percentages as (
 
 final as (
     select
-        section_name,
-        news_desk,
-        pub_year,
+        p.section_id,
+        p.news_desk_id,
+        s.section_name,
+        d.news_desk,
+        p.pub_year,
         
-        article_count,
-        year_total,
-        pct_of_year_total,
+        p.article_count,
+        p.year_total,
+        p.pct_of_year_total,
         
-        round(avg_word_count, 0) as avg_word_count,
-        total_word_count,
+        round(p.avg_word_count, 0) as avg_word_count,
+        p.total_word_count,
         
-        articles_with_authors,
-        articles_with_keywords,
+        p.articles_with_authors,
+        p.articles_with_keywords,
         
-        round(avg_authors, 2) as avg_authors,
-        round(avg_keywords, 2) as avg_keywords,
+        round(p.avg_authors, 2) as avg_authors,
+        round(p.avg_keywords, 2) as avg_keywords,
         
-        prior_year_count,
-        article_count - coalesce(prior_year_count, 0) as yoy_change,
+        p.prior_year_count,
+        p.article_count - coalesce(p.prior_year_count, 0) as yoy_change,
         case 
-            when prior_year_count > 0 
-            then round(100.0 * (article_count - prior_year_count) / prior_year_count, 1)
+            when p.prior_year_count > 0 
+            then round(100.0 * (p.article_count - p.prior_year_count) / p.prior_year_count, 1)
             else null 
-        end as yoy_change_pct
+        end as yoy_change_pct,
+        
+        p.article_sketch
     
-    from with_percentages
-    order by pub_year, article_count desc
+    from with_percentages p
+    left join {{ ref('dim_sections') }} s on p.section_id = s.section_id
+    left join {{ ref('dim_news_desks') }} d on p.news_desk_id = d.news_desk_id
+    order by p.pub_year, p.article_count desc
 )
 
 select * from final
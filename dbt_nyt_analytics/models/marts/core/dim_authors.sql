@@ -1,24 +1,76 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key='author_key',
+        merge_update_columns=['_source_loaded_at'],
+        cluster_by=['author_key']
+    )
+}}
+
+-- One row per author full name (the name the marts and dashboard group and filter on)
+-- with a stable integer author_id (see stable_id). Name parts are those of the first
+-- byline seen. Incremental runs read the months loaded since the last run.
+
 with authors as (
-    select distinct
-        firstname,
-        middlename,
-        lastname,
-        qualifier,
-        author_full_name
-    from {{ ref('int_authors_flattened') }}
-    where author_full_name is not null
-        and trim(author_full_name) != ''
+    select
+        trim(concat(
+            coalesce(author.firstname, ''),
+            ' ',
+            coalesce(author.middlename, ''),
+            ' ',
+            coalesce(author.lastname, '')
+        )) as author_full_name,
+        author.firstname as firstname,
+        author.middlename as middlename,
+        author.lastname as lastname,
+        author.qualifier as qualifier,
+        _source_loaded_at
+    from {{ ref('stg_archive_articles') }}
+    cross join unnest(byline_person) as author
+    where has_authors = true
+        and (author.lastname is not null or author.firstname is not null)
+    {% if is_incremental() %}
+        and {{ get_incremental_filter() }}
+    {% endif %}
 ),
 
-with_key as (
+seen as (
     select
-        {{ dbt_utils.generate_surrogate_key(['firstname', 'middlename', 'lastname', 'qualifier', 'author_full_name']) }} as author_key,
-        firstname,
-        middlename,
-        lastname,
-        qualifier,
-        author_full_name
+        {{ dbt_utils.generate_surrogate_key(['author_full_name']) }} as author_key,
+        author_full_name,
+        any_value(firstname) as firstname,
+        any_value(middlename) as middlename,
+        any_value(lastname) as lastname,
+        any_value(qualifier) as qualifier,
+        max(_source_loaded_at) as _source_loaded_at
     from authors
+    where author_full_name != ''
+    group by 1, 2
+),
+
+{% if is_incremental() %}
+existing as (
+    select author_key, author_id
+    from {{ this }}
+    where author_key in (select author_key from seen)
+),
+{% endif %}
+
+final as (
+    select
+        {{ stable_id('author_id', 'seen.author_key') }} as author_id,
+        seen.author_key,
+        seen.author_full_name,
+        seen.firstname,
+        seen.middlename,
+        seen.lastname,
+        seen.qualifier,
+        seen._source_loaded_at
+    from seen
+    {% if is_incremental() %}
+    left join existing on existing.author_key = seen.author_key
+    {% endif %}
 )
 
-select * from with_key
+select * from final
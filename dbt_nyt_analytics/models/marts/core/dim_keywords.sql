@@ -1,18 +1,62 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key='keyword_key',
+        merge_update_columns=['_source_loaded_at'],
+        cluster_by=['keyword_key']
+    )
+}}
+
+-- One row per keyword (name, value) with a stable integer keyword_id (see stable_id),
+-- which int_keywords_flattened and agg_keyword_trends carry instead of the strings.
+-- Incremental runs read the months loaded since the last run: new keywords are
+-- appended, known ones only get their _source_loaded_at advanced.
+
 with keywords as (
-    select distinct
-        keyword_name,
-        keyword_value
-    from {{ ref('int_keywords_flattened') }}
-    where keyword_value is not null
-        and trim(keyword_value) != ''
+    select
+        keyword.name as keyword_name,
+        keyword.value as keyword_value,
+        _source_loaded_at
+    from {{ ref('stg_archive_articles') }}
+    cross join unnest(keywords) as keyword
+    where has_keywords = true
+        and keyword.value is not null
+        and trim(keyword.value) != ''
+    {% if is_incremental() %}
+        and {{ get_incremental_filter() }}
+    {% endif %}
 ),
 
-with_key as (
+seen as (
     select
         {{ dbt_utils.generate_surrogate_key(['keyword_name', 'keyword_value']) }} as keyword_key,
         keyword_name,
-        keyword_value
+        keyword_value,
+        max(_source_loaded_at) as _source_loaded_at
     from keywords
+    group by 1, 2, 3
+),
+
+{% if is_incremental() %}
+existing as (
+    select keyword_key, keyword_id
+    from {{ this }}
+    where keyword_key in (select keyword_key from seen)
+),
+{% endif %}
+
+final as (
+    select
+        {{ stable_id('keyword_id', 'seen.keyword_key') }} as keyword_id,
+        seen.keyword_key,
+        seen.keyword_name,
+        seen.keyword_value,
+        seen._source_loaded_at
+    from seen
+    {% if is_incremental() %}
+    left join existing on existing.keyword_key = seen.keyword_key
+    {% endif %}
 )
 
-select * from with_key
+select * from final
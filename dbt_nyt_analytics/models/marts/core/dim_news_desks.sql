@@ -0,0 +1,47 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key='news_desk_key',
+        merge_update_columns=['_source_loaded_at']
+    )
+}}
+
+-- One row per news desk with a stable integer news_desk_id (see stable_id), carried by the
+-- facts, bridge tables and aggregates instead of the name. Incremental runs read the
+-- months loaded since the last run: new desks are appended, known ones only get
+-- their _source_loaded_at advanced.
+
+with seen as (
+    select
+        {{ dbt_utils.generate_surrogate_key(['news_desk']) }} as news_desk_key,
+        news_desk,
+        max(_source_loaded_at) as _source_loaded_at
+    from {{ ref('stg_archive_articles') }}
+    {% if is_incremental() %}
+    where {{ get_incremental_filter() }}
+    {% endif %}
+    group by 1, 2
+),
+
+{% if is_incremental() %}
+existing as (
+    select news_desk_key, news_desk_id
+    from {{ this }}
+    where news_desk_key in (select news_desk_key from seen)
+),
+{% endif %}
+
+final as (
+    select
+        {{ stable_id('news_desk_id', 'seen.news_desk_key') }} as news_desk_id,
+        seen.news_desk_key,
+        seen.news_desk,
+        seen._source_loaded_at
+    from seen
+    {% if is_incremental() %}
+    left join existing on existing.news_desk_key = seen.news_desk_key
+    {% endif %}
+)
+
+select * from final
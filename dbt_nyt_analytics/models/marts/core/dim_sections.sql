@@ -1,16 +1,47 @@
-with sections as (
-    select distinct
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key='section_key',
+        merge_update_columns=['_source_loaded_at']
+    )
+}}
+
+-- One row per section with a stable integer section_id (see stable_id), carried by the
+-- facts, bridge tables and aggregates instead of the name. Incremental runs read the
+-- months loaded since the last run: new sections are appended, known ones only get
+-- their _source_loaded_at advanced.
+
+with seen as (
+    select
+        {{ dbt_utils.generate_surrogate_key(['section_name']) }} as section_key,
         section_name,
-        news_desk
+        max(_source_loaded_at) as _source_loaded_at
     from {{ ref('stg_archive_articles') }}
+    {% if is_incremental() %}
+    where {{ get_incremental_filter() }}
+    {% endif %}
+    group by 1, 2
 ),
 
-with_key as (
+{% if is_incremental() %}
+existing as (
+    select section_key, section_id
+    from {{ this }}
+    where section_key in (select section_key from seen)
+),
+{% endif %}
+
+final as (
     select
-        {{ dbt_utils.generate_surrogate_key(['section_name', 'news_desk']) }} as section_key,
-        section_name,
-        news_desk
-    from sections
+        {{ stable_id('section_id', 'seen.section_key') }} as section_id,
+        seen.section_key,
+        seen.section_name,
+        seen._source_loaded_at
+    from seen
+    {% if is_incremental() %}
+    left join existing on existing.section_key = seen.section_key
+    {% endif %}
 )
 
-select * from with_key
+select * from final
@@ -1,19 +1,20 @@
 {{
     config(
         materialized='incremental',
-        unique_key=['snapshot_date', 'article_id'],
+        incremental_strategy='insert_overwrite',
         partition_by={
             "field": "snapshot_date",
             "data_type": "date",
             "granularity": "day"
-        }
+        },
+        cluster_by=['feed', 'period']
     )
 }}
 
 with staged as (
     select * from {{ ref('stg_most_popular_articles') }}
     {% if is_incremental() %}
-    where {{ get_incremental_filter('snapshot_date') }}
+    where {{ get_incremental_filter() }}
     {% endif %}
 ),
 
@@ -21,8 +22,13 @@ with_metrics as (
     select
         -- Keys
         snapshot_date,
+        feed,
+        period,
+        captured_at,
         article_id,
+        rank,
         uri,
+        article_key,
         asset_id,
         
         -- Dates
@@ -55,7 +61,10 @@ with_metrics as (
         geo_facet,
         
         -- Keywords
-        adx_keywords
+        adx_keywords,
+        
+        -- Load time of the snapshot partition
+        _source_loaded_at
         
     from staged
 )
@@ -1,20 +1,21 @@
 {{
     config(
         materialized='incremental',
-        unique_key='article_id',
+        incremental_strategy='insert_overwrite',
         partition_by={
             "field": "pub_date",
             "data_type": "date",
             "granularity": "month"
         },
-        cluster_by=['section_name', 'pub_year']
+        cluster_by=['section_name', 'pub_year'],
+        post_hook="create search index if not exists fct_articles_text_idx on {{ this }} (headline_main, abstract, snippet)"
     )
 }}
 
 with staged_articles as (
     select * from {{ ref('stg_archive_articles') }}
     {% if is_incremental() %}
-    where {{ get_incremental_filter('pub_date') }}
+    where {{ get_incremental_filter() }}
     {% endif %}
 ),
 
@@ -23,6 +24,9 @@ author_counts as (
         article_id,
         count(*) as author_count
     from {{ ref('int_authors_flattened') }}
+    {% if is_incremental() %}
+    where {{ get_incremental_filter() }}
+    {% endif %}
     group by 1
 ),
 
@@ -32,6 +36,9 @@ keyword_counts as (
         count(*) as keyword_count,
         countif(keyword_major = 'Y') as major_keyword_count
     from {{ ref('int_keywords_flattened') }}
+    {% if is_incremental() %}
+    where {{ get_incremental_filter() }}
+    {% endif %}
     group by 1
 ),
 
@@ -40,13 +47,17 @@ final as (
         -- Keys
         a.article_id,
         a.uri,
+        a.article_key,
         
         -- Date dimensions
         a.pub_date,
         a.pub_year,
         a.pub_month,
         
-        -- Categorization
+        -- Categorization (ids from dim_sections / dim_news_desks; names kept for search
+        -- and the dashboard filters)
+        s.section_id,
+        d.news_desk_id,
         a.section_name,
         a.news_desk,
         a.type_of_material,
@@ -62,16 +73,22 @@ final as (
         a.headline_main,
         a.byline_original,
         a.abstract,
+        a.snippet,
         a.web_url,
         
         -- Flags
         a.has_keywords,
         a.has_authors,
-        a.has_multimedia
+        a.has_multimedia,
+        
+        -- Load time of the month partition
+        a._source_loaded_at
         
     from staged_articles a
     left join author_counts ac on a.article_id = ac.article_id
     left join keyword_counts kc on a.article_id = kc.article_id
+    left join {{ ref('dim_sections') }} s on a.section_name = s.section_name
+    left join {{ ref('dim_news_desks') }} d on a.news_desk = d.news_desk
 )
 
 select * from final
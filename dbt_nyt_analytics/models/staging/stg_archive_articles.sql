@@ -1,7 +1,7 @@
 {{
     config(
         materialized='incremental',
-        unique_key='article_id',
+        incremental_strategy='insert_overwrite',
         partition_by={
             "field": "pub_date",
             "data_type": "date",
@@ -11,10 +11,25 @@
     )
 }}
 
-with source as (
-    select * from {{ source('nyt_raw', 'archive_articles') }}
+with loaded_partitions as (
+    {{ loaded_partitions('archive_slim') }}
+),
+
+source as (
+    select
+        s.*,
+        lp._source_loaded_at
+    from {{ source('nyt_raw', 'archive_articles') }} s
+    left join loaded_partitions lp
+        on date_trunc(s.pub_date, month) = lp.partition_date
     {% if is_incremental() %}
-    where {{ get_incremental_filter('pub_date') }}
+    -- Rebuild every month partition loaded (or re-loaded) since the last run
+    where date_trunc(s.pub_date, month) in (
+        select partition_date
+        from loaded_partitions
+        where {{ get_incremental_filter() }}
+    )
+    {{ partition_hint('s.pub_date', 'changed_archive_months', 'month') }}
     {% endif %}
 ),
 
@@ -23,6 +38,8 @@ cleaned as (
         -- Primary key
         article_id,
         uri,
+        -- Join key shared with Most Popular (computed here for rows loaded before the transform wrote it)
+        coalesce(article_key, {{ article_key('uri', 'web_url') }}) as article_key,
         
         -- Dates
         pub_date,
@@ -61,7 +78,10 @@ cleaned as (
             when multimedia_count_by_type is not null 
             then true 
             else false 
-        end as has_multimedia
+        end as has_multimedia,
+        
+        -- Load time of the month partition (drives downstream incremental runs)
+        _source_loaded_at
         
     from source
     where article_id is not null
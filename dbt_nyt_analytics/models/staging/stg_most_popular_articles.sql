@@ -1,7 +1,7 @@
 {{
     config(
         materialized='incremental',
-        unique_key=['snapshot_date', 'article_id'],
+        incremental_strategy='insert_overwrite',
         partition_by={
             "field": "snapshot_date",
             "data_type": "date",
@@ -10,10 +10,25 @@
     )
 }}
 
-with source_data as (
-    select * from {{ source('nyt_raw', 'most_popular_articles') }}
+with loaded_partitions as (
+    {{ loaded_partitions('most_popular_slim') }}
+),
+
+source_data as (
+    select
+        s.*,
+        lp._source_loaded_at
+    from {{ source('nyt_raw', 'most_popular_articles') }} s
+    left join loaded_partitions lp
+        on s.snapshot_date = lp.partition_date
     {% if is_incremental() %}
-    where {{ get_incremental_filter('snapshot_date') }}
+    -- Rebuild every snapshot day loaded (or re-loaded) since the last run
+    where s.snapshot_date in (
+        select partition_date
+        from loaded_partitions
+        where {{ get_incremental_filter() }}
+    )
+    {{ partition_hint('s.snapshot_date', 'changed_snapshot_dates') }}
     {% endif %}
 ),
 
@@ -21,8 +36,15 @@ cleaned as (
     select
         -- Primary keys
         snapshot_date,
+        -- Rows loaded before intraday capture came from the daily viewed/30 feed
+        coalesce(feed, 'viewed') as feed,
+        coalesce(period, 30) as period,
+        coalesce(captured_at, timestamp(snapshot_date)) as captured_at,
         id as article_id,
+        rank,
         uri,
+        -- Join key shared with the archive (computed here for rows loaded before the transform wrote it)
+        coalesce(article_key, {{ article_key('uri', 'url') }}) as article_key,
         asset_id,
         
         -- Parse date strings to proper types
@@ -49,10 +71,19 @@ cleaned as (
         
         -- JSON and keywords
         media_count_by_type,
-        adx_keywords
+        adx_keywords,
+        
+        -- Load time of the snapshot partition (drives downstream incremental runs)
+        _source_loaded_at
         
     from source_data
     where id is not null
+    -- Rows streamed via the Storage Write API are not deduplicated on write: a
+    -- redelivered upload can append a capture twice
+    qualify row_number() over (
+        partition by snapshot_date, feed, period, captured_at, id
+        order by _source_loaded_at desc
+    ) = 1
 )
 
 select * from cleaned
@@ -71,6 +71,25 @@ bq --project_id="$GCP_PROJECT" mk --table \
   "$BQ_METADATA_DATASET.load_manifest" \
   source:STRING,path:STRING,loaded_at:TIMESTAMP 2>/dev/null || echo "  (Table already exists)"
 
+# Metadata: pending_loads (micro-batch queue; pending = queued and not in load_manifest).
+# Partitions expire after 8 days: files queued over 7 days ago are left to backfill.py
+echo "Creating table $BQ_METADATA_DATASET.pending_loads..."
+bq --project_id="$GCP_PROJECT" mk --table \
+  --description="Files queued for micro-batched loading (LOAD_BATCH_MODE)" \
+  --time_partitioning_field=enqueued_at \
+  --time_partitioning_type=DAY \
+  --time_partitioning_expiration=691200 \
+  --clustering_fields=source \
+  "$BQ_METADATA_DATASET.pending_loads" \
+  source:STRING,path:STRING,enqueued_at:TIMESTAMP 2>/dev/null || echo "  (Table already exists)"
+
+# Metadata: dbt_runs (run log of common/dbt_orchestrator.py; watermark = manifest time covered)
+echo "Creating table $BQ_METADATA_DATASET.dbt_runs..."
+bq --project_id="$GCP_PROJECT" mk --table \
+  --description="Selective dbt runs and the load_manifest time each one covered" \
+  "$BQ_METADATA_DATASET.dbt_runs" \
+  run_id:STRING,started_at:TIMESTAMP,finished_at:TIMESTAMP,status:STRING,manifest_watermark:TIMESTAMP,files:INTEGER,selected:STRING 2>/dev/null || echo "  (Table already exists)"
+
 # Prod: archive_articles (partitioned by pub_date - MONTHLY to support 100+ years)
 echo "Creating table $BQ_PROD_DATASET.archive_articles (partitioned by pub_date - MONTHLY)..."
 bq --project_id="$GCP_PROJECT" mk --table \
@@ -90,9 +109,29 @@ bq --project_id="$GCP_PROJECT" mk --table \
   "$BQ_PROD_DATASET.most_popular_articles" \
   "$SCHEMA_DIR/most_popular_articles.json" 2>/dev/null || echo "  (Table already exists)"
 
+# Tables created before intraday Most Popular capture: add the snapshot, rank and
+# article_key columns (no-op otherwise)
+for table in "$BQ_STAGING_DATASET.most_popular_articles" "$BQ_PROD_DATASET.most_popular_articles"; do
+  echo "Adding feed, period, captured_at, rank, article_key to $table (if missing)..."
+  bq --project_id="$GCP_PROJECT" query --use_legacy_sql=false --quiet \
+    "ALTER TABLE \`$GCP_PROJECT.$table\`
+       ADD COLUMN IF NOT EXISTS feed STRING,
+       ADD COLUMN IF NOT EXISTS period INT64,
+       ADD COLUMN IF NOT EXISTS captured_at TIMESTAMP,
+       ADD COLUMN IF NOT EXISTS rank INT64,
+       ADD COLUMN IF NOT EXISTS article_key STRING" >/dev/null
+done
+
+# Archive tables created before article_key was written (no-op otherwise)
+for table in "$BQ_STAGING_DATASET.archive_articles" "$BQ_PROD_DATASET.archive_articles"; do
+  echo "Adding article_key to $table (if missing)..."
+  bq --project_id="$GCP_PROJECT" query --use_legacy_sql=false --quiet \
+    "ALTER TABLE \`$GCP_PROJECT.$table\` ADD COLUMN IF NOT EXISTS article_key STRING" >/dev/null
+done
+
 echo ""
 echo "✅ BigQuery setup complete!"
 echo "Datasets and tables in $GCP_PROJECT:"
 echo "  $BQ_STAGING_DATASET: archive_articles, most_popular_articles"
-echo "  $BQ_METADATA_DATASET: load_manifest"
+echo "  $BQ_METADATA_DATASET: load_manifest, pending_loads, dbt_runs"
 echo "  $BQ_PROD_DATASET: archive_articles (partitioned MONTHLY by pub_date, clustered), most_popular_articles (partitioned by snapshot_date)"
@@ -13,6 +13,11 @@ BQ_PROD_DATASET="${BQ_PROD_DATASET:-}"
 FUNCTION_NAME="${FUNCTION_NAME:-}"
 REGION="${REGION:-}"
 SERVICE_ACCOUNT="${SERVICE_ACCOUNT:-}"
+# Optional micro-batch mode: queue events and load pending files together
+LOAD_BATCH_MODE="${LOAD_BATCH_MODE:-false}"
+FLUSH_SCHEDULE="${FLUSH_SCHEDULE:-*/5 * * * *}"
+# Most Popular files up to this size are streamed via the Storage Write API (0 disables)
+STREAM_MAX_BYTES="${STREAM_MAX_BYTES:-2097152}"
 
 # Validate required variables
 REQUIRED_VARS=(
@@ -53,6 +58,8 @@ echo "  Region: $REGION"
 echo "  Bucket: $GCS_BUCKET"
 echo "  Prefix: $GCS_PREFIX"
 echo "  Datasets: $BQ_STAGING_DATASET, $BQ_METADATA_DATASET, $BQ_PROD_DATASET"
+echo "  Batch mode: $LOAD_BATCH_MODE"
+echo "  Stream max bytes: $STREAM_MAX_BYTES"
 echo ""
 
 # Copy schema files to cloud_function/schema/ for deployment
@@ -73,7 +80,7 @@ DEPLOY_CMD=(
   --entry-point=gcs_to_bigquery
   --trigger-event-filters="type=google.cloud.storage.object.v1.finalized"
   --trigger-event-filters="bucket=$GCS_BUCKET"
-  --set-env-vars="GCP_PROJECT=$GCP_PROJECT,GCS_BUCKET=$GCS_BUCKET,GCS_PREFIX=$GCS_PREFIX,BQ_STAGING_DATASET=$BQ_STAGING_DATASET,BQ_METADATA_DATASET=$BQ_METADATA_DATASET,BQ_PROD_DATASET=$BQ_PROD_DATASET"
+  --set-env-vars="GCP_PROJECT=$GCP_PROJECT,GCS_BUCKET=$GCS_BUCKET,GCS_PREFIX=$GCS_PREFIX,BQ_STAGING_DATASET=$BQ_STAGING_DATASET,BQ_METADATA_DATASET=$BQ_METADATA_DATASET,BQ_PROD_DATASET=$BQ_PROD_DATASET,LOAD_BATCH_MODE=$LOAD_BATCH_MODE,STREAM_MAX_BYTES=$STREAM_MAX_BYTES"
   --project="$GCP_PROJECT"
   --max-instances=10
   --timeout=540s
@@ -89,6 +96,49 @@ fi
 echo "Running: ${DEPLOY_CMD[*]}"
 "${DEPLOY_CMD[@]}"
 
+# Micro-batch mode: HTTP flush function plus a scheduler job that calls it. Events
+# only queue their files; the scheduled flush checks the thresholds and loads them
+if [[ "$LOAD_BATCH_MODE" == "true" ]]; then
+  FLUSH_FUNCTION="${FUNCTION_NAME}-flush"
+  FLUSH_CMD=(
+    gcloud functions deploy "$FLUSH_FUNCTION"
+    --gen2
+    --runtime=python312
+    --region="$REGION"
+    --source="./cloud_function"
+    --entry-point=flush_pending
+    --trigger-http
+    --no-allow-unauthenticated
+    --set-env-vars="GCP_PROJECT=$GCP_PROJECT,GCS_BUCKET=$GCS_BUCKET,GCS_PREFIX=$GCS_PREFIX,BQ_STAGING_DATASET=$BQ_STAGING_DATASET,BQ_METADATA_DATASET=$BQ_METADATA_DATASET,BQ_PROD_DATASET=$BQ_PROD_DATASET,LOAD_BATCH_MODE=$LOAD_BATCH_MODE,STREAM_MAX_BYTES=$STREAM_MAX_BYTES"
+    --project="$GCP_PROJECT"
+    --max-instances=1
+    --timeout=540s
+    --memory=512MB
+  )
+  if [[ -n "$SERVICE_ACCOUNT" ]]; then
+    FLUSH_CMD+=(--service-account="$SERVICE_ACCOUNT")
+  fi
+  echo "Running: ${FLUSH_CMD[*]}"
+  "${FLUSH_CMD[@]}"
+
+  FLUSH_URL="$(gcloud functions describe "$FLUSH_FUNCTION" --gen2 --region="$REGION" \
+    --project="$GCP_PROJECT" --format='value(serviceConfig.uri)')"
+  SCHEDULER_ARGS=(
+    "${FLUSH_FUNCTION}-schedule"
+    --location="$REGION"
+    --project="$GCP_PROJECT"
+    --schedule="$FLUSH_SCHEDULE"
+    --uri="$FLUSH_URL"
+    --http-method=POST
+  )
+  if [[ -n "$SERVICE_ACCOUNT" ]]; then
+    SCHEDULER_ARGS+=(--oidc-service-account-email="$SERVICE_ACCOUNT")
+  fi
+  gcloud scheduler jobs create http "${SCHEDULER_ARGS[@]}" 2>/dev/null \
+    || gcloud scheduler jobs update http "${SCHEDULER_ARGS[@]}"
+  echo "✓ Flush function $FLUSH_FUNCTION scheduled ($FLUSH_SCHEDULE)"
+fi
+
 echo ""
 echo "✅ Cloud Function deployed successfully!"
 echo "Function: $FUNCTION_NAME"
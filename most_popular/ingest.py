@@ -1,18 +1,25 @@
 """
 NYT Most Popular API – ingestion script.
 
-Fetches most viewed articles for the last 30 days and saves raw JSON.
-Designed to run once daily (via cron or scheduler).
-
-API Endpoint: GET https://api.nytimes.com/svc/mostpopular/v2/viewed/{period}.json
+Fetches the most viewed, emailed and shared articles for the last 1, 7 and 30 days
+and saves raw JSON. Designed to run several times a day (via cron or scheduler);
+each capture is stored as a delta against the previous one (see most_popular.snapshots).
+All (feed, period) requests run concurrently on a thread pool; a KeyPool
+(common/key_pool.py) spreads them over the configured API keys within each key's
+per-minute and per-day budget.
+
+API Endpoint: GET https://api.nytimes.com/svc/mostpopular/v2/{feed}/{period}.json
+Feed options: viewed, emailed, shared
 Period options: 1, 7, or 30 (days)
 
-Output: most_popular_raw/{date}/viewed_30.json
+Output: most_popular_raw/{date}/{feed}_{period}_{HHMM}.json (or .delta.json), UTC
 """
 
-import json
 import os
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any, cast
 
@@ -20,33 +27,60 @@ import requests
 from dotenv import load_dotenv
 from requests.exceptions import HTTPError
 
+from common.key_pool import KeyPool
+from most_popular.snapshots import list_snapshots, write_snapshot
+
 load_dotenv()
-API_KEY = os.getenv("NYTIMES_API_KEY")
 BASE_URL = "https://api.nytimes.com/svc/mostpopular/v2"
 RAW_DIR = Path("most_popular_raw")
-PERIOD = 30
+FEEDS = ("viewed", "emailed", "shared")
+PERIODS = (1, 7, 30)
+# API budget: 5 requests per minute per key (override for higher-tier keys)
+REQUESTS_PER_MINUTE = int(os.getenv("MOST_POPULAR_REQUESTS_PER_MINUTE", "5"))
+MAX_WORKERS = int(os.getenv("MOST_POPULAR_MAX_WORKERS", "9"))
+KEY_POOL = KeyPool.from_env("most_popular_keys.json", per_minute=REQUESTS_PER_MINUTE)
+
+
+@dataclass
+class EndpointResult:
+    """Outcome of one (feed, period) capture, for the latency report."""
+
+    feed: str
+    period: int
+    ok: bool
+    skipped: bool = False
+    latency_ms: float = 0.0
+    waited_ms: float = 0.0
+    path: Path | None = None
 
 
-def fetch_most_viewed(period: int = PERIOD) -> dict | None:
+def fetch_most_popular(feed: str, period: int, api_key: str | None = None) -> dict | None:
     """
-    Fetch most viewed articles for the given period (days).
+    Fetch the most popular articles of one feed for the given period (days).
 
     Args:
+        feed: viewed, emailed or shared
         period: Number of days (1, 7, or 30)
+        api_key: Key reserved from KEY_POOL (default: reserve one here)
 
     Returns:
         Raw API response as dict, or None on error.
     """
-    if not API_KEY:
-        print("Error: Set NYTIMES_API_KEY in your .env file.")
+    if feed not in FEEDS:
+        print(f"Error: Invalid feed {feed!r}. Must be one of {', '.join(FEEDS)}.")
         return None
 
-    if period not in (1, 7, 30):
+    if period not in PERIODS:
         print(f"Error: Invalid period {period}. Must be 1, 7, or 30.")
         return None
 
-    url = f"{BASE_URL}/viewed/{period}.json"
-    params = {"api-key": API_KEY}
+    if api_key is None:
+        api_key = acquire_key()
+        if api_key is None:
+            return None
+
+    url = f"{BASE_URL}/{feed}/{period}.json"
+    params = {"api-key": api_key}
 
     print(f"Requesting: {url}")
     try:
@@ -54,6 +88,7 @@ def fetch_most_viewed(period: int = PERIOD) -> dict | None:
     except requests.exceptions.RequestException as e:
         print(f"Error: Request failed: {e}")
         return None
+    KEY_POOL.report(api_key, response.status_code)
 
     if response.status_code == 401:
         print("Error: Unauthorized. Check that your API key is valid.")
@@ -70,56 +105,131 @@ def fetch_most_viewed(period: int = PERIOD) -> dict | None:
 
     data = cast(dict[str, Any], response.json())
     num_results = data.get("num_results", 0)
-    print(f"Fetched {num_results} most viewed articles (last {period} days).")
+    print(f"Fetched {num_results} most {feed} articles (last {period} days).")
     return data
 
 
-def ingest_most_viewed(
-    period: int = PERIOD,
+def acquire_key() -> str | None:
+    """Reserve a request on the pool's best key (waiting for budget); None if none is usable."""
+    if not KEY_POOL.keys:
+        print("Error: Set NYTIMES_API_KEY (or NYTIMES_API_KEYS) in your .env file.")
+        return None
+    api_key = KEY_POOL.acquire()
+    if api_key is None:
+        print("Error: No API key has budget left. Wait before retrying.")
+    return api_key
+
+
+def fetch_most_viewed(period: int = 30) -> dict | None:
+    """Fetch most viewed articles for the given period (days)."""
+    return fetch_most_popular("viewed", period)
+
+
+def ingest_snapshot(
+    feed: str,
+    period: int,
     skip_existing: bool = True,
-    date_str: str | None = None,
-) -> bool:
+    captured: datetime | None = None,
+) -> EndpointResult:
     """
-    Fetch most viewed articles and save raw JSON.
+    Fetch one feed/period and save it as a raw snapshot (delta or full).
 
     Args:
+        feed: viewed, emailed or shared
         period: Number of days (1, 7, or 30)
-        skip_existing: If True, skip if output file already exists (default: True, idempotent)
-        date_str: Override date string for output path (default: today)
+        skip_existing: If True, skip if this capture already exists (default: True, idempotent)
+        captured: Capture time (default: now, UTC; truncated to the minute in the file name)
 
     Returns:
-        True on success, False otherwise.
+        EndpointResult with success flag, request latency and time spent waiting for budget.
     """
-    if date_str is None:
-        date_str = datetime.now().strftime("%Y-%m-%d")
+    if captured is None:
+        captured = datetime.now(UTC)
+
+    day_dir = RAW_DIR / captured.strftime("%Y-%m-%d")
+    hhmm = captured.strftime("%H%M")
+    if skip_existing:
+        existing = [s for s in list_snapshots(day_dir, feed, period) if s.hhmm == hhmm]
+        if existing:
+            print(f"Skipping (already exists): {existing[0].path}")
+            return EndpointResult(feed, period, ok=True, skipped=True, path=existing[0].path)
+
+    started = time.monotonic()
+    api_key = acquire_key()
+    requested = time.monotonic()
+    data = fetch_most_popular(feed, period, api_key=api_key) if api_key else None
+    result = EndpointResult(
+        feed,
+        period,
+        ok=data is not None,
+        latency_ms=round((time.monotonic() - requested) * 1000, 1),
+        waited_ms=round((requested - started) * 1000, 1),
+    )
+    if data is None:
+        return result
 
-    out_path = RAW_DIR / date_str / f"viewed_{period}.json"
+    result.path = write_snapshot(RAW_DIR, feed, period, data, captured)
+    print(f"Ingested to {result.path}")
+    return result
 
-    if skip_existing and out_path.exists():
-        print(f"Skipping (already exists): {out_path}")
-        return True
 
-    data = fetch_most_viewed(period)
-    if data is None:
-        return False
+def ingest_all(
+    feeds: list[str],
+    periods: list[int],
+    captured: datetime | None = None,
+    max_workers: int = MAX_WORKERS,
+) -> list[EndpointResult]:
+    """
+    Capture every (feed, period) concurrently within the key pool's request budgets.
+
+    Each endpoint writes its own files, so snapshots are written from the worker
+    threads as soon as their response arrives. Results keep the (feed, period) order.
+    """
+    # One capture time for the whole run, so all feeds of a run share a file name
+    if captured is None:
+        captured = datetime.now(UTC)
+    pairs = [(feed, period) for feed in feeds for period in periods]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pairs)))) as pool:
+        futures = [
+            pool.submit(ingest_snapshot, feed, period, captured=captured) for feed, period in pairs
+        ]
+        return [f.result() for f in futures]
+
+
+def print_latency_report(results: list[EndpointResult], wall_clock_s: float) -> None:
+    """Per-endpoint latency table plus the run's wall-clock time."""
+    print("\nEndpoint            status    latency   waited")
+    for r in results:
+        status = "skipped" if r.skipped else ("ok" if r.ok else "FAILED")
+        endpoint = f"{r.feed}/{r.period}"
+        print(f"{endpoint:<18}  {status:<7} {r.latency_ms:>8.0f}ms {r.waited_ms:>7.0f}ms")
+    slowest = max((r.latency_ms for r in results), default=0.0)
+    print(f"Wall clock {wall_clock_s:.1f}s (slowest request {slowest / 1000:.1f}s)")
 
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "w") as f:
-        json.dump(data, f, indent=2)
 
-    print(f"Ingested to {out_path}")
-    return True
+def parse_list_env(name: str, default: tuple) -> list[str]:
+    """Comma-separated env override (e.g. MOST_POPULAR_FEEDS=viewed,shared)."""
+    value = os.getenv(name, "")
+    return [v.strip() for v in value.split(",") if v.strip()] or [str(d) for d in default]
 
 
 def main():
-    """Main entry point: fetch most viewed articles for last 30 days."""
-    print(f"=== NYT Most Popular Ingestion: {datetime.now().isoformat()} ===")
-    success = ingest_most_viewed(period=PERIOD)
-    if success:
-        print("Ingestion completed successfully.")
-    else:
-        print("Ingestion failed.")
+    """Main entry point: capture every configured feed/period once, concurrently."""
+    feeds = parse_list_env("MOST_POPULAR_FEEDS", FEEDS)
+    periods = [int(p) for p in parse_list_env("MOST_POPULAR_PERIODS", PERIODS)]
+    captured = datetime.now(UTC)
+    print(f"=== NYT Most Popular Ingestion: {captured.isoformat()} ===")
+
+    started = time.monotonic()
+    results = ingest_all(feeds, periods, captured=captured)
+    print_latency_report(results, time.monotonic() - started)
+
+    failed = sum(1 for r in results if not r.ok)
+    if failed:
+        print(f"Ingestion failed for {failed} feed/period(s).")
         exit(1)
+    print("Ingestion completed successfully.")
 
 
 if __name__ == "__main__":
@@ -37,3 +37,11 @@ class SlimMostPopularArticle(BaseModel):
     # None instead of {} for BigQuery compatibility (same as archive)
     media_count_by_type: dict[str, int] | None = None
     adx_keywords: str | None = None
+    # Snapshot the record came from: feed (viewed/emailed/shared), period (days), UTC time
+    feed: str | None = None
+    period: int | None = None
+    captured_at: str | None = None
+    # 1-based position in the snapshot's results (the API returns them in rank order)
+    rank: int | None = None
+    # Normalized uri/url join key shared with the archive (see common.keys)
+    article_key: str | None = None
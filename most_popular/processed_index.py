@@ -0,0 +1,130 @@
+"""
+NYT Most Popular API – persistent index of processed raw snapshots.
+
+Lets the transform find new or changed raw files without walking the whole raw
+tree. The index (JSON) records, per raw file, the mtime, size and SHA-256 it had
+when transformed, and per day directory the mtime it had when last fully scanned:
+
+  {"version": 1,
+   "dirs":  {"2026-02-19": <mtime_ns>},
+   "files": {"2026-02-19/viewed_1_0600.json": {"mtime_ns": ..., "size": ..., "sha256": ...}}}
+
+A day directory whose mtime is unchanged has had no file added, removed or renamed
+(snapshots are written by rename), so it is skipped without listing. Files whose
+mtime or size changed are re-hashed and only returned if their content changed.
+The index can be rebuilt from disk at any time (rebuild_index).
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from most_popular.snapshots import parse_snapshot_path, write_atomic
+
+INDEX_VERSION = 1
+
+
+def sha256_file(path: Path | str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(path: Path | str, stat: os.stat_result | None = None) -> dict:
+    """mtime, size and content hash of a file, as stored in the index."""
+    stat = stat or os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256_file(path)}
+
+
+@dataclass
+class ProcessedIndex:
+    """Processed raw files and fully scanned day directories, keyed relative to raw_dir."""
+
+    raw_dir: Path
+    dirs: dict[str, int] = field(default_factory=dict)
+    files: dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path, raw_dir: Path) -> "ProcessedIndex | None":
+        """Load an index; None if it is missing, unreadable or from another version."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return cls(raw_dir, dirs=data.get("dirs", {}), files=data.get("files", {}))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": INDEX_VERSION, "dirs": self.dirs, "files": self.files}
+        write_atomic(path, json.dumps(data, separators=(",", ":"), sort_keys=True))
+
+    def key(self, path: Path) -> str:
+        return path.relative_to(self.raw_dir).as_posix()
+
+    def find_pending(self) -> tuple[list[tuple[Path, dict]], dict[str, int]]:
+        """
+        New or changed snapshot files, oldest day first, with their fingerprints.
+
+        Also returns the mtimes of the day directories that were scanned; record them
+        with mark_scanned() once their pending files are processed.
+        """
+        pending: list[tuple[Path, dict]] = []
+        scanned: dict[str, int] = {}
+        if not self.raw_dir.exists():
+            return pending, scanned
+
+        for day in sorted(os.scandir(self.raw_dir), key=lambda e: e.name):
+            if not day.is_dir():
+                continue
+            # Read before listing, so a file added during the scan bumps it again
+            dir_mtime = day.stat().st_mtime_ns
+            if self.dirs.get(day.name) == dir_mtime:
+                continue
+            scanned[day.name] = dir_mtime
+
+            for entry in sorted(os.scandir(day.path), key=lambda e: e.name):
+                path = Path(entry.path)
+                if not entry.is_file() or parse_snapshot_path(path) is None:
+                    continue
+                stat = entry.stat()
+                known = self.files.get(self.key(path))
+                if known and (known["mtime_ns"], known["size"]) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                current = fingerprint(path, stat)
+                if known and known["sha256"] == current["sha256"]:
+                    # Touched but identical content: refresh the stat fields only
+                    self.files[self.key(path)] = current
+                    continue
+                pending.append((path, current))
+        return pending, scanned
+
+    def mark_processed(self, path: Path, file_fingerprint: dict) -> None:
+        self.files[self.key(path)] = file_fingerprint
+
+    def mark_scanned(self, dirs: dict[str, int]) -> None:
+        self.dirs.update(dirs)
+
+
+def rebuild_index(raw_dir: Path, slim_dir: Path) -> ProcessedIndex:
+    """
+    Rebuild the index from disk: every raw snapshot whose slim file exists and is at
+    least as new as the raw file counts as processed. Day directories are left
+    unscanned so the next find_pending() lists each of them once.
+    """
+    index = ProcessedIndex(raw_dir)
+    for path in sorted(raw_dir.glob("*/*.json")):
+        info = parse_snapshot_path(path)
+        if info is None:
+            continue
+        slim_path = slim_dir / info.date_str / info.slim_name
+        stat = path.stat()
+        if slim_path.exists() and slim_path.stat().st_mtime_ns >= stat.st_mtime_ns:
+            index.mark_processed(path, fingerprint(path, stat))
+    return index
@@ -0,0 +1,176 @@
+"""
+NYT Most Popular API – raw snapshot storage with deltas.
+
+Each capture of a feed/period is stored under most_popular_raw/YYYY-MM-DD/ as
+{feed}_{period}_{HHMM}.json (full API response) or {feed}_{period}_{HHMM}.delta.json
+(changes against the previous capture of the same feed/period that day). The first
+capture of a day is always full, so a day directory is self-contained, and chains
+are capped at MAX_DELTA_DEPTH.
+
+Delta format:
+  delta_of  file name of the snapshot this one is based on (same directory)
+  depth     number of deltas between this snapshot and a full one
+  meta      top-level response fields other than results (status, num_results, ...)
+  order     article ids in result order
+  upserts   full result docs that are new or changed since the base
+
+Legacy daily files ({feed}_{period}.json) are read as captured at 00:00.
+Use load_snapshot() to get the full API response back from either form.
+"""
+
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+MAX_DELTA_DEPTH = 8
+
+SNAPSHOT_NAME = re.compile(
+    r"^(?P<feed>[a-z]+)_(?P<period>\d+)(?:_(?P<hhmm>\d{4}))?(?P<delta>\.delta)?\.json$"
+)
+
+
+@dataclass(frozen=True)
+class SnapshotInfo:
+    """Feed, period and capture time parsed from a raw snapshot path."""
+
+    path: Path
+    feed: str
+    period: int
+    date_str: str
+    hhmm: str | None  # None for legacy daily files
+    is_delta: bool
+
+    @property
+    def captured_at(self) -> str:
+        """Capture time in UTC as a BigQuery-compatible timestamp string."""
+        hhmm = self.hhmm or "0000"
+        return f"{self.date_str} {hhmm[:2]}:{hhmm[2:]}:00+00:00"
+
+    @property
+    def slim_name(self) -> str:
+        """File name of the slim NDJSON written for this snapshot."""
+        suffix = f"_{self.hhmm}" if self.hhmm else ""
+        return f"{self.feed}_{self.period}{suffix}.ndjson"
+
+
+def snapshot_name(feed: str, period: int, hhmm: str, delta: bool = False) -> str:
+    return f"{feed}_{period}_{hhmm}{'.delta' if delta else ''}.json"
+
+
+def parse_snapshot_path(path: Path) -> SnapshotInfo | None:
+    """Parse a raw snapshot path; returns None if the name is not a snapshot."""
+    match = SNAPSHOT_NAME.match(path.name)
+    if not match:
+        return None
+    return SnapshotInfo(
+        path=path,
+        feed=match["feed"],
+        period=int(match["period"]),
+        date_str=path.parent.name,
+        hhmm=match["hhmm"],
+        is_delta=bool(match["delta"]),
+    )
+
+
+def list_snapshots(day_dir: Path, feed: str, period: int) -> list[SnapshotInfo]:
+    """Snapshots of one feed/period in a day directory, oldest first."""
+    infos = (parse_snapshot_path(p) for p in day_dir.glob(f"{feed}_{period}*.json"))
+    return sorted(
+        (i for i in infos if i and i.feed == feed and i.period == period),
+        key=lambda i: i.hhmm or "0000",
+    )
+
+
+def make_delta(base: dict, data: dict, base_name: str, depth: int) -> dict | None:
+    """
+    Describe data as changes against base.
+    Returns None if results cannot be keyed by a unique article id.
+    """
+    results = data.get("results", [])
+    ids = [doc.get("id") for doc in results]
+    if None in ids or len(set(ids)) != len(ids):
+        return None
+
+    base_by_id = {doc.get("id"): doc for doc in base.get("results", [])}
+    return {
+        "delta_of": base_name,
+        "depth": depth,
+        "meta": {k: v for k, v in data.items() if k != "results"},
+        "order": ids,
+        "upserts": [doc for doc in results if base_by_id.get(doc["id"]) != doc],
+    }
+
+
+def apply_delta(base: dict, delta: dict) -> dict:
+    """Rebuild a full response from its base response and delta."""
+    by_id = {doc.get("id"): doc for doc in base.get("results", [])}
+    by_id.update({doc["id"]: doc for doc in delta["upserts"]})
+    return {**delta["meta"], "results": [by_id[article_id] for article_id in delta["order"]]}
+
+
+def load_snapshot(path: Path) -> dict:
+    """
+    Load a raw snapshot as a full API response, following the delta chain if needed.
+    Raises FileNotFoundError if a base snapshot is missing and ValueError on a broken chain.
+    """
+    chain = []
+    current = Path(path)
+    while True:
+        with open(current) as f:
+            data: dict = json.load(f)
+        if "delta_of" not in data:
+            break
+        chain.append(data)
+        if len(chain) > MAX_DELTA_DEPTH:
+            raise ValueError(f"Delta chain longer than {MAX_DELTA_DEPTH} at {path}")
+        current = current.parent / data["delta_of"]
+
+    for delta in reversed(chain):
+        data = apply_delta(data, delta)
+    return data
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Write via a temp file and rename, so readers never see a partial snapshot."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_text(text)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def write_snapshot(raw_dir: Path, feed: str, period: int, data: dict, captured: datetime) -> Path:
+    """
+    Store one capture as a delta against the day's previous capture, or in full.
+
+    A full snapshot is written for the first capture of the day, when the chain has
+    reached MAX_DELTA_DEPTH, or when the delta would not be smaller. JSON is compact
+    and written atomically.
+    """
+    day_dir = raw_dir / captured.strftime("%Y-%m-%d")
+    hhmm = captured.strftime("%H%M")
+    day_dir.mkdir(parents=True, exist_ok=True)
+    full = json.dumps(data, separators=(",", ":"))
+
+    previous = [s for s in list_snapshots(day_dir, feed, period) if (s.hhmm or "0000") < hhmm]
+    if previous:
+        base = previous[-1]
+        with open(base.path) as f:
+            base_depth = json.load(f).get("depth", 0) if base.is_delta else 0
+        if base_depth < MAX_DELTA_DEPTH:
+            delta = make_delta(load_snapshot(base.path), data, base.path.name, base_depth + 1)
+            if delta is not None:
+                encoded = json.dumps(delta, separators=(",", ":"))
+                if len(encoded) < len(full):
+                    out_path = day_dir / snapshot_name(feed, period, hhmm, delta=True)
+                    write_atomic(out_path, encoded)
+                    return out_path
+
+    out_path = day_dir / snapshot_name(feed, period, hhmm)
+    write_atomic(out_path, full)
+    return out_path
@@ -1,20 +1,30 @@
 """
 NYT Most Popular API – transform raw to slim.
 
-Reads raw JSON from most_popular_raw/, extracts analysis-ready fields,
-writes validated NDJSON to most_popular_slim/{date}/viewed_30.ndjson.
+Reads raw snapshots from most_popular_raw/ (full or delta, see most_popular.snapshots),
+extracts analysis-ready fields tagged with feed, period, capture time and rank
+(1-based position in the list), and writes
+validated NDJSON to most_popular_slim/{date}/{feed}_{period}_{HHMM}.ndjson.
+
+Only new or changed raw snapshots are transformed: a processed-file index
+(INDEX_PATH, see most_popular.processed_index) is built from disk on first use
+and can be rebuilt with `python -m most_popular.transform --rebuild-index`.
 """
 
-import json
+import sys
 from collections import Counter
 from pathlib import Path
 
 from pydantic import ValidationError
 
+from common.keys import article_key
 from most_popular.models import SlimMostPopularArticle
+from most_popular.processed_index import ProcessedIndex, rebuild_index
+from most_popular.snapshots import load_snapshot, parse_snapshot_path
 
 RAW_DIR = Path("most_popular_raw")
 SLIM_DIR = Path("most_popular_slim")
+INDEX_PATH = Path(".transform_state") / "most_popular_processed.json"
 
 
 def media_counts_by_type(media: list) -> dict:
@@ -36,6 +46,7 @@ def extract_slim_most_popular(doc: dict) -> dict:
         "id": doc.get("id"),
         "uri": doc.get("uri"),
         "url": doc.get("url"),
+        "article_key": article_key(doc.get("uri"), doc.get("url")),
         "asset_id": doc.get("asset_id"),
         "source": doc.get("source"),
         "published_date": doc.get("published_date"),
@@ -57,18 +68,21 @@ def extract_slim_most_popular(doc: dict) -> dict:
 
 def transform_file(raw_path: Path, overwrite: bool = False) -> bool:
     """
-    Read raw JSON, validate, extract slim articles, write NDJSON.
+    Read a raw snapshot, validate, extract slim articles, write NDJSON.
 
     Args:
-        raw_path: Path to raw JSON file
+        raw_path: Path to raw snapshot JSON (full or .delta.json)
         overwrite: If True, overwrite existing slim file
 
     Returns:
         True on success, False otherwise.
     """
-    date_str = raw_path.parent.name
-    filename = raw_path.stem
-    slim_path = SLIM_DIR / date_str / f"{filename}.ndjson"
+    info = parse_snapshot_path(raw_path)
+    if info is None:
+        print(f"Skipping (not a snapshot file name): {raw_path}")
+        return False
+
+    slim_path = SLIM_DIR / info.date_str / info.slim_name
 
     if not raw_path.exists():
         print(f"Skipping (raw file not found): {raw_path}")
@@ -80,11 +94,22 @@ def transform_file(raw_path: Path, overwrite: bool = False) -> bool:
 
     print(f"Transforming: {raw_path}")
 
-    with open(raw_path) as f:
-        raw_data = json.load(f)
+    try:
+        raw_data = load_snapshot(raw_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: Could not reconstruct snapshot {raw_path}: {e}")
+        return False
 
     results = raw_data.get("results", [])
-    slim_dicts = [extract_slim_most_popular(doc) for doc in results]
+    snapshot_fields = {
+        "feed": info.feed,
+        "period": info.period,
+        "captured_at": info.captured_at,
+    }
+    slim_dicts = [
+        extract_slim_most_popular(doc) | snapshot_fields | {"rank": position}
+        for position, doc in enumerate(results, start=1)
+    ]
 
     slim_path.parent.mkdir(parents=True, exist_ok=True)
     skipped = 0
@@ -106,29 +131,56 @@ def transform_file(raw_path: Path, overwrite: bool = False) -> bool:
     return True
 
 
-def transform_all(overwrite: bool = False) -> None:
-    """Transform all raw files found in RAW_DIR."""
-    raw_files = sorted(RAW_DIR.glob("*/*.json"))
+def transform_all(overwrite: bool = False, rebuild: bool = False) -> None:
+    """
+    Transform new or changed raw files found in RAW_DIR.
+
+    Args:
+        overwrite: If True, re-transform every raw file and rebuild the index
+        rebuild: If True, rebuild the processed-file index from disk before the run
+    """
+    if overwrite:
+        raw_files = sorted(RAW_DIR.glob("*/*.json"))
+        if not raw_files:
+            print(f"No raw files found in {RAW_DIR}. Run most_popular ingest first.")
+            return
+        print(f"Re-transforming all {len(raw_files)} raw file(s).")
+        success = sum(1 for raw_path in raw_files if transform_file(raw_path, overwrite=True))
+        rebuild_index(RAW_DIR, SLIM_DIR).save(INDEX_PATH)
+        print(f"\nTransformation complete: {success} succeeded, {len(raw_files) - success} failed.")
+        return
+
+    index = None if rebuild else ProcessedIndex.load(INDEX_PATH, RAW_DIR)
+    if index is None:
+        index = rebuild_index(RAW_DIR, SLIM_DIR)
+        print(f"Built processed-file index from disk ({len(index.files)} file(s) already done).")
 
-    if not raw_files:
-        print(f"No raw files found in {RAW_DIR}. Run most_popular ingest first.")
+    pending, scanned = index.find_pending()
+    if not pending:
+        index.mark_scanned(scanned)
+        index.save(INDEX_PATH)
+        print("No new or changed raw files to transform.")
         return
 
-    print(f"Found {len(raw_files)} raw file(s) to transform.")
+    print(f"Found {len(pending)} new or changed raw file(s) to transform.")
     success = 0
-    failed = 0
+    failed_dirs = set()
 
-    for raw_path in raw_files:
-        if transform_file(raw_path, overwrite=overwrite):
+    for raw_path, file_fingerprint in pending:
+        if transform_file(raw_path, overwrite=True):
+            index.mark_processed(raw_path, file_fingerprint)
             success += 1
         else:
-            failed += 1
+            failed_dirs.add(raw_path.parent.name)
 
-    print(f"\nTransformation complete: {success} succeeded, {failed} failed.")
+    # Failed files stay pending: leave their directories to be scanned again
+    index.mark_scanned({d: m for d, m in scanned.items() if d not in failed_dirs})
+    index.save(INDEX_PATH)
+    print(f"\nTransformation complete: {success} succeeded, {len(pending) - success} failed.")
 
 
 def main():
-    transform_all()
+    transform_all(rebuild="--rebuild-index" in sys.argv[1:])
 
 
 if __name__ == "__main__":
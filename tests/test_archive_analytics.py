@@ -0,0 +1,135 @@
+"""Tests for archive analytics: the local month, section and keyword-trend aggregates."""
+
+import json
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from archive.analytics import (  # noqa: E402
+    articles_by_month,
+    keyword_trends,
+    load_corpus,
+    section_trends,
+)
+
+
+def _article(article_id, pub_date, section="Arts", keywords=(), **extra):
+    return {
+        "article_id": article_id,
+        "pub_date": pub_date,
+        "section_name": section,
+        "news_desk": extra.get("news_desk", "Culture"),
+        "type_of_material": "News",
+        "word_count": extra.get("word_count", 100),
+        "keywords": [{"name": "subject", "value": v} for v in keywords],
+        "byline_person": extra.get("byline_person", []),
+        "multimedia_count_by_type": extra.get("multimedia"),
+    }
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    files = {
+        "1920/01.ndjson": [
+            _article("a", "1920-01-03T05:00:00+0000", keywords=["Music", "Film"], word_count=101),
+            _article("b", "1920-01-20T05:00:00+0000", section=" ", keywords=["Music"]),
+            _article(
+                "c",
+                "1920-01-21T05:00:00+0000",
+                section="Sports",
+                keywords=["Film", " "],
+                byline_person=[{"firstname": "Jane"}, {"qualifier": "Jr."}],
+                multimedia={"image": 1},
+            ),
+        ],
+        "1921/01.ndjson": [
+            # Duplicate of a loaded article: ignored, like the loader's MERGE
+            _article("a", "1921-01-01T05:00:00+0000", keywords=["Opera"]),
+            _article("d", "1921-01-02T05:00:00+0000", keywords=["Film", "Film"]),
+            _article("e", "1921-01-09T05:00:00+0000", keywords=["Film", "Music"]),
+            _article("f", None, keywords=["Film"]),
+        ],
+    }
+    paths = []
+    for name, records in files.items():
+        path = tmp_path / "archive_slim" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("".join(json.dumps(r) + "\n" for r in records))
+        paths.append(path)
+    return load_corpus(paths)
+
+
+def _slim_paths(tmp_path):
+    return sorted((tmp_path / "archive_slim").glob("*/*.ndjson"))
+
+
+def test_load_corpus_cleans_and_encodes(corpus):
+    articles = corpus.articles
+    assert list(articles["article_id"]) == ["a", "b", "c", "d", "e", "f"]
+    assert isinstance(articles["section_name"].dtype, pd.CategoricalDtype)
+    assert list(articles["section_name"]) == ["Arts", "Unknown", "Sports", "Arts", "Arts", "Arts"]
+    # Only persons with a first or last name count as authors
+    assert list(articles["author_count"]) == [0, 0, 1, 0, 0, 0]
+    assert list(articles["has_authors"]) == [False, False, True, False, False, False]
+    assert len(corpus.keywords) == 10
+
+
+def test_cached_load_matches_parse(corpus, tmp_path):
+    cache_dir = tmp_path / "cache"
+    slim_dir = tmp_path / "archive_slim"
+    first = load_corpus(_slim_paths(tmp_path), cache_dir=cache_dir, slim_dir=slim_dir)
+    assert (cache_dir / "1920" / "01.pkl").exists()
+    cached = load_corpus(_slim_paths(tmp_path), cache_dir=cache_dir, slim_dir=slim_dir)
+    for loaded in (first, cached):
+        pd.testing.assert_frame_equal(loaded.articles, corpus.articles)
+        pd.testing.assert_frame_equal(loaded.keywords, corpus.keywords)
+
+
+def test_articles_by_month(corpus):
+    out = articles_by_month(corpus)
+    assert [str(m.date()) for m in out["pub_month"]] == ["1920-01-01", "1921-01-01"]
+    first = out.iloc[0]
+    assert first["total_articles"] == 3
+    assert first["avg_word_count"] == 100  # 100.33 rounded
+    assert first["total_word_count"] == 301
+    assert first["unique_sections"] == 3
+    assert first["articles_with_multimedia"] == 1
+    assert first["pct_with_keywords"] == 100.0
+    assert first["pct_with_authors"] == 33.3
+    assert first["avg_authors_per_article"] == 0.33
+
+
+def test_section_trends_yoy(corpus):
+    out = section_trends(corpus)
+    arts = out[out["section_name"] == "Arts"].set_index("pub_year")
+    assert arts.loc[1921, "article_count"] == 2
+    assert arts.loc[1921, "year_total"] == 2
+    assert arts.loc[1921, "prior_year_count"] == 1
+    assert arts.loc[1921, "yoy_change"] == 1
+    assert arts.loc[1921, "yoy_change_pct"] == 100.0
+    assert pd.isna(arts.loc[1920, "prior_year_count"])
+    assert pd.isna(arts.loc[1920, "yoy_change_pct"])
+    assert arts.loc[1920, "pct_of_year_total"] == 33.33
+    # Ordered by year, then article_count descending
+    assert list(out["pub_year"]) == [1920, 1920, 1920, 1921]
+
+
+def test_keyword_trends_ranks(corpus):
+    out = keyword_trends(corpus).set_index(["keyword_value", "pub_year"])
+    # Blank keyword values are dropped
+    assert " " not in out.index.get_level_values(0)
+    film_1921 = out.loc[("Film", 1921)]
+    assert film_1921["article_count"] == 2
+    assert film_1921["keyword_occurrences"] == 3
+    assert film_1921["rank_in_year"] == 1
+    assert film_1921["prior_year_count"] == 2
+    assert film_1921["prior_year_rank"] == 1
+    assert film_1921["rank_change"] == 0
+    assert film_1921["yoy_change"] == 0
+    # Ties on article_count are ranked by keyword_value
+    music_1920, music_1921 = out.loc[("Music", 1920)], out.loc[("Music", 1921)]
+    assert music_1920["rank_in_year"] == 2
+    assert music_1921["rank_in_year"] == 2
+    assert music_1921["yoy_change_pct"] == -50.0
+    assert music_1921["rank_change"] == 0
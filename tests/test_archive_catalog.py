@@ -0,0 +1,98 @@
+"""Tests for archive stats sidecars and the catalog: stats, staleness, transform output, pruning."""
+
+import json
+
+from archive import transform
+from archive.catalog import build_catalog, prune
+from archive.stats import compute_stats, read_stats, stats_path, write_stats
+
+
+def _write_slim(path, records):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+
+def test_compute_stats(tmp_path):
+    slim = tmp_path / "1920" / "01.ndjson"
+    _write_slim(
+        slim,
+        [
+            {"pub_date": "1920-01-05T00:00:00+0000", "section_name": "Sports", "keywords": []},
+            {"pub_date": "1920-01-02T00:00:00+0000", "section_name": "Arts", "keywords": [1]},
+            {"pub_date": None, "section_name": "Sports", "keywords": []},
+            {"pub_date": "1920-01-31T00:00:00+0000", "section_name": None, "keywords": [2]},
+        ],
+    )
+    stats = compute_stats(slim)
+    assert stats["record_count"] == 4
+    assert (stats["min_pub_date"], stats["max_pub_date"]) == ("1920-01-02", "1920-01-31")
+    assert stats["sections"] == ["Arts", "Sports"]
+    assert stats["null_rates"] == {"keywords": 0.5, "pub_date": 0.25, "section_name": 0.25}
+    assert stats["byte_size"] == slim.stat().st_size
+
+
+def test_read_stats_detects_stale_sidecar(tmp_path):
+    slim = tmp_path / "1920" / "01.ndjson"
+    _write_slim(slim, [{"section_name": "Arts"}])
+    assert read_stats(slim) is None
+    write_stats(slim)
+    assert stats_path(slim).name == "01.stats.json"
+    assert read_stats(slim, verify_hash=True)["record_count"] == 1
+
+    _write_slim(slim, [{"section_name": "Arts", "x": 1}])
+    assert read_stats(slim) is None
+    # Same size, different content: only the hash check notices
+    _write_slim(slim, [{"section_name": "Arty"}])
+    assert read_stats(slim) is not None
+    assert read_stats(slim, verify_hash=True) is None
+
+
+def test_transform_month_writes_sidecar(tmp_path, monkeypatch):
+    monkeypatch.setattr(transform, "RAW_DIR", tmp_path / "archive_raw")
+    monkeypatch.setattr(transform, "SLIM_DIR", tmp_path / "archive_slim")
+    raw = tmp_path / "archive_raw" / "1920" / "03.json"
+    raw.parent.mkdir(parents=True)
+    docs = [
+        {"_id": "a", "pub_date": "1920-03-01T05:00:00+0000", "section_name": "Arts"},
+        {"_id": "b", "pub_date": "1920-03-09T05:00:00+0000", "section_name": "Sports"},
+    ]
+    raw.write_text(json.dumps({"response": {"docs": docs}}))
+
+    assert transform.transform_month(1920, 3)
+    slim = tmp_path / "archive_slim" / "1920" / "03.ndjson"
+    stats = read_stats(slim, verify_hash=True)
+    assert stats is not None
+    assert stats["record_count"] == 2
+    assert stats["sections"] == ["Arts", "Sports"]
+    assert stats["null_rates"]["article_id"] == 0.0
+
+    # A slim file from before sidecars existed gets one on the next run
+    stats_path(slim).unlink()
+    assert transform.transform_month(1920, 3)
+    assert read_stats(slim) == stats
+
+
+def test_build_catalog_and_prune(tmp_path):
+    _write_slim(
+        tmp_path / "1920" / "01.ndjson",
+        [{"pub_date": "1920-01-10", "section_name": "Arts"}],
+    )
+    _write_slim(
+        tmp_path / "1920" / "02.ndjson",
+        [
+            {"pub_date": "1920-02-03", "section_name": "Sports"},
+            {"pub_date": "1920-02-20", "section_name": "Arts"},
+        ],
+    )
+    _write_slim(tmp_path / "1920" / "03.ndjson", [{"pub_date": None, "section_name": None}])
+
+    catalog = build_catalog(tmp_path)
+    assert catalog["file_count"] == 3
+    assert catalog["record_count"] == 4
+    assert (tmp_path / "1920" / "01.stats.json").exists()
+
+    assert prune(catalog) == ["1920/01.ndjson", "1920/02.ndjson", "1920/03.ndjson"]
+    assert prune(catalog, start="1920-02-01") == ["1920/02.ndjson"]
+    assert prune(catalog, end="1920-01-31") == ["1920/01.ndjson"]
+    assert prune(catalog, sections=["Sports"]) == ["1920/02.ndjson"]
+    assert prune(catalog, start="1920-01-15", sections=["Arts"]) == ["1920/02.ndjson"]
@@ -0,0 +1,120 @@
+"""Tests for the archive doc store: incremental build, lookups, and transform from the store."""
+
+import json
+import sqlite3
+
+from archive import docstore, transform
+
+
+def _write_raw(raw_dir, year, month, docs):
+    path = raw_dir / str(year) / f"{month:02d}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"response": {"docs": docs}}, indent=2))
+    return path
+
+
+def _doc(doc_id, pub_date, **fields):
+    return {"_id": doc_id, "pub_date": pub_date, "headline": {"main": doc_id}, **fields}
+
+
+def test_build_is_incremental_and_queryable(tmp_path):
+    raw_dir = tmp_path / "archive_raw"
+    _write_raw(
+        raw_dir,
+        1920,
+        1,
+        [_doc("z", "1920-01-02T05:00:00+0000"), _doc("a", "1920-01-30T05:00:00+0000")],
+    )
+    _write_raw(raw_dir, 1920, 2, [_doc("m", "1920-02-01T05:00:00+0000"), {"pub_date": None}])
+    store = docstore.connect(tmp_path / "docs.sqlite")
+
+    assert docstore.build(store, raw_dir) == 2
+    assert docstore.build(store, raw_dir) == 0
+    assert docstore.months(store) == [(1920, 1), (1920, 2)]
+    assert docstore.get(store, "a")["headline"] == {"main": "a"}
+    assert docstore.get(store, "missing") is None
+    # Raw file order is kept; the doc without an _id is not stored
+    assert [d["_id"] for d in docstore.iter_month(store, 1920, 1)] == ["z", "a"]
+    assert [d["_id"] for d in docstore.iter_month(store, 1920, 2)] == ["m"]
+    in_range = docstore.iter_pub_dates(store, "1920-01-30", "1920-02-01")
+    assert [d["_id"] for d in in_range] == ["a", "m"]
+
+    # A changed raw file replaces its month
+    _write_raw(raw_dir, 1920, 1, [_doc("b", "1920-01-05T05:00:00+0000")])
+    assert docstore.build(store, raw_dir) == 1
+    assert [d["_id"] for d in docstore.iter_month(store, 1920, 1)] == ["b"]
+    assert docstore.get(store, "a") is None
+
+
+def test_transform_from_store_matches_raw(tmp_path, monkeypatch):
+    raw_dir = tmp_path / "archive_raw"
+    monkeypatch.setattr(transform, "RAW_DIR", raw_dir)
+    monkeypatch.setattr(transform, "SLIM_DIR", tmp_path / "archive_slim")
+    docs = [
+        _doc("a", "1920-03-01T05:00:00+0000", section_name="Arts", keywords=[{"value": "x"}]),
+        _doc("b", "1920-03-09T05:00:00+0000", byline={"person": [{"lastname": "Doe"}]}),
+    ]
+    _write_raw(raw_dir, 1920, 3, docs)
+    slim = tmp_path / "archive_slim" / "1920" / "03.ndjson"
+
+    assert transform.transform_month(1920, 3)
+    from_raw = slim.read_text()
+
+    store = docstore.connect(tmp_path / "docs.sqlite")
+    docstore.build(store, raw_dir)
+    assert not transform.transform_month(1920, 4, store=store)
+    assert transform.transform_month(1920, 3, overwrite=True, store=store)
+    assert slim.read_text() == from_raw
+
+
+def test_same_id_in_two_months_is_kept_in_both(tmp_path, capsys):
+    raw_dir = tmp_path / "archive_raw"
+    _write_raw(raw_dir, 1920, 1, [_doc("dup", "1920-01-31T05:00:00+0000"), _doc("a", None)])
+    _write_raw(raw_dir, 1920, 2, [_doc("dup", "1920-02-01T05:00:00+0000")])
+    store = docstore.connect(tmp_path / "docs.sqlite")
+
+    assert docstore.build(store, raw_dir) == 2
+    assert "_id dup of 1920/02 is also in 1920/01" in capsys.readouterr().out
+    # Loading February does not take the doc away from January
+    assert [d["_id"] for d in docstore.iter_month(store, 1920, 1)] == ["dup", "a"]
+    assert [d["_id"] for d in docstore.iter_month(store, 1920, 2)] == ["dup"]
+    assert docstore.get(store, "dup")["pub_date"] == "1920-02-01T05:00:00+0000"
+
+    # Reloading January keeps February's copy
+    _write_raw(raw_dir, 1920, 1, [_doc("dup", "1920-01-30T05:00:00+0000")])
+    assert docstore.build(store, raw_dir) == 1
+    assert [d["pub_date"] for d in docstore.iter_pub_dates(store, "1920-01-01", "1920-02-28")] == [
+        "1920-01-30T05:00:00+0000",
+        "1920-02-01T05:00:00+0000",
+    ]
+
+
+def test_store_with_old_schema_is_rebuilt(tmp_path):
+    db_path = tmp_path / "docs.sqlite"
+    old = sqlite3.connect(db_path)
+    old.execute("CREATE TABLE docs (id TEXT PRIMARY KEY, year INTEGER, month INTEGER)")
+    old.execute("INSERT INTO docs VALUES ('x', 1920, 1)")
+    old.commit()
+    old.close()
+
+    store = docstore.connect(db_path)
+    assert docstore.months(store) == []
+    _write_raw(tmp_path / "archive_raw", 1920, 1, [_doc("x", "1920-01-02T05:00:00+0000")])
+    assert docstore.build(store, tmp_path / "archive_raw") == 1
+    assert docstore.get(store, "x")["_id"] == "x"
+
+
+def test_id_repeated_within_a_month_reads_back_as_raw(tmp_path):
+    raw_dir = tmp_path / "archive_raw"
+    docs = [
+        _doc("dup", "1920-01-02T05:00:00+0000"),
+        _doc("a", "1920-01-03T05:00:00+0000"),
+        _doc("dup", "1920-01-04T05:00:00+0000"),
+    ]
+    _write_raw(raw_dir, 1920, 1, docs)
+    store = docstore.connect(tmp_path / "docs.sqlite")
+
+    assert docstore.build(store, raw_dir) == 1
+    assert list(docstore.iter_month(store, 1920, 1)) == docs
+    assert store.execute("SELECT doc_count FROM months").fetchone() == (3,)
+    assert docstore.get(store, "dup")["pub_date"] == "1920-01-04T05:00:00+0000"
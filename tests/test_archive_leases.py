@@ -0,0 +1,82 @@
+"""Tests for archive leases: shard claims, expiry reclaim, sharded worker loop."""
+
+from archive import ingest, leases
+from archive.leases import LocalLeaseStore, claim_next, complete, make_shards, renew
+from common.key_pool import KeyPool
+
+
+def test_make_shards_covers_every_month_once():
+    shards = make_shards(1920, 1923, months_per_shard=5)
+    months = [m for shard in shards for m in shard.months]
+    assert months == [(y, m) for y in range(1920, 1923) for m in range(1, 13)]
+    assert shards[0].shard_id == "1920-01_1920-05"
+    assert shards[-1].shard_id == "1922-12_1922-12"
+
+
+def test_workers_claim_disjoint_shards(tmp_path):
+    store = LocalLeaseStore(tmp_path)
+    shards = make_shards(1920, 1922)
+    first = claim_next(store, shards, "a", ttl_seconds=60)
+    second = claim_next(store, shards, "b", ttl_seconds=60)
+    assert first is not None and second is not None
+    assert first.shard_id != second.shard_id
+    assert claim_next(store, shards, "c", ttl_seconds=60) is None
+
+
+def test_stale_token_loses_compare_and_swap(tmp_path):
+    store = LocalLeaseStore(tmp_path)
+    _, token = store.read("s")
+    assert store.write("s", {"owner": "a"}, token)
+    assert not store.write("s", {"owner": "b"}, token)
+    assert store.read("s")[0] == {"owner": "a"}
+
+
+def test_expired_lease_is_reclaimed_and_done_shards_skipped(tmp_path):
+    store = LocalLeaseStore(tmp_path)
+    shards = make_shards(1920, 1922)
+    done = claim_next(store, shards, "a", ttl_seconds=60)
+    dead = claim_next(store, shards, "dead", ttl_seconds=-1)
+    assert dead is not None and done is not None
+    assert complete(store, done, "a")
+
+    reclaimed = claim_next(store, shards, "b", ttl_seconds=60)
+    assert reclaimed == dead
+    # The original owner can no longer renew it
+    assert not renew(store, dead, "dead", ttl_seconds=60)
+    assert claim_next(store, shards, "c", ttl_seconds=60) is None
+
+
+def test_run_worker_completes_shards_and_releases_failures(tmp_path, monkeypatch):
+    store = LocalLeaseStore(tmp_path / "leases")
+    shards = make_shards(1920, 1922)
+    pool = KeyPool(["k"], tmp_path / "keys.json", per_day=100, max_wait=30)
+    monkeypatch.setattr(ingest, "KEY_POOL", pool)
+    monkeypatch.setattr(
+        ingest, "ingest_month", lambda y, m: "error" if (y, m) == (1921, 6) else "fetched"
+    )
+
+    made = ingest.run_worker(store, "w1", shards, ttl_seconds=60)
+
+    assert made == 24
+    assert store.read("1920-01_1920-12")[0]["done"]
+    retry = store.read("1921-01_1921-12")[0]
+    assert not retry["done"]
+    # Released, so any worker can pick it up again straight away
+    assert leases.claim_next(store, shards, "w2", ttl_seconds=60) == shards[1]
+
+
+def test_run_worker_stops_at_request_budget(tmp_path, monkeypatch):
+    store = LocalLeaseStore(tmp_path)
+    shards = make_shards(1920, 1922)
+    pool = KeyPool(["k"], tmp_path / "keys.json", per_day=100, max_wait=30)
+    monkeypatch.setattr(ingest, "KEY_POOL", pool)
+    monkeypatch.setattr(ingest, "ingest_month", lambda y, m: "fetched")
+
+    assert ingest.run_worker(store, "w1", shards, max_requests=5, ttl_seconds=60) == 5
+    assert not store.read(shards[0].shard_id)[0]["done"]
+    assert leases.claim_next(store, shards, "w2", ttl_seconds=60) == shards[0]
+
+
+def test_key_wait_is_shorter_than_the_lease_ttl():
+    # A worker blocked on key budget for the full wait still renews before the TTL ends
+    assert ingest.KEY_POOL.max_wait <= ingest.LEASE_TTL_SECONDS / 2
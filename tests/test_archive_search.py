@@ -0,0 +1,73 @@
+"""Tests for archive search: tokenize, posting encoding, build_index, SearchIndex."""
+
+import json
+
+from archive.search import (
+    SearchIndex,
+    build_index,
+    decode_postings,
+    encode_postings,
+    intersect,
+    tokenize,
+)
+
+
+def test_tokenize_normalizes_and_drops_stopwords():
+    assert tokenize("The Café Opens, in NEW York!") == ["cafe", "opens", "new", "york"]
+    assert tokenize(None) == []
+    assert tokenize("a I") == []
+
+
+def test_postings_roundtrip():
+    doc_ids = [0, 1, 5, 127, 128, 300, 70_000, 10_000_000]
+    data = encode_postings(doc_ids)
+    assert decode_postings(data) == doc_ids
+    # Small gaps take one byte each
+    assert len(encode_postings([1, 2, 3])) == 3
+
+
+def test_intersect():
+    assert intersect([[1, 3, 5, 7], [3, 4, 7], [0, 3, 7, 9]]) == [3, 7]
+    assert intersect([[1, 2], []]) == []
+    assert intersect([]) == []
+
+
+def _write_month(slim_dir, year, month, articles):
+    path = slim_dir / str(year) / f"{month:02d}.ndjson"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(a) + "\n" for a in articles))
+
+
+def test_build_and_search_across_blocks(tmp_path):
+    slim_dir = tmp_path / "archive_slim"
+    index_dir = tmp_path / "archive_search"
+    _write_month(
+        slim_dir,
+        1969,
+        7,
+        [
+            {"article_id": "a1", "pub_date": "1969-07-21", "headline_main": "Men Walk on Moon"},
+            {"article_id": "a2", "pub_date": "1969-07-22", "abstract": "Stocks rally"},
+        ],
+    )
+    _write_month(
+        slim_dir,
+        1972,
+        12,
+        [
+            {"article_id": "a3", "pub_date": "1972-12-14", "snippet": "Last walk on the moon"},
+            {"article_id": "a4", "pub_date": "1972-12-15", "headline_main": "Moon rocks"},
+        ],
+    )
+
+    # block_docs=1 forces one block per document and a merge
+    assert build_index(slim_dir, index_dir, block_docs=1) == 4
+    assert not (index_dir / "blocks").exists()
+
+    with SearchIndex(index_dir) as index:
+        assert [d["article_id"] for d in index.search("moon")] == ["a4", "a3", "a1"]
+        assert [d["article_id"] for d in index.search("MOON walk")] == ["a3", "a1"]
+        assert [d["article_id"] for d in index.search("moon", limit=1)] == ["a4"]
+        assert index.search("mars") == []
+        assert index.search("the") == []
+        assert index.doc(1)["pub_date"] == "1969-07-22"
@@ -0,0 +1,107 @@
+"""Tests for cloud_function batching: flush thresholds and the flush step (local queue)."""
+
+import sys
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# The function's modules use flat imports (deployed from cloud_function/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cloud_function"))
+
+from batching import (  # type: ignore[import-not-found]  # noqa: E402
+    LocalFlushLock,
+    LocalPendingQueue,
+    flush_source,
+    should_flush,
+)
+
+NOW = datetime(2026, 2, 19, 6, 0, tzinfo=UTC)
+
+
+def _queue(n: int, age_seconds: float = 0) -> LocalPendingQueue:
+    queue = LocalPendingQueue()
+    for i in range(n):
+        queue.add(
+            "archive_slim",
+            f"p/archive_slim/1920/{i:02d}.ndjson",
+            NOW - timedelta(seconds=age_seconds),
+        )
+    return queue
+
+
+def test_should_flush_on_count_or_age():
+    assert not should_flush([], NOW)
+    assert not should_flush(_queue(2).pending("archive_slim"), NOW, max_files=3, max_age_seconds=60)
+    assert should_flush(_queue(3).pending("archive_slim"), NOW, max_files=3, max_age_seconds=60)
+    old = _queue(1, age_seconds=61).pending("archive_slim")
+    assert should_flush(old, NOW, max_files=3, max_age_seconds=60)
+
+
+def test_flush_loads_all_pending_files_in_one_batch():
+    queue = _queue(3)
+    # Duplicate event for the same file
+    queue.add("archive_slim", "p/archive_slim/1920/00.ndjson", NOW)
+    queue.add("most_popular_slim", "p/most_popular_slim/2026-02-19/viewed_1_0600.ndjson", NOW)
+    batches: list[list[str]] = []
+
+    loaded = flush_source(
+        queue, LocalFlushLock(), "archive_slim", batches.append, now=NOW, max_files=3
+    )
+
+    assert loaded == 3
+    assert batches == [[f"p/archive_slim/1920/{i:02d}.ndjson" for i in range(3)]]
+    assert queue.pending("archive_slim") == []
+    assert len(queue.pending("most_popular_slim")) == 1
+
+
+def test_flush_waits_below_thresholds_unless_forced():
+    queue = _queue(2)
+    batches: list[list[str]] = []
+    assert flush_source(queue, LocalFlushLock(), "archive_slim", batches.append, now=NOW) == 0
+    assert batches == []
+    assert flush_source(queue, LocalFlushLock(), "archive_slim", batches.append, force=True) == 2
+
+
+def test_flush_skips_when_locked_and_keeps_files_on_failure():
+    queue = _queue(3)
+    lock = LocalFlushLock()
+    lock.acquire("archive_slim")
+    assert flush_source(queue, lock, "archive_slim", lambda paths: None, force=True) == 0
+    lock.release("archive_slim")
+
+    def failing_load(paths: list[str]) -> None:
+        raise RuntimeError("load failed")
+
+    with pytest.raises(RuntimeError):
+        flush_source(queue, lock, "archive_slim", failing_load, force=True)
+    # Still pending for the next flush, and the lock was released
+    assert len(queue.pending("archive_slim")) == 3
+    assert lock.acquire("archive_slim")
+
+
+class CountingQueue(LocalPendingQueue):
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads = 0
+
+    def pending(self, source, limit=5000):
+        self.reads += 1
+        return super().pending(source, limit)
+
+
+def test_flush_reads_the_queue_once_and_only_under_the_lock():
+    queue = CountingQueue()
+    for i in range(3):
+        queue.add("archive_slim", f"p/archive_slim/1920/{i:02d}.ndjson", NOW)
+    lock = LocalFlushLock()
+
+    lock.acquire("archive_slim")
+    assert flush_source(queue, lock, "archive_slim", lambda paths: None, force=True) == 0
+    assert queue.reads == 0
+    lock.release("archive_slim")
+
+    assert flush_source(queue, lock, "archive_slim", lambda paths: None, force=True) == 3
+    assert queue.reads == 1
+    # Loaded files leave the queue
+    assert queue.queued == []
@@ -0,0 +1,83 @@
+"""Tests for cloud_function sidecars: a sidecar is trusted only for the upload it describes."""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+# The function's modules use flat imports (deployed from cloud_function/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cloud_function"))
+
+from sidecars import expected_row_count, sidecar_is_current  # type: ignore[import-not-found]  # noqa: E402
+
+OBJECT = "p/archive_slim/1920/01.ndjson"
+OLD = b'{"a": 1}\n{"a": 2}\n'
+NEW = b'{"a": 1}\n{"a": 2}\n{"a": 3}\n'
+
+
+def _stats(data: bytes) -> dict:
+    return {
+        "record_count": data.count(b"\n"),
+        "byte_size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+class FakeBlob:
+    def __init__(self, data: bytes, metadata: dict | None = None):
+        self.data, self.size, self.metadata = data, len(data), metadata
+
+    def download_as_text(self) -> str:
+        return self.data.decode()
+
+
+class FakeBucket:
+    def __init__(self):
+        self.blobs: dict[str, FakeBlob] = {}
+
+    def upload(self, name: str, data: bytes, with_sha256: bool = True) -> None:
+        metadata = {"sha256": hashlib.sha256(data).hexdigest()} if with_sha256 else None
+        self.blobs[name] = FakeBlob(data, metadata)
+
+    def get_blob(self, name: str) -> FakeBlob | None:
+        return self.blobs.get(name)
+
+
+def test_sidecar_is_current():
+    stats = _stats(OLD)
+    assert sidecar_is_current(stats, len(OLD), hashlib.sha256(OLD).hexdigest())
+    assert sidecar_is_current(stats, len(OLD), None)
+    assert not sidecar_is_current(stats, len(NEW), None)
+    assert not sidecar_is_current(stats, len(OLD), hashlib.sha256(b"x" * len(OLD)).hexdigest())
+
+
+def test_sidecar_uploaded_first_is_used():
+    bucket = FakeBucket()
+    bucket.upload(OBJECT.replace(".ndjson", ".stats.json"), json.dumps(_stats(NEW)).encode())
+    bucket.upload(OBJECT, NEW)
+    assert expected_row_count(bucket, OBJECT) == 3
+
+
+def test_reupload_before_its_sidecar_does_not_use_the_old_sidecar():
+    bucket = FakeBucket()
+    bucket.upload(OBJECT.replace(".ndjson", ".stats.json"), json.dumps(_stats(OLD)).encode())
+    # The new month lands (and fires its event) before its sidecar is replaced
+    bucket.upload(OBJECT, NEW)
+    assert expected_row_count(bucket, OBJECT) is None
+
+
+def test_same_size_reupload_is_caught_by_sha256():
+    changed = OLD.replace(b"2", b"9")
+    bucket = FakeBucket()
+    bucket.upload(OBJECT.replace(".ndjson", ".stats.json"), json.dumps(_stats(OLD)).encode())
+    bucket.upload(OBJECT, changed)
+    assert expected_row_count(bucket, OBJECT) is None
+    # Without sha256 metadata only the size is checked
+    bucket.upload(OBJECT, changed, with_sha256=False)
+    assert expected_row_count(bucket, OBJECT) == 2
+
+
+def test_no_sidecar():
+    bucket = FakeBucket()
+    bucket.upload(OBJECT, NEW)
+    assert expected_row_count(bucket, OBJECT) is None
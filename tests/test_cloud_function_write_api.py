@@ -0,0 +1,49 @@
+"""Tests for cloud_function write_api: schema-driven row encoding for the Storage Write API."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# The function's modules use flat imports (deployed from cloud_function/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cloud_function"))
+
+from write_api import encode_row, message_class  # type: ignore[import-not-found]  # noqa: E402
+
+SCHEMA = json.loads(
+    (Path(__file__).resolve().parent.parent / "schema" / "most_popular_articles.json").read_text()
+)
+
+ROW = {
+    "snapshot_date": "2026-02-19",
+    "id": 100000010,
+    "title": "A headline",
+    "des_facet": ["Politics", None],
+    "media_count_by_type": {"image": 2},
+    "feed": "viewed",
+    "period": 1,
+    "captured_at": "2026-02-19 06:00:00+00:00",
+    "rank": 1,
+    "abstract": None,
+}
+
+
+def test_encode_row_converts_to_proto_representation():
+    values = encode_row(SCHEMA, ROW)
+    assert values["snapshot_date"] == 20503  # days since 1970-01-01
+    assert values["captured_at"] == 1771480800 * 1_000_000
+    assert values["media_count_by_type"] == '{"image": 2}'
+    assert values["des_facet"] == ["Politics"]
+    # NULLs stay unset
+    assert "abstract" not in values and "url" not in values
+
+
+def test_message_class_serializes_rows():
+    pytest.importorskip("google.protobuf")
+    descriptor, row_class = message_class(SCHEMA, "MostPopularRow")
+    assert [f.name for f in descriptor.field] == [f["name"] for f in SCHEMA]
+    message = row_class.FromString(row_class(**encode_row(SCHEMA, ROW)).SerializeToString())
+    assert message.id == 100000010
+    assert list(message.des_facet) == ["Politics"]
+    assert not message.HasField("abstract")
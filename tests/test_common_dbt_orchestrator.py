@@ -0,0 +1,136 @@
+"""Tests for the dbt orchestrator: manifest rows to dbt selectors and partition vars."""
+
+import json
+from datetime import UTC, datetime, timedelta
+
+from common import dbt_orchestrator
+from common.dbt_orchestrator import ManifestRow, RunPlan, partition_of, plan_run
+
+NOW = datetime(2026, 2, 19, 8, 0, tzinfo=UTC)
+
+
+def _row(source, path):
+    return ManifestRow(source, f"nyt-ingest/{path}", NOW)
+
+
+def test_partition_of():
+    assert partition_of("archive_slim", "p/archive_slim/1920/05.ndjson") == "1920-05-01"
+    assert (
+        partition_of("most_popular_slim", "p/most_popular_slim/2026-02-19/viewed_1_0600.ndjson")
+        == "2026-02-19"
+    )
+    assert partition_of("archive_slim", "p/archive_slim/1920/05.stats.json") is None
+
+
+def test_quiet_day_selects_only_most_popular():
+    plan = plan_run(
+        [
+            _row("most_popular_slim", "most_popular_slim/2026-02-19/viewed_1_0600.ndjson"),
+            _row("most_popular_slim", "most_popular_slim/2026-02-19/viewed_7_0600.ndjson"),
+        ]
+    )
+    assert plan.files == 2
+    assert plan.dbt_args("run") == [
+        "dbt",
+        "run",
+        "--select",
+        "source:nyt_raw.most_popular_articles+",
+        "--vars",
+        json.dumps({"changed_snapshot_dates": ["2026-02-19"]}),
+    ]
+    # Vars only feed the models' source scans
+    assert plan.dbt_args("test") == [
+        "dbt",
+        "test",
+        "--select",
+        "source:nyt_raw.most_popular_articles+",
+    ]
+
+
+def test_backfill_selects_both_sources_with_changed_months():
+    plan = plan_run(
+        [
+            _row("archive_slim", "archive_slim/1950/03.ndjson"),
+            _row("archive_slim", "archive_slim/1920/01.ndjson"),
+            _row("archive_slim", "archive_slim/1920/01.ndjson"),
+            _row("most_popular_slim", "most_popular_slim/2026-02-18/shared_30_2000.ndjson"),
+            _row("unknown", "other/file.ndjson"),
+        ]
+    )
+    assert plan.files == 4
+    assert plan.selectors == [
+        "source:nyt_raw.archive_articles+",
+        "source:nyt_raw.most_popular_articles+",
+    ]
+    assert plan.dbt_vars == {
+        "changed_archive_months": ["1920-01-01", "1950-03-01"],
+        "changed_snapshot_dates": ["2026-02-18"],
+    }
+
+
+def test_large_backfill_drops_partition_hint(monkeypatch):
+    monkeypatch.setattr(dbt_orchestrator, "MAX_PARTITION_HINTS", 2)
+    rows = [_row("archive_slim", f"archive_slim/1920/{m:02d}.ndjson") for m in (1, 2, 3)]
+    plan = plan_run(rows)
+    assert plan.selectors == ["source:nyt_raw.archive_articles+"]
+    assert plan.dbt_vars == {}
+
+
+def test_empty_plan_runs_whole_project():
+    assert plan_run([]).selectors == []
+    assert RunPlan().dbt_args("run") == ["dbt", "run"]
+
+
+def test_plan_passes_manifest_cutoff():
+    until = datetime(2026, 2, 19, 7, 55, tzinfo=UTC)
+    plan = plan_run([_row("archive_slim", "archive_slim/1920/01.ndjson")], until)
+    assert plan.dbt_vars["manifest_until"] == "2026-02-19 07:55:00+00:00"
+    assert "manifest_until" not in plan_run([], until).dbt_vars
+
+
+def _model_run(manifest, dbt_vars, built):
+    """What an archive staging model does with the run's vars.
+
+    loaded_partitions() capped at manifest_until, the load-time filter against the
+    model's own max, and the partition hint; built maps partition -> load time.
+    """
+    until = dbt_vars.get("manifest_until")
+    loaded: dict[str, datetime] = {}
+    for row in manifest:
+        if until is None or row.loaded_at <= datetime.fromisoformat(until):
+            partition = partition_of(row.source, row.path)
+            loaded[partition] = max(loaded.get(partition, row.loaded_at), row.loaded_at)
+    high = max(built.values(), default=datetime(1970, 1, 1, tzinfo=UTC))
+    hint = dbt_vars.get("changed_archive_months")
+    for partition, loaded_at in loaded.items():
+        if loaded_at > high and (hint is None or partition in hint):
+            built[partition] = loaded_at
+
+
+def _orchestrate(manifest, watermark, started_at, built):
+    until = started_at - timedelta(seconds=dbt_orchestrator.SETTLE_SECONDS)
+    rows = [r for r in manifest if watermark < r.loaded_at <= until]
+    _model_run(manifest, plan_run(rows, until).dbt_vars, built)
+    return until
+
+
+def test_partition_loaded_in_settle_window_is_rebuilt_next_run():
+    def load(month, loaded_at):
+        return ManifestRow("archive_slim", f"p/archive_slim/1920/{month:02d}.ndjson", loaded_at)
+
+    # January is loaded before the cutoff and reloaded, after February, inside the
+    # settle window; only the first January load is in this run's hint
+    manifest = [
+        load(1, NOW - timedelta(seconds=400)),
+        load(2, NOW - timedelta(seconds=100)),
+        load(1, NOW - timedelta(seconds=50)),
+    ]
+    built: dict[str, datetime] = {}
+    watermark = _orchestrate(manifest, NOW - timedelta(hours=4), NOW, built)
+    assert built == {"1920-01-01": NOW - timedelta(seconds=400)}
+
+    _orchestrate(manifest, watermark, NOW + timedelta(hours=4), built)
+    assert built == {
+        "1920-01-01": NOW - timedelta(seconds=50),
+        "1920-02-01": NOW - timedelta(seconds=100),
+    }
@@ -0,0 +1,99 @@
+"""Tests for common.gcs_sync: upload planning and the sync loop (fake bucket)."""
+
+import hashlib
+from pathlib import Path
+
+from common.gcs_sync import RemoteObject, md5_b64, plan_uploads, sync_dirs
+
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket, self.name = bucket, name
+        self.metadata = None
+
+    def upload_from_filename(self, filename, checksum=None):
+        if self.name.endswith("fail.json"):
+            raise OSError("boom")
+        self.bucket.objects[self.name] = Path(filename).read_bytes()
+        self.bucket.metadata[self.name] = self.metadata
+        self.bucket.order.append(self.name)
+
+
+class FakeBucket:
+    name = "bucket"
+
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+        self.metadata: dict[str, dict | None] = {}
+        self.order: list[str] = []
+        self.listings: list[str] = []
+
+    def list_blobs(self, prefix, fields=None):
+        self.listings.append(prefix)
+        return []
+
+    def blob(self, name, chunk_size=None):
+        return FakeBlob(self, name)
+
+
+def _tree(tmp_path):
+    root = tmp_path / "archive_slim"
+    (root / "1920").mkdir(parents=True)
+    (root / "1920" / "01.ndjson").write_text('{"a": 1}\n')
+    (root / "1920" / "02.ndjson").write_text('{"a": 2}\n')
+    (root / "1920" / ".02.ndjson.tmp").write_text("partial")
+    return root
+
+
+def test_plan_uploads_skips_unchanged_and_hidden_files(tmp_path):
+    root = _tree(tmp_path)
+    unchanged = root / "1920" / "01.ndjson"
+    changed = root / "1920" / "02.ndjson"
+    remote = {
+        "p/archive_slim/1920/01.ndjson": RemoteObject(
+            unchanged.stat().st_size, md5=md5_b64(unchanged)
+        ),
+        # Same size, different content
+        "p/archive_slim/1920/02.ndjson": RemoteObject(
+            changed.stat().st_size, md5=md5_b64(unchanged)
+        ),
+    }
+    uploads, skipped = plan_uploads(root, remote, "p")
+    assert uploads == [(changed, "p/archive_slim/1920/02.ndjson")]
+    assert skipped == 1
+
+
+def test_sync_dirs_lists_once_per_dir_and_reports_failures(tmp_path):
+    root = _tree(tmp_path)
+    (root / "1920" / "fail.json").write_text("{}")
+    bucket = FakeBucket()
+
+    result = sync_dirs([root, tmp_path / "missing"], bucket, "p", max_workers=4)
+
+    assert bucket.listings == ["p/archive_slim/"]
+    assert sorted(result.uploaded) == [
+        "p/archive_slim/1920/01.ndjson",
+        "p/archive_slim/1920/02.ndjson",
+    ]
+    assert result.failed == ["p/archive_slim/1920/fail.json"]
+    assert bucket.objects["p/archive_slim/1920/01.ndjson"] == b'{"a": 1}\n'
+
+
+def test_sidecars_are_uploaded_before_data_files(tmp_path):
+    root = tmp_path / "archive_slim"
+    for year in ("1920", "1921"):
+        (root / year).mkdir(parents=True)
+        for month in ("01", "02", "03"):
+            (root / year / f"{month}.ndjson").write_text(f'{{"m": "{year}-{month}"}}\n')
+            (root / year / f"{month}.stats.json").write_text('{"record_count": 1}\n')
+    bucket = FakeBucket()
+
+    result = sync_dirs([root], bucket, "p", max_workers=4)
+
+    assert len(result.uploaded) == 12
+    kinds = [name.endswith(".stats.json") for name in bucket.order]
+    assert kinds == [True] * 6 + [False] * 6
+    slim = root / "1920" / "01.ndjson"
+    assert bucket.metadata["p/archive_slim/1920/01.ndjson"] == {
+        "sha256": hashlib.sha256(slim.read_bytes()).hexdigest()
+    }
@@ -0,0 +1,200 @@
+"""Tests for common.key_pool: routing, budgets, quarantine, persisted state."""
+
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from common import key_pool
+from common.key_pool import FileStateStore, KeyPool, key_id, keys_from_env
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_keys_from_env_merges_and_dedupes(monkeypatch):
+    monkeypatch.setenv("NYTIMES_API_KEYS", "a, b,,a")
+    monkeypatch.setenv("NYTIMES_API_KEY", "b")
+    assert keys_from_env() == ["a", "b"]
+
+
+def test_routes_to_key_with_most_day_budget_left(tmp_path):
+    pool = KeyPool(["a", "b"], tmp_path / "keys.json", per_minute=10, per_day=3)
+    assert [pool.acquire() for _ in range(6)] == ["a", "b", "a", "b", "a", "b"]
+    assert pool.acquire() is None
+    assert pool.exhausted()
+    assert pool.remaining_today() == {key_id("a"): 0, key_id("b"): 0}
+
+
+def test_min_interval_waits_per_key(tmp_path):
+    pool = KeyPool(["a"], tmp_path / "keys.json", min_interval=0.3)
+    started = time.monotonic()
+    pool.acquire()
+    assert time.monotonic() - started < 0.1
+    pool.acquire()
+    assert time.monotonic() - started >= 0.29
+
+
+def test_quarantine_skips_key_until_cooldown(tmp_path):
+    pool = KeyPool(["a", "b"], tmp_path / "keys.json", per_minute=10, cooldown_seconds=0.3)
+    pool.report("a", 429)
+    assert pool.acquire() == "b"
+    pool.report("b", 401)
+    # "a" comes back after its cooldown; "b" stays out for a day
+    started = time.monotonic()
+    assert pool.acquire() == "a"
+    assert time.monotonic() - started >= 0.2
+    pool.report("a", 401)
+    assert pool.exhausted()
+
+
+def test_usage_is_shared_through_the_state_file(tmp_path):
+    state_path = tmp_path / "keys.json"
+    KeyPool(["secret-key"], state_path, per_day=1).acquire()
+    # A second process (new pool, same file) sees the spent budget
+    assert KeyPool(["secret-key"], state_path, per_day=1).acquire() is None
+    assert "secret-key" not in state_path.read_text()
+
+
+def test_second_process_honours_recorded_usage(tmp_path):
+    state_path = tmp_path / "keys.json"
+    script = (
+        "import sys; from pathlib import Path; from common.key_pool import KeyPool; "
+        "print(KeyPool(['secret-key'], Path(sys.argv[1]), per_day=2).acquire())"
+    )
+    for _ in range(2):
+        child = subprocess.run(
+            [sys.executable, "-c", script, str(state_path)],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert child.stdout.strip() == "secret-key"
+    assert KeyPool(["secret-key"], state_path, per_day=2).acquire() is None
+
+
+class MemoryStore:
+    """StateStore in memory; before_save runs once ahead of the next save (a racing writer)."""
+
+    def __init__(self):
+        self.data: str | None = None
+        self.version = 0
+        self.before_save = None
+
+    def load(self):
+        if self.data is None:
+            return {}, None
+        return json.loads(self.data), str(self.version)
+
+    def save(self, state, token):
+        if self.before_save is not None:
+            racing_write, self.before_save = self.before_save, None
+            racing_write()
+        if (str(self.version) if self.data is not None else None) != token:
+            return False
+        self.data, self.version = json.dumps(state), self.version + 1
+        return True
+
+
+def test_concurrent_update_is_retried_not_lost():
+    store = MemoryStore()
+    first = KeyPool(["k"], store, per_day=2, lease_size=1)
+    second = KeyPool(["k"], store, per_day=2, lease_size=1)
+    store.before_save = second.acquire
+    assert first.acquire() == "k"
+    # Both reservations were kept: the day budget of 2 is spent
+    assert second.acquire() is None
+    assert json.loads(store.data)[key_id("k")]["day_count"] == 2
+
+
+class CountingStore(MemoryStore):
+    def __init__(self):
+        super().__init__()
+        self.saves = 0
+
+    def save(self, state, token):
+        self.saves += 1
+        return super().save(state, token)
+
+
+def test_slots_are_leased_in_batches_across_threads():
+    store = CountingStore()
+    pool = KeyPool(["a", "b"], store, per_minute=100, per_day=100, lease_size=10)
+    with ThreadPoolExecutor(max_workers=9) as threads:
+        keys = list(threads.map(lambda _: pool.acquire(), range(30)))
+    assert sorted(keys) == ["a"] * 15 + ["b"] * 15
+    # One state write per 10 requests, not one per request
+    assert store.saves == 3
+
+
+def test_release_returns_unused_slots():
+    store = MemoryStore()
+    pool = KeyPool(["k"], store, per_minute=100, per_day=10, lease_size=5)
+    assert pool.acquire() == "k"
+    assert pool.remaining_today() == {key_id("k"): 5}
+    pool.release()
+    assert pool.remaining_today() == {key_id("k"): 9}
+    assert json.loads(store.data)[key_id("k")]["recent"] != []
+    # Another process can use the returned budget
+    other = KeyPool(["k"], store, per_minute=100, per_day=10, lease_size=20)
+    assert [other.acquire() for _ in range(9)] == ["k"] * 9
+    assert other.acquire() is None
+
+
+def test_open_state_store_defaults_to_state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(key_pool, "STATE_URL", "")
+    monkeypatch.setattr(key_pool, "STATE_DIR", tmp_path)
+    store = key_pool.open_state_store("archive_keys.json")
+    assert isinstance(store, FileStateStore)
+    assert store.path == tmp_path / "archive_keys.json"
+
+
+class FakeBlob:
+    def __init__(self, objects, name):
+        self.objects, self.name, self.generation = objects, name, None
+
+    def download_as_bytes(self):
+        from google.api_core.exceptions import NotFound
+
+        if self.name not in self.objects:
+            raise NotFound(self.name)
+        data, self.generation = self.objects[self.name]
+        return data
+
+    def upload_from_string(self, data, content_type, if_generation_match):
+        from google.api_core.exceptions import PreconditionFailed
+
+        current = self.objects.get(self.name, (b"", 0))[1]
+        if current != if_generation_match:
+            raise PreconditionFailed(self.name)
+        self.objects[self.name] = (data.encode(), current + 1)
+
+
+class FakeClient:
+    """Stands in for storage.Client: one bucket whose objects outlive the pools."""
+
+    def __init__(self):
+        self.objects: dict = {}
+
+    def bucket(self, name):
+        objects = self.objects
+
+        class Bucket:
+            def blob(self, blob_name):
+                return FakeBlob(objects, blob_name)
+
+        return Bucket()
+
+
+def test_gcs_state_survives_a_new_runner():
+    pytest.importorskip("google.api_core")
+    gcs = FakeClient()
+    url = "gs://bucket/ingest/key_pool/archive_keys.json"
+    assert KeyPool(["k"], key_pool.GcsStateStore(url, gcs), per_day=1).acquire() == "k"
+    # A later run (fresh runner, empty disk) reads the same object
+    assert KeyPool(["k"], key_pool.GcsStateStore(url, gcs), per_day=1).acquire() is None
+    assert "ingest/key_pool/archive_keys.json" in gcs.objects
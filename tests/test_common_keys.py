@@ -0,0 +1,38 @@
+"""Tests for common.keys: article_key, normalize_url."""
+
+from archive.transform import extract_slim_article
+from common.keys import article_key, normalize_url
+from most_popular.transform import extract_slim_most_popular
+
+
+def test_normalize_url():
+    assert (
+        normalize_url(" HTTPS://www.NYTimes.com/2019/01/01/us/story.html?smid=tw#top ")
+        == "nytimes.com/2019/01/01/us/story.html"
+    )
+    assert normalize_url("https://www.nytimes.com/section/world/") == "nytimes.com/section/world"
+    assert normalize_url("") is None
+    assert normalize_url(None) is None
+
+
+def test_article_key_prefers_uri_then_url():
+    uuid = "8E6F1A2B-0000-4C1D-9E8F-123456789ABC"
+    assert article_key(f"nyt://article/{uuid}", "https://x") == f"article/{uuid.lower()}"
+    assert article_key("not-a-uri", "http://www.nytimes.com/a.html") == "url:nytimes.com/a.html"
+    assert article_key(None, None) is None
+
+
+def test_archive_and_most_popular_records_share_a_key():
+    uri = "nyt://article/0b7f3c6e-3c4a-5d3e-9f0a-1b2c3d4e5f60"
+    archive = extract_slim_article(
+        {"_id": uri, "uri": uri, "web_url": "https://www.nytimes.com/2019/a.html"}
+    )
+    popular = extract_slim_most_popular(
+        {"id": 1, "uri": uri.upper(), "url": "https://www.nytimes.com/2019/a.html?x=1"}
+    )
+    assert archive["article_key"] == popular["article_key"] == uri.removeprefix("nyt://")
+
+    # Without URIs, the normalized URLs still match
+    archive = extract_slim_article({"web_url": "https://www.nytimes.com/2019/b.html"})
+    popular = extract_slim_most_popular({"url": "http://nytimes.com/2019/b.html/"})
+    assert archive["article_key"] == popular["article_key"] == "url:nytimes.com/2019/b.html"
@@ -0,0 +1,156 @@
+"""Tests for the dashboard query cache: key normalization, TTL/stale handling, eviction, refresh."""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# The dashboard's modules use flat imports (run from dashboard/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "dashboard"))
+
+from utils import query_cache  # type: ignore[import-not-found]  # noqa: E402
+
+QueryCache = query_cache.QueryCache
+cache_key = query_cache.cache_key
+normalize_sql = query_cache.normalize_sql
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class Fetcher:
+    """fetch callable returning value, then value + 1, ... and counting calls."""
+
+    def __init__(self, value: int = 0):
+        self.value = value
+        self.calls = 0
+        self.done = threading.Event()
+
+    def __call__(self) -> int:
+        self.calls += 1
+        result = self.value + self.calls - 1
+        self.done.set()
+        return result
+
+
+def _clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(query_cache, "time", clock)
+    return clock
+
+
+def test_normalize_sql_collapses_whitespace_outside_literals():
+    assert normalize_sql("  SELECT *\n\tFROM t  ;\n") == "SELECT * FROM t"
+    assert cache_key("SELECT 1") == cache_key("SELECT\n   1;")
+
+
+def test_normalize_sql_keeps_whitespace_inside_literals():
+    assert normalize_sql("SELECT  'New  York',  \"a  b\"  FROM  `p.d  t`") == (
+        "SELECT 'New  York', \"a  b\" FROM `p.d  t`"
+    )
+    assert normalize_sql(r"WHERE x = 'it\'s  here'  AND y") == r"WHERE x = 'it\'s  here' AND y"
+    assert cache_key("WHERE city = 'New  York'") != cache_key("WHERE city = 'New York'")
+
+
+def test_fresh_entry_is_served_from_memory_and_disk(tmp_path, monkeypatch):
+    _clock(monkeypatch)
+    fetch = Fetcher(10)
+    cache = QueryCache(tmp_path, ttl_seconds=60)
+    assert cache.get_or_fetch("SELECT 1", fetch, version="v1") == 10
+    assert cache.get_or_fetch("SELECT  1", fetch, version="v1") == 10
+    assert fetch.calls == 1
+
+    # A new instance (restart, or another replica) reads the disk store
+    assert QueryCache(tmp_path).get_or_fetch("SELECT 1", fetch, version="v1") == 10
+    assert fetch.calls == 1
+
+
+def test_version_change_is_a_miss(tmp_path, monkeypatch):
+    _clock(monkeypatch)
+    fetch = Fetcher(10)
+    cache = QueryCache(tmp_path)
+    cache.get_or_fetch("SELECT 1", fetch, version="v1")
+    assert cache.get_or_fetch("SELECT 1", fetch, version="v2") == 11
+    assert fetch.calls == 2
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(tmp_path, monkeypatch):
+    clock = _clock(monkeypatch)
+    fetch = Fetcher(10)
+    cache = QueryCache(tmp_path, ttl_seconds=60, max_stale_seconds=600)
+    cache.get_or_fetch("SELECT 1", fetch)
+
+    clock.now += 120
+    fetch.done.clear()
+    assert cache.get_or_fetch("SELECT 1", fetch) == 10
+    assert fetch.done.wait(timeout=5)
+    deadline = time.monotonic() + 5
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert cache.get_or_fetch("SELECT 1", fetch) == 11
+    assert fetch.calls == 2
+
+
+def test_failed_refresh_keeps_stale_entry(tmp_path, monkeypatch):
+    clock = _clock(monkeypatch)
+    cache = QueryCache(tmp_path, ttl_seconds=60, max_stale_seconds=600)
+    cache.get_or_fetch("SELECT 1", Fetcher(10))
+    clock.now += 120
+
+    failed = threading.Event()
+
+    def failing_fetch():
+        failed.set()
+        raise RuntimeError("BigQuery unavailable")
+
+    assert cache.get_or_fetch("SELECT 1", failing_fetch) == 10
+    assert failed.wait(timeout=5)
+    deadline = time.monotonic() + 5
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get_or_fetch("SELECT 1", Fetcher(99)) == 10
+
+
+def test_entry_past_max_stale_is_fetched_synchronously(tmp_path, monkeypatch):
+    clock = _clock(monkeypatch)
+    fetch = Fetcher(10)
+    cache = QueryCache(tmp_path, ttl_seconds=60, max_stale_seconds=600)
+    cache.get_or_fetch("SELECT 1", fetch)
+
+    clock.now += 601
+    assert cache.get_or_fetch("SELECT 1", fetch) == 11
+    assert fetch.calls == 2
+    assert not cache._refreshing
+
+
+def test_memory_lru_and_disk_eviction(tmp_path, monkeypatch):
+    _clock(monkeypatch)
+    cache = QueryCache(tmp_path, max_memory_entries=2)
+    for i, query in enumerate(["SELECT 1", "SELECT 2", "SELECT 3"]):
+        cache.get_or_fetch(query, Fetcher(i))
+        os.utime(tmp_path / f"{cache_key(query)}.pkl", (i + 1, i + 1))
+    assert list(cache._memory) == [cache_key("SELECT 2"), cache_key("SELECT 3")]
+
+    entry_size = (tmp_path / f"{cache_key('SELECT 1')}.pkl").stat().st_size
+    cache.max_disk_bytes = 3 * entry_size
+    cache.get_or_fetch("SELECT 4", Fetcher(4))
+    remaining = {p.stem for p in tmp_path.glob("*.pkl")}
+    # The least recently used file (SELECT 1) is evicted to fit the limit
+    assert remaining == {cache_key(q) for q in ["SELECT 2", "SELECT 3", "SELECT 4"]}
+
+
+def test_invalidate_clears_memory_and_disk(tmp_path, monkeypatch):
+    _clock(monkeypatch)
+    fetch = Fetcher(10)
+    cache = QueryCache(tmp_path)
+    cache.get_or_fetch("SELECT 1", fetch)
+    cache.invalidate()
+    assert not list(tmp_path.glob("*.pkl"))
+    assert cache.get_or_fetch("SELECT 1", fetch) == 11
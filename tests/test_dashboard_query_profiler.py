@@ -0,0 +1,40 @@
+"""Tests for the dashboard query profiler's per-query log line."""
+
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+# The dashboard's modules use flat imports (run from dashboard/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "dashboard"))
+
+from utils import query_profiler  # type: ignore[import-not-found]  # noqa: E402
+
+
+def test_log_stats_emits_json_line_without_logging_config(caplog):
+    # Only the module's own setup: no basicConfig, root stays at WARNING
+    assert logging.getLogger().level == logging.WARNING
+
+    stats = query_profiler.QueryStats(label="overview.kpis", bytes_billed=10 * 1024**2)
+    query_profiler.log_stats(stats)
+
+    [record] = [r for r in caplog.records if r.name == "dashboard.query_profile"]
+    line = json.loads(record.getMessage())
+    assert line["event"] == "dashboard_query"
+    assert line["label"] == "overview.kpis"
+    assert line["bytes_billed"] == 10 * 1024**2
+
+
+def test_query_log_can_be_turned_off(monkeypatch, caplog):
+    monkeypatch.setenv("DASHBOARD_QUERY_LOG", "0")
+    query_profiler.configure_query_log()
+    try:
+        query_profiler.log_stats(query_profiler.QueryStats(label="x"))
+        assert not [r for r in caplog.records if r.name == "dashboard.query_profile"]
+    finally:
+        monkeypatch.delenv("DASHBOARD_QUERY_LOG")
+        query_profiler.configure_query_log()
@@ -0,0 +1,27 @@
+"""Tests for the dashboard search query: terms match across the indexed columns."""
+
+import sys
+from pathlib import Path
+
+# The dashboard's modules use flat imports (run from dashboard/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "dashboard"))
+
+from utils import search_query  # type: ignore[import-not-found]  # noqa: E402
+
+
+def test_search_spans_all_indexed_columns():
+    query = search_query.build_search_query(
+        "`p.dbt_core.fct_articles`", " moon landing ", (1960, 1970), 50
+    )
+    assert "WHERE SEARCH((a.headline_main, a.abstract, a.snippet), 'moon landing')" in query
+    # One SEARCH call: terms are not required to share a column
+    assert query.count("SEARCH(") == 1
+    assert " OR " not in query
+    assert "a.pub_year BETWEEN 1960 AND 1970" in query
+    assert "FROM `p.dbt_core.fct_articles` a" in query
+    assert query.rstrip().endswith("LIMIT 50")
+
+
+def test_search_text_is_escaped():
+    query = search_query.build_search_query("t", "O'Neil \\ play", (1900, 2030), 25)
+    assert "'O\\'Neil \\\\ play'" in query
@@ -0,0 +1,52 @@
+"""Tests for most_popular ingest: concurrent ingest_all over a key pool."""
+
+import time
+from datetime import UTC, datetime
+
+from common.key_pool import KeyPool
+from most_popular import ingest
+from most_popular.ingest import ingest_all
+from most_popular.snapshots import load_snapshot
+
+
+def test_ingest_all_runs_endpoints_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "RAW_DIR", tmp_path)
+    # Two keys at 2 requests/minute each cover all four endpoints without waiting
+    pool = KeyPool(["key-a", "key-b"], tmp_path / "state" / "keys.json", per_minute=2)
+    monkeypatch.setattr(ingest, "KEY_POOL", pool)
+    used_keys = []
+
+    def fake_fetch(feed, period, api_key=None):
+        used_keys.append(api_key)
+        time.sleep(0.2)
+        if feed == "shared" and period == 30:
+            return None
+        return {"status": "OK", "results": [{"id": period, "title": feed}]}
+
+    monkeypatch.setattr(ingest, "fetch_most_popular", fake_fetch)
+    captured = datetime(2026, 2, 19, 6, 0, tzinfo=UTC)
+
+    started = time.monotonic()
+    results = ingest_all(["viewed", "shared"], [1, 30], captured=captured)
+    wall_clock = time.monotonic() - started
+
+    # Four 0.2s calls take about as long as one, split evenly over the keys
+    assert wall_clock < 0.6
+    assert sorted(used_keys) == ["key-a", "key-a", "key-b", "key-b"]
+    assert [(r.feed, r.period, r.ok) for r in results] == [
+        ("viewed", 1, True),
+        ("viewed", 30, True),
+        ("shared", 1, True),
+        ("shared", 30, False),
+    ]
+    assert all(r.latency_ms >= 200 for r in results)
+    assert load_snapshot(results[2].path)["results"] == [{"id": 1, "title": "shared"}]
+    assert sorted(p.name for p in (tmp_path / "2026-02-19").iterdir()) == [
+        "shared_1_0600.json",
+        "viewed_1_0600.json",
+        "viewed_30_0600.json",
+    ]
+
+    # A second run of the same capture skips existing snapshots
+    rerun = ingest_all(["viewed"], [1], captured=captured)
+    assert rerun[0].skipped and rerun[0].ok
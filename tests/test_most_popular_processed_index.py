@@ -0,0 +1,84 @@
+"""Tests for the most_popular processed-file index and incremental transform_all."""
+
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from most_popular import transform
+from most_popular.processed_index import ProcessedIndex, rebuild_index
+from most_popular.snapshots import write_atomic, write_snapshot
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    raw_dir, slim_dir = tmp_path / "raw", tmp_path / "slim"
+    index_path = tmp_path / "state" / "index.json"
+    monkeypatch.setattr(transform, "RAW_DIR", raw_dir)
+    monkeypatch.setattr(transform, "SLIM_DIR", slim_dir)
+    monkeypatch.setattr(transform, "INDEX_PATH", index_path)
+
+    calls = []
+    original = transform.transform_file
+
+    def spy(raw_path, overwrite=False):
+        calls.append(raw_path.name)
+        return original(raw_path, overwrite=overwrite)
+
+    monkeypatch.setattr(transform, "transform_file", spy)
+    return raw_dir, slim_dir, index_path, calls
+
+
+def _capture(raw_dir, day, hour, article_id):
+    data = {"results": [{"id": article_id, "title": f"Article {article_id}"}]}
+    return write_snapshot(raw_dir, "viewed", 1, data, datetime(2026, 2, day, hour, tzinfo=UTC))
+
+
+def test_transform_all_only_processes_new_or_changed_files(dirs):
+    raw_dir, slim_dir, index_path, calls = dirs
+    _capture(raw_dir, 18, 6, 1)
+    second = _capture(raw_dir, 19, 6, 2)
+
+    transform.transform_all()
+    assert sorted(calls) == ["viewed_1_0600.json", "viewed_1_0600.json"]
+    assert index_path.exists()
+
+    calls.clear()
+    transform.transform_all()
+    assert calls == []
+
+    # New capture in an existing day: only that file
+    _capture(raw_dir, 19, 10, 3)
+    transform.transform_all()
+    assert calls == ["viewed_1_1000.json"]
+
+    # Rewritten with identical content: re-hashed, not transformed
+    calls.clear()
+    write_atomic(second, second.read_text())
+    transform.transform_all()
+    assert calls == []
+
+    # Rewritten with new content: transformed again
+    write_atomic(second, json.dumps({"results": [{"id": 9, "title": "Replaced"}]}))
+    transform.transform_all()
+    assert calls == ["viewed_1_0600.json"]
+    slim = (slim_dir / "2026-02-19" / "viewed_1_0600.ndjson").read_text()
+    assert json.loads(slim)["id"] == 9
+
+
+def test_index_rebuilds_from_existing_slim_files(dirs):
+    raw_dir, slim_dir, index_path, calls = dirs
+    _capture(raw_dir, 18, 6, 1)
+    transform.transform_all()
+    index_path.unlink()
+    _capture(raw_dir, 18, 10, 2)
+
+    calls.clear()
+    transform.transform_all()
+    # Already-transformed file is recognized from its slim output
+    assert calls == ["viewed_1_1000.json"]
+
+    rebuilt = rebuild_index(raw_dir, slim_dir)
+    loaded = ProcessedIndex.load(index_path, raw_dir)
+    assert rebuilt.files == loaded.files
+    assert set(loaded.files) == {"2026-02-18/viewed_1_0600.json", "2026-02-18/viewed_1_1000.json"}
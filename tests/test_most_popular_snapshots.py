@@ -0,0 +1,69 @@
+"""Tests for most_popular snapshots: delta storage, reconstruction, snapshot naming."""
+
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+
+from most_popular import snapshots
+from most_popular.snapshots import load_snapshot, parse_snapshot_path, write_snapshot
+
+
+def _response(*docs):
+    return {"status": "OK", "num_results": len(docs), "results": list(docs)}
+
+
+def _doc(article_id, title="t"):
+    return {"id": article_id, "title": title, "abstract": "x" * 200}
+
+
+def test_parse_snapshot_path():
+    info = parse_snapshot_path(Path("most_popular_raw/2026-02-19/shared_7_1405.delta.json"))
+    assert (info.feed, info.period, info.hhmm, info.is_delta) == ("shared", 7, "1405", True)
+    assert info.captured_at == "2026-02-19 14:05:00+00:00"
+    assert info.slim_name == "shared_7_1405.ndjson"
+
+    legacy = parse_snapshot_path(Path("most_popular_raw/2026-02-19/viewed_30.json"))
+    assert legacy.captured_at == "2026-02-19 00:00:00+00:00"
+    assert legacy.slim_name == "viewed_30.ndjson"
+
+    assert parse_snapshot_path(Path("most_popular_raw/2026-02-19/notes.txt")) is None
+
+
+def test_write_snapshot_deltas_roundtrip(tmp_path):
+    first = _response(_doc(1), _doc(2), _doc(3))
+    second = _response(_doc(2), _doc(1), _doc(4))
+    third = _response(_doc(4), _doc(1, title="updated"), _doc(2))
+
+    p1 = write_snapshot(tmp_path, "viewed", 1, first, datetime(2026, 2, 19, 6, 0, tzinfo=UTC))
+    p2 = write_snapshot(tmp_path, "viewed", 1, second, datetime(2026, 2, 19, 10, 0, tzinfo=UTC))
+    p3 = write_snapshot(tmp_path, "viewed", 1, third, datetime(2026, 2, 19, 14, 0, tzinfo=UTC))
+
+    assert p1.name == "viewed_1_0600.json"
+    assert p2.name == "viewed_1_1000.delta.json"
+    assert p3.name == "viewed_1_1400.delta.json"
+
+    delta = json.loads(p3.read_text())
+    assert delta["delta_of"] == "viewed_1_1000.delta.json"
+    assert delta["depth"] == 2
+    assert [doc["id"] for doc in delta["upserts"]] == [1]
+
+    assert load_snapshot(p1) == first
+    assert load_snapshot(p2) == second
+    assert load_snapshot(p3) == third
+
+
+def test_write_snapshot_chain_cap_and_new_day(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "MAX_DELTA_DEPTH", 1)
+    data = _response(_doc(1), _doc(2))
+
+    names = [
+        write_snapshot(tmp_path, "emailed", 30, data, datetime(2026, 2, 19, h, 0, tzinfo=UTC)).name
+        for h in (6, 10, 14)
+    ]
+    assert names == ["emailed_30_0600.json", "emailed_30_1000.delta.json", "emailed_30_1400.json"]
+
+    # Each day starts with a full snapshot
+    next_day = write_snapshot(
+        tmp_path, "emailed", 30, data, datetime(2026, 2, 20, 6, 0, tzinfo=UTC)
+    )
+    assert next_day.name == "emailed_30_0600.json"
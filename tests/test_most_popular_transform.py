@@ -1,6 +1,11 @@
 """Tests for most_popular transform: extract_slim_most_popular, media_counts_by_type."""
 
+import json
+from datetime import UTC, datetime
+
+from most_popular import transform
 from most_popular.models import SlimMostPopularArticle
+from most_popular.snapshots import write_snapshot
 from most_popular.transform import extract_slim_most_popular, media_counts_by_type
 
 
@@ -58,3 +63,24 @@ def test_extract_slim_most_popular_validates_to_slim_model():
     assert article.section == "World"
     assert article.media_count_by_type == {"image": 2, "video": 1}
     assert article.des_facet == []
+
+
+def test_transform_file_reconstructs_delta_and_tags_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(transform, "SLIM_DIR", tmp_path / "slim")
+    raw_dir = tmp_path / "raw"
+    base = {"results": [{"id": 1, "title": "One"}, {"id": 2, "title": "Two"}]}
+    latest = {"results": [{"id": 2, "title": "Two"}, {"id": 3, "title": "Three"}]}
+    write_snapshot(raw_dir, "shared", 7, base, datetime(2026, 2, 19, 6, 0, tzinfo=UTC))
+    delta_path = write_snapshot(
+        raw_dir, "shared", 7, latest, datetime(2026, 2, 19, 8, 30, tzinfo=UTC)
+    )
+
+    assert transform.transform_file(delta_path)
+
+    slim_path = tmp_path / "slim" / "2026-02-19" / "shared_7_0830.ndjson"
+    rows = [json.loads(line) for line in slim_path.read_text().splitlines()]
+    assert [r["id"] for r in rows] == [2, 3]
+    assert [r["rank"] for r in rows] == [1, 2]
+    assert {(r["feed"], r["period"], r["captured_at"]) for r in rows} == {
+        ("shared", 7, "2026-02-19 08:30:00+00:00")
+    }